@@ -1,63 +1,89 @@
-import nltk
-import re
-import logging
+import hmac
+import json
 import os.path
 import sys
-from flask                        import Flask, request, jsonify, render_template, flash
+from time                         import perf_counter
+from flask                        import Flask, Blueprint, Response, current_app, request, jsonify, \
+                                         render_template, flash, stream_with_context
 from flask_bootstrap              import Bootstrap
 # from flask_sqlalchemy             import SQLAlchemy
 from form_utilities.config        import Config
 from form_utilities.forms         import RegisterForm
 # from flask_json                   import FlaskJSON, JsonError, json_response, as_json
 from nltk.sentiment.vader         import SentimentIntensityAnalyzer
-from sklearn.linear_model         import LogisticRegression
+from sklearn.linear_model         import LogisticRegression, SGDClassifier
+from utilities.mapped_model       import MappedLinearModel
+from utilities.nltk_resources     import load_nltk_resources
+from utilities.scoring            import InvalidLine
+from utilities.model_registry     import ModelRegistry, ModelSet, parse_models, current_registry, \
+                                         current_scoring_service
+from utilities.validation         import InvalidRequest, read_json_body, respond_with, HTTP_FORBIDDEN, \
+                                         HTTP_CONFLICT
+from utilities.metrics            import latency_metrics
+from utilities.log                import configure_logging
 from testing.swagger_ui           import blueprint_swagger
-from utilities.model_file         import load_model_file
-from utilities.text               import text_predict
 from sklearn.pipeline             import Pipeline
 
 
-HTTP_BAD_REQUEST = 400
-
-
-# NLTK setting
-nltk.download('vader_lexicon')
-nltk.download('stopwords')
-nltk.download('punkt')
-
 
 # Flask setting
-app        = Flask(__name__)
-bootstrap  = Bootstrap(app)
-app.config.from_object(Config)
+# (the app itself is built by create_app)
+bootstrap      = Bootstrap()
+blueprint_main = Blueprint('main', __name__)
 
 
 # Logging setting
-logging.basicConfig(level  = logging.INFO,
-                    format = "%(asctime)s  %(levelname)8s  %(filename)12s  %(funcName)12s  %(lineno)4d  %(message)s")
-app_logger = logging.getLogger("app_logger")
-
-
-# Register blueprint_swagger in app
-app.register_blueprint(blueprint_swagger)
+# LOG_MODE 'plain' (text, synchronous) or 'structured' (JSON, queued), LOG_SAMPLE_RATES per route: see Config
+app_logger = configure_logging(Config.LOG_MODE, Config.LOG_SAMPLE_RATES)
 
 
-# Load model
-
-#filename = "sentiment_model_pickle"               # Logistic Regression model
-filename = "sentiment_model_pickle_default_sia"   # Sentiment Intensity Analysis model
-
-if os.path.exists(str(filename)):
-    model_files = load_model_file(filename, app_logger)
-    # extract model from model file
-    model       = model_files['model']
-    app_logger.info('loaded_model:             ' + str(model))
-else:
-    sys.exit("NO sentiment_model_pickle file found in project folder.")
+# NLTK setting
+# resources are installed at build time (see Dockerfile), and only looked up locally here
+try:
+    load_nltk_resources(Config.NLTK_DATA_DIR, Config.NLTK_RESOURCES, app_logger)
+except LookupError as e:
+    sys.exit(str(e))
+
+
+# Load models
+# Loaded once per process, at import. When served by gunicorn with preload_app (see gunicorn.conf.py),
+# this happens in the master process before the workers are forked, so they share the model pages.
+# Every model file is then watched, and reloaded in the background when replaced (or on a call of
+# /admin/model/reload): see utilities/model_registry.py.
+
+# MODELS (see Config): the models served side by side, by name; a request selects one by the X-Model
+# header or ?model=xxx, and gets DEFAULT_MODEL otherwise. By default, MODEL_FILE only:
+#   "sentiment_model_pickle"               Logistic Regression model
+#   "sentiment_model_pickle_default_sia"   Sentiment Intensity Analysis model
+dict_model_file = parse_models(Config.MODELS, Config.MODEL_FILE)
+
+# the model, its result cache & the validation of every model, shared by every endpoint (and by the
+# swagger-ui blueprint); a file named by several models is loaded once
+dict_file_registry = {}
+for filename in dict_model_file.values():
+    if filename in dict_file_registry:
+        continue
+    registry = ModelRegistry(Config.RESULT_CACHE_SIZE, Config.MAX_SENTENCE_LENGTH, app_logger)
+    if not os.path.exists(str(filename)):
+        sys.exit("NO model file found in project folder: " + str(filename))
+    elif not registry.load(filename):
+        sys.exit("Failed to load the model file: " + str(filename))
+    registry.watch(Config.MODEL_WATCH_INTERVAL_S)
+    dict_file_registry[filename] = registry
+
+try:
+    model_set = ModelSet({name: dict_file_registry[filename] for name, filename in dict_model_file.items()},
+                         Config.DEFAULT_MODEL or next(iter(dict_model_file)))
+except ValueError as e:
+    sys.exit(str(e))
+
+# the registry of the default model
+model_registry = model_set.default
+app_logger.info('loaded_models:            ' + str(model_set))
 
 
 # cURL API endpoint
-@app.route('/curl', methods = ['GET', 'POST'])
+@blueprint_main.route('/curl', methods = ['GET', 'POST'])
 # to handle requests sent to this endpoint
 def curl_scoring():
     '''
@@ -98,83 +124,222 @@ def curl_scoring():
             compound:
               type: float
               description: The compound sentiment                            
+            label:
+              type: string
+              description: The class (1-5) of the compound sentiment, if the model file has calibrated thresholds
     """
+    start_request = perf_counter()
+
+    # the model selected by the request (X-Model header or ?model=), read once: it serves the whole request,
+    # even if a new version is swapped in meanwhile
     # to retrieve the input sentence related to this request
-    # Flask helps to raise error if curl --data is not in JSON data type
-    dict_request = request.get_json()
-    app_logger.info('dict_request:      ' + str(dict_request))
-    app_logger.info('dict_request type: ' + str(type(dict_request)))
+    # (None if curl --data is not sent as JSON; an oversize or invalid JSON body is rejected)
+    try:
+        service      = current_scoring_service()
+        dict_request = read_json_body(request, current_app.config['MAX_PAYLOAD_BYTES'])
+    except InvalidRequest as e:
+        return respond_with(e.message, e.status_code)
+    start        = perf_counter()
+    latency_metrics.observe('parse', start - start_request)
+    app_logger.info('dict_request:      %s', dict_request)
+    app_logger.info('dict_request type: %s', type(dict_request))
+
+    # raise error if failed to decode JSON object, or if the input sentence is not valid
+    message = service.check_request(dict_request)
+    if message is not None:
+        response = respond_with(message)
+        return response
+
+    # extract the input data
+    sentence = dict_request["sentence"]
+    latency_metrics.observe('validation', perf_counter() - start)
 
+    # Text pre-processing & Prediction
+    # (the pre-processing stages & inference are timed in text_predict, on a result cache miss)
+    dict_score = service.score(sentence)
+
+    # create and send a JSON response to the API caller
+    start    = perf_counter()
+    response = jsonify(score = dict_score, status = "complete", sentence = sentence)
+    end      = perf_counter()
+    latency_metrics.observe('serialization', end - start)
+    latency_metrics.observe('total',         end - start_request)
+    return response
+
+
+
+# cURL batch API endpoint
+@blueprint_main.route('/curl/batch', methods = ['POST'])
+def curl_batch_scoring():
+    '''
+    curl --header "Content-Type: application/json"                \
+         --request POST                                           \
+         --data '{"sentences":["I love dog.", "I hate cat."]}'    \
+         http://localhost:99/curl/batch
+    '''
+
+    """
+    Score a list of sentences with one request.
+    Every sentence is validated on its own, so one bad sentence does not fail the whole batch:
+    each item of "results" is either a score (status "complete") or an error message (status "error"),
+    with the same error messages /curl responds with.
+    """
+    try:
+        service      = current_scoring_service()
+        dict_request = read_json_body(request, current_app.config['BATCH_MAX_PAYLOAD_BYTES'])
+    except InvalidRequest as e:
+        return respond_with(e.message, e.status_code)
+    app_logger.info('dict_request:      %s', dict_request)
 
     # raise error if failed to decode JSON object
-    if len(dict_request) == 0:
+    if not isinstance(dict_request, dict) or len(dict_request) == 0:
         message  = "Failed to decode JSON object: No key/value pair in JSON. " \
-                   "Expecting one, with key of 'sentence'."
-        response = respond_with(message)
-        return response
+                   "Expecting one, with key of 'sentences'."
+        return respond_with(message)
     elif len(dict_request) > 1:
         message  = "Failed to decode JSON object: More than one key/value pair in JSON. " \
-                   "Expecting only one, with key of 'sentence'."
-        response = respond_with(message)
-        return response
-    elif len(dict_request) == 1:
-        # get_json() is modified to accept different values for one key.
-        # In such case, it will return a list of values for the key.
-        #   eg. {'sentence': ['I love you.', 'I hate you.']}
-        # By default, it will only return the last value for the key.
-        #   eg. {'sentence': 'I hate you.'}
-
-        value = dict_request[next(iter(dict_request))]  # the value of the only key (either a str or a list)
-
-        # more than one value for the key
-        if type(value) is list:
-            app_logger.info('dict_request:      ' + str(dict_request))
-            app_logger.info('value:             ' + str(dict_request[next(iter(dict_request))]))
-            app_logger.info('type(value):       ' + str(type(dict_request[next(iter(dict_request))])))
-
-            if len(set(value)) == 1:
-                # all the values are the same
-                message = "Failed to decode JSON object: Repeated key/value pairs in JSON. " \
-                          "Expecting only one, with key of 'sentence'."
-                response = respond_with(message)
-            else:
-                message = "Failed to decode JSON object: More than one value for one key in JSON. " \
-                          "Expecting only one, with key of 'sentence'."
-                response = respond_with(message)
-            return response
-        elif "sentence" not in dict_request.keys():
-            message  = "Failed to decode JSON object: Expecting key/value pair with key of 'sentence'."
-            response = respond_with(message)
-            return response
-        elif not isinstance(dict_request["sentence"], str):
-            message  = "Failed to decode JSON object: Expecting str data type for value in key/value pair " \
-                       "(enclosed in double quotes)."
-            response = respond_with(message)
-            return response
-    else:
-        pass
+                   "Expecting only one, with key of 'sentences'."
+        return respond_with(message)
+    elif "sentences" not in dict_request.keys():
+        message  = "Failed to decode JSON object: Expecting key/value pair with key of 'sentences'."
+        return respond_with(message)
+    elif not isinstance(dict_request["sentences"], list):
+        message  = "Failed to decode JSON object: Expecting list data type for value in key/value pair " \
+                   "(enclosed in square brackets)."
+        return respond_with(message)
+    elif len(dict_request["sentences"]) > current_app.config['BATCH_MAX_SENTENCES']:
+        message  = "Too many sentences in one request. " \
+                   "Expecting at most " + str(current_app.config['BATCH_MAX_SENTENCES']) + "."
+        return respond_with(message)
 
-    # extract the input data
-    sentence = dict_request["sentence"]
+    # Text pre-processing & Prediction
+    list_result = service.score_batch(dict_request["sentences"])
 
-    # raise error if the input sentence is not valid
-    if len(re.findall("[a-zA-Z]", sentence)) == 0:
-        message  = "Failed to find English letter in the input sentence. Please try again."
-        response = respond_with(message)
+    return jsonify(results = list_result, status = "complete")
+
+
+
+# cURL streaming API endpoint
+@blueprint_main.route('/curl/stream', methods = ['POST'])
+def curl_stream_scoring():
+    '''
+    curl --header "Content-Type: application/x-ndjson"             \
+         --header "Transfer-Encoding: chunked"                     \
+         --request POST                                            \
+         --data-binary @sentences.ndjson                           \
+         http://localhost:99/curl/stream
+    '''
+
+    """
+    Score a newline-delimited JSON body of any size, one {"sentence": "xxx"} object per line,
+    and stream back one JSON result per line, in the same order and format as the items of /curl/batch.
+    Blank lines are skipped; a line that is not a valid object gets an error result of its own.
+
+    The body is read and scored STREAM_CHUNK_SIZE lines at a time, while the response is being sent:
+    the next chunk is only read once the previous results have been handed to the server, which
+    blocks on a slow client, so memory does not grow with the size of the body.
+    """
+    try:
+        service = current_scoring_service()
+    except InvalidRequest as e:
+        return respond_with(e.message, e.status_code)
+    chunk_size    = current_app.config['STREAM_CHUNK_SIZE']
+    max_line_size = current_app.config['STREAM_MAX_LINE_BYTES']
+    stream        = request.stream
+
+    def generate():
+        list_sentence = []
+        for sentence in read_ndjson_sentences(stream, max_line_size):
+            list_sentence.append(sentence)
+            if len(list_sentence) == chunk_size:
+                yield ndjson_lines(service.score_batch(list_sentence))
+                list_sentence = []
+        if list_sentence:
+            yield ndjson_lines(service.score_batch(list_sentence))
+
+    return Response(stream_with_context(generate()), mimetype = 'application/x-ndjson')
+
+
+# Metrics endpoint
+@blueprint_main.route('/metrics', methods = ['GET'])
+def metrics():
+    """
+    Latency histograms of /curl per stage (with p50 / p95 / p99) and the result cache counters (of the model
+    selected as by /curl), in the Prometheus text format. Under gunicorn, each worker answers with its own.
+    """
+    try:
+        dict_cache = current_scoring_service().result_cache.stats()
+    except InvalidRequest as e:
+        return respond_with(e.message, e.status_code)
+    dict_counter = {'sentiment_result_cache_' + name + '_total': dict_cache[name]
+                    for name in ['hits', 'misses', 'evictions', 'invalidations']}
+
+    return Response(latency_metrics.exposition(dict_counter), mimetype = 'text/plain; version=0.0.4')
+
+
+# Admin endpoints
+@blueprint_main.route('/admin/model', methods = ['GET'])
+def admin_model():
+    '''
+    curl --header "X-Admin-Token: xxx" http://localhost:99/admin/model
+    '''
+
+    """
+    For every model served by this process: the model file & version, whether a load is running, and the history
+    of the loads (file, version, status, load time in ms). Under gunicorn, each worker answers with its own.
+    """
+    response = check_admin_token()
+    if response is not None:
         return response
-    else:
-        pass
 
-    # Text pre-processing & Prediction
-    dict_score = text_predict(sentence, model)
+    return jsonify(status = "complete", default_model = model_set.default_name, models = model_set.status())
 
-    # create and send a JSON response to the API caller
-    return jsonify(score = dict_score, status = "complete", sentence = sentence)
 
+@blueprint_main.route('/admin/model/reload', methods = ['POST'])
+def admin_model_reload():
+    '''
+    curl --header "X-Admin-Token: xxx" --header "Content-Type: application/json" \
+         --request POST --data '{"model_file":"sentiment_model_pickle"}'         \
+         http://localhost:99/admin/model/reload
+    '''
+
+    """
+    Load a model file in the background, and serve it once loaded, for the model selected as by /curl
+    (X-Model header or ?model=): its file (no body), or one of MODEL_FILES ({"model_file": "xxx"}).
+    Responds at once (202); GET /admin/model tells the outcome.
+    Under gunicorn, only the worker that receives the call reloads: replacing the model file on disk
+    reaches them all (the file is watched by every worker).
+    """
+    response = check_admin_token()
+    if response is not None:
+        return response
+
+    try:
+        registry     = current_registry()
+        dict_request = read_json_body(request, current_app.config['MAX_PAYLOAD_BYTES'])
+    except InvalidRequest as e:
+        return respond_with(e.message, e.status_code)
+
+    model_file = None
+    if dict_request:
+        if not isinstance(dict_request, dict) or list(dict_request.keys()) != ["model_file"]:
+            return respond_with("Failed to decode JSON object: Expecting only one key/value pair, "
+                                "with key of 'model_file'.")
+        model_file = dict_request["model_file"]
+        if model_file not in current_app.config['MODEL_FILES']:
+            return respond_with("Unknown model file. Expecting one of " +
+                                str(current_app.config['MODEL_FILES']) + ".")
+
+    if not registry.reload(model_file):
+        return respond_with("A model is already being loaded. Please try again later.", HTTP_CONFLICT)
+
+    response             = jsonify(status = "loading", model_file = model_file or registry.filename)
+    response.status_code = 202
+    return response
 
 
 # UI API endpoint
-@app.route('/', methods = ['GET', 'POST'])
+@blueprint_main.route('/', methods = ['GET', 'POST'])
 def index():
     """
     to return floats for sentiment strength based on the input sentence
@@ -187,8 +352,16 @@ def index():
 
         sentence = request.form.get('sentence')
 
+        # the model selected by ?model=xxx, if any
+        try:
+            service = current_scoring_service()
+        except InvalidRequest as e:
+            flash(e.message, category = "danger")
+            return render_template('index.html', title = title, form = form)
+
         # Text pre-processing & Prediction
-        dict_score = text_predict(sentence, model)
+        model      = service.model
+        dict_score = service.score(sentence)
 
         # Format output result
         if type(model) is SentimentIntensityAnalyzer:
@@ -198,26 +371,99 @@ def index():
                              "Compound: " + str(dict_score["compound"])      
                              #+ \
                              #"  (Sentiment Intensity Analyzer)"
+            if 'label' in dict_score:
+                str_prediction += "  |  Score: " + dict_score['label']
 
-        elif type(model) is Pipeline and type(model['clf']) is LogisticRegression:
+        elif (type(model) is Pipeline and type(model['clf']) is LogisticRegression) or \
+             type(model) is MappedLinearModel:
             str_prediction = "Score: " + str(dict_score['score']) + \
                              " (Logistic Regressor)"
 
+        elif type(model) is Pipeline and type(model['clf']) is SGDClassifier:
+            str_prediction = "Score: " + str(dict_score['score']) + \
+                             " (online SGD classifier)"
+
         flash(str_prediction, category = "success")
 
     return render_template('index.html', title = title, form = form)
 
 
-# Helper Methods
-def respond_with(message):
-    response = jsonify(status        = "error",
-                       status_code   = str(HTTP_BAD_REQUEST) + " - Bad Request",
-                       error_message = message)
-    # set the status code to 400
-    response.status_code = HTTP_BAD_REQUEST
-    return response
+def check_admin_token():
+    """
+    None if the request carries the admin token, otherwise the error response
+    """
+    admin_token = current_app.config['ADMIN_TOKEN']
+    if not admin_token:
+        return respond_with("Admin endpoints are disabled. Set ADMIN_TOKEN to enable them.", HTTP_FORBIDDEN)
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), admin_token):
+        return respond_with("Invalid or missing X-Admin-Token header.", HTTP_FORBIDDEN)
+    return None
+
+
+def read_ndjson_sentences(stream, max_line_size):
+    """
+    to yield the "sentence" of every non-blank line of a newline-delimited JSON stream, or an InvalidLine
+
+    At most max_line_size bytes of a line are held in memory: the rest of a longer line is skipped.
+    """
+    while True:
+        line = stream.readline(max_line_size + 1)
+        if not line:
+            return
+
+        if len(line) > max_line_size and not line.endswith(b'\n'):
+            # skip to the end of the line, without keeping it
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_line_size + 1)
+            yield InvalidLine(None, "Line too long. Expecting at most " + str(max_line_size) + " bytes per line.")
+            continue
+
+        if not line.strip():
+            continue
+
+        try:
+            dict_line = json.loads(line.decode('utf-8'))
+        except ValueError as e:   # UnicodeDecodeError & JSONDecodeError
+            yield InvalidLine(None, "Failed to decode JSON object: " + str(e))
+            continue
+
+        if not isinstance(dict_line, dict) or list(dict_line.keys()) != ["sentence"]:
+            yield InvalidLine(None, "Failed to decode JSON object: Expecting only one key/value pair, "
+                                    "with key of 'sentence'.")
+        else:
+            yield dict_line["sentence"]
+
+
+def ndjson_lines(list_result):
+    """
+    to serialize results as newline-delimited JSON, as jsonify would serialize each of them
+    """
+    return "".join(json.dumps(result, sort_keys = True) + "\n" for result in list_result)
+
+
+# App factory
+def create_app(config_object = Config):
+    """
+    to build the Flask app; the models (model & result cache of each) are shared by all the apps of a process
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+    bootstrap.init_app(app)
+    latency_metrics.enabled = app.config['METRICS_ENABLED']
+    app.extensions['model_set'] = model_set
+
+    # Register blueprints in app
+    app.register_blueprint(blueprint_main)
+    app.register_blueprint(blueprint_swagger)
+
+    return app
+
+
+app = create_app()
 
 
 if __name__ == '__main__':
-    app.run(debug = True, port = 99, host ='0.0.0.0')
+    # Werkzeug development server, for local use only
+    # production: gunicorn --config gunicorn.conf.py wsgi:application
+    app.run(debug = os.environ.get('FLASK_DEBUG') == '1', port = 99, host ='0.0.0.0')
     # using host: can access from other PC, otherwise local host
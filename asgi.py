@@ -0,0 +1,172 @@
+"""
+ASGI entry point: /curl served by asyncio, with concurrent requests scored together in micro-batches
+
+Only /curl is served here (same request & response as the Flask endpoint); the other routes are served
+by the WSGI app (wsgi.py).
+
+in project dir, run:
+$ uvicorn asgi:application --host 0.0.0.0 --port 99 --http h11 --loop asyncio
+
+MICROBATCH_MAX_SIZE & MICROBATCH_MAX_WAIT_US (see form_utilities/config.py) set the batches. A request selects
+one of the models served (MODELS) by the X-Model header or ?model=xxx, as for the Flask /curl; every model has
+its own batches.
+"""
+
+import json
+
+from urllib.parse          import parse_qs
+
+from app                   import app_logger, model_set
+from form_utilities.config import Config
+from utilities.batching    import MicroBatcher
+from utilities.validation  import InvalidRequest, HTTP_BAD_REQUEST, HTTP_PAYLOAD_TOO_LARGE, HTTP_STATUS_TEXT
+
+
+HTTP_OK        = 200
+HTTP_NOT_FOUND = 404
+
+HTTP_STATUS_TEXT_ALL = {**HTTP_STATUS_TEXT, HTTP_NOT_FOUND: "Not Found"}
+
+# returned by read_body for a body larger than allowed
+BODY_TOO_LARGE       = object()
+
+
+def error_body(message, status_code):
+    """
+    the body of respond_with (utilities/validation.py)
+    """
+    return {"status":        "error",
+            "status_code":   str(status_code) + " - " + HTTP_STATUS_TEXT_ALL[status_code],
+            "error_message": message}
+
+
+async def send_json(send, status_code, dict_body):
+    # as jsonify: sorted keys, compact, with a trailing newline
+    body = (json.dumps(dict_body, sort_keys = True, separators = (',', ':')) + "\n").encode('utf-8')
+    await send({'type':    'http.response.start',
+                'status':  status_code,
+                'headers': [(b'content-type',   b'application/json'),
+                            (b'content-length', str(len(body)).encode('ascii'))]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def read_body(receive, max_bytes):
+    """
+    the request body; BODY_TOO_LARGE as soon as it is larger than max_bytes, or None if the client disconnected
+    """
+    list_chunk = []
+    size       = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > max_bytes:
+            return BODY_TOO_LARGE
+        list_chunk.append(chunk)
+        if not message.get('more_body', False):
+            return b"".join(list_chunk)
+
+
+def requested_model(scope):
+    """
+    the model name selected by a request (X-Model header, or ?model=), or None
+    """
+    name = dict(scope['headers']).get(b'x-model')
+    if name:
+        return name.decode('latin-1')
+    return parse_qs(scope.get('query_string', b'').decode('latin-1')).get('model', [None])[0]
+
+
+def create_asgi_app(model_set, max_batch_size, max_wait_us, max_payload_bytes = Config.MAX_PAYLOAD_BYTES):
+
+    """
+    Build the ASGI app of /curl
+
+      model_set          ModelSet        the models served (see utilities/model_registry.py): validation,
+                                         result cache & model of each
+      max_batch_size     int             largest micro-batch
+      max_wait_us        int             longest wait of the first request of a micro-batch, in microseconds
+      max_payload_bytes  int             largest JSON body
+    """
+
+    def batch_scorer(registry):
+        def score_sentences(list_sentence):
+            # a batch is scored with the version of the model served when it is dispatched
+            return registry.service.score_sentences(list_sentence)
+        return score_sentences
+
+    # one dispatcher per model
+    dict_batcher = {name: MicroBatcher(batch_scorer(registry), max_batch_size, max_wait_us)
+                    for name, registry in model_set.dict_registry.items()}
+
+    async def application(scope, receive, send):
+
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    for name, batcher in dict_batcher.items():
+                        batcher.start()
+                        app_logger.info('micro-batching of %s: %s', name, batcher)
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    for batcher in dict_batcher.values():
+                        await batcher.stop()
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+
+        if scope['type'] != 'http':
+            return
+        if scope['path'] != '/curl' or scope['method'] not in ('GET', 'POST'):
+            await send_json(send, HTTP_NOT_FOUND, error_body("Only /curl is served by the ASGI app.", HTTP_NOT_FOUND))
+            return
+
+        # the model selected by the request
+        try:
+            name     = requested_model(scope)
+            registry = model_set.registry(name)
+        except InvalidRequest as e:
+            await send_json(send, e.status_code, error_body(e.message, e.status_code))
+            return
+        batcher = dict_batcher[model_set.default_name if name is None else name]
+
+        # the body is read up to max_payload_bytes only, and decoded as JSON if sent as JSON
+        body = await read_body(receive, max_payload_bytes)
+        if body is None:
+            # the client is gone: no one to respond to
+            return
+        if body is BODY_TOO_LARGE:
+            message = "Payload too large. Expecting at most " + str(max_payload_bytes) + " bytes."
+            await send_json(send, HTTP_PAYLOAD_TOO_LARGE, error_body(message, HTTP_PAYLOAD_TOO_LARGE))
+            return
+
+        content_type = dict(scope['headers']).get(b'content-type', b'').split(b';')[0].strip()
+        dict_request = None
+        if content_type == b'application/json' or content_type.endswith(b'+json'):
+            try:
+                dict_request = json.loads(body)
+            except ValueError as e:   # UnicodeDecodeError & JSONDecodeError
+                message = "Failed to decode JSON object: " + str(e)
+                await send_json(send, HTTP_BAD_REQUEST, error_body(message, HTTP_BAD_REQUEST))
+                return
+
+        # raise error if failed to decode JSON object, or if the input sentence is not valid
+        message = registry.service.check_request(dict_request)
+        if message is not None:
+            await send_json(send, HTTP_BAD_REQUEST, error_body(message, HTTP_BAD_REQUEST))
+            return
+
+        # Text pre-processing & Prediction, in a micro-batch with the concurrent requests
+        sentence   = dict_request["sentence"]
+        dict_score = await batcher.submit(sentence)
+
+        await send_json(send, HTTP_OK, dict(score = dict_score, status = "complete", sentence = sentence))
+
+    application.batchers = dict_batcher
+    application.batcher  = dict_batcher[model_set.default_name]
+    return application
+
+
+application = create_asgi_app(model_set, Config.MICROBATCH_MAX_SIZE, Config.MICROBATCH_MAX_WAIT_US)
@@ -0,0 +1,192 @@
+"""
+Offline bulk scoring of a text file, with a pool of worker processes
+
+The input is read in chunks, never as a whole: either the SST format (__label__N<TAB>text, as sst_train.txt)
+or plain text, one sentence per line. Every worker process loads the model file once, and scores whole
+chunks with text_predict_batch (the same pre-processing and scores as the API). The results are written
+as they come, in input order, one JSON object per input line:
+  {"truth": N, "score": {...}}   SST format
+  {"score": {...}}               plain text
+
+in project dir, run:
+$ python batch_score.py sst_train.txt scores.ndjson --workers 4
+$ python batch_score.py --help
+"""
+
+import argparse
+import collections
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+from form_utilities.config    import Config
+from utilities.model_file     import load_model_file
+from utilities.nltk_resources import load_nltk_resources
+from utilities.sst_format     import SST_LABEL_PREFIX, parse_sst_line
+
+
+# Logging setting
+logging.basicConfig(level  = logging.INFO,
+                    format = "%(asctime)s  %(levelname)8s  %(filename)12s  %(funcName)12s  %(lineno)4d  %(message)s")
+batch_logger = logging.getLogger("batch_logger")
+
+# the text_predict_batch of the model of this process, resolved once by init_worker
+worker_predict_batch = None
+
+# the exception raised by init_pool_worker, raised again by score_chunk
+worker_error         = None
+
+
+def init_worker(model_file):
+    """
+    to load the NLTK resources and the model file, once per worker process
+    raise ValueError for a model that text_predict_batch does not score
+    """
+    global worker_predict_batch
+    load_nltk_resources(Config.NLTK_DATA_DIR, Config.NLTK_RESOURCES, batch_logger)
+    # imported once NLTK is pointed at the data directory: it may read the stopwords at import
+    from utilities.text import is_scoring_model, resolve_predict
+
+    model = load_model_file(model_file, batch_logger)['model']
+    if not is_scoring_model(model):
+        raise ValueError('the model of ' + str(model_file) + ' cannot score text: ' + str(type(model)))
+    worker_predict_batch = resolve_predict(model)[1]
+
+
+def init_pool_worker(model_file):
+    """
+    init_worker in a worker process of the pool: an exception of a pool initializer is not sent to the parent
+    (the pool starts another worker instead, again and again), so it is raised by the chunks sent to the worker
+    """
+    global worker_error
+    try:
+        init_worker(model_file)
+    except Exception as e:
+        worker_error = e
+
+
+def score_chunk(list_line):
+    """
+    to score a chunk of (truth, text) lines in the worker process; returns the output lines, joined
+    """
+    if worker_error is not None:
+        raise worker_error
+
+    list_dict_score = worker_predict_batch([text for _, text in list_line])
+
+    list_output = []
+    for (truth, _), dict_score in zip(list_line, list_dict_score):
+        if truth is None:
+            list_output.append(json.dumps({'score': dict_score}, sort_keys = True))
+        else:
+            list_output.append(json.dumps({'truth': truth, 'score': dict_score}, sort_keys = True))
+    return "\n".join(list_output) + "\n"
+
+
+def read_lines(f, input_format):
+    """
+    to yield (truth, text) for every line of f; truth is None for plain text
+    """
+    for line_number, line in enumerate(f, start = 1):
+        line = line.rstrip('\n')
+        if input_format == 'plain':
+            yield None, line
+            continue
+
+        yield parse_sst_line(line, line_number)
+
+
+def detect_format(file_name):
+    """
+    'sst' if the first line is in the __label__N<TAB>text format, 'plain' otherwise
+    """
+    with open(file_name, encoding = 'utf-8') as f:
+        first_line = f.readline()
+    label, tab, _ = first_line.partition('\t')
+    return 'sst' if tab and label.startswith(SST_LABEL_PREFIX) else 'plain'
+
+
+def read_chunks(f, input_format, chunk_size):
+    lines = read_lines(f, input_format)
+    while True:
+        list_line = list(itertools.islice(lines, chunk_size))
+        if not list_line:
+            return
+        yield list_line
+
+
+def batch_score(input_file, output_file, model_file,
+                input_format = 'auto',
+                workers      = os.cpu_count(),
+                chunk_size   = 2000):
+
+    """
+    Score every line of input_file, and write the results to output_file
+
+      input_file    str  text file to score
+      output_file   str  NDJSON file, one result per input line, in input order
+      model_file    str  model file, as loaded by app.py
+      input_format  str  'sst', 'plain' or 'auto' (from the first line)
+      workers       int  worker processes; 1 scores in this process
+      chunk_size    int  lines per task sent to a worker
+
+    At most 2 chunks per worker are read ahead of the output, so that memory does not depend on the file size.
+
+    return the number of lines scored
+    """
+
+    if input_format == 'auto':
+        input_format = detect_format(input_file)
+    batch_logger.info('input: ' + str(input_file) + ' (' + input_format + '), workers: ' + str(workers))
+
+    n_lines = 0
+    with open(input_file, encoding = 'utf-8') as f_in, open(output_file, 'w', encoding = 'utf-8') as f_out:
+        chunks = read_chunks(f_in, input_format, chunk_size)
+
+        if workers == 1:
+            init_worker(model_file)
+            for list_line in chunks:
+                f_out.write(score_chunk(list_line))
+                n_lines += len(list_line)
+            return n_lines
+
+        with multiprocessing.Pool(workers, initializer = init_pool_worker, initargs = (model_file,)) as pool:
+            # results of the submitted chunks, oldest first: written in input order
+            pending = collections.deque()
+            for list_line in chunks:
+                if len(pending) == 2 * workers:
+                    f_out.write(pending.popleft().get())
+                pending.append(pool.apply_async(score_chunk, (list_line,)))
+                n_lines += len(list_line)
+            while pending:
+                f_out.write(pending.popleft().get())
+
+    return n_lines
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description = 'Score a text file with a sentiment model, in parallel.')
+    parser.add_argument('input_file',   help = 'file to score: SST format (__label__N<TAB>text) or plain text')
+    parser.add_argument('output_file',  help = 'NDJSON file for the results, one line per input line')
+    parser.add_argument('--model',      default = 'sentiment_model_pickle_default_sia', help = 'model file')
+    parser.add_argument('--format',     default = 'auto', choices = ['auto', 'sst', 'plain'], dest = 'input_format')
+    parser.add_argument('--workers',    default = os.cpu_count(), type = int, help = 'worker processes')
+    parser.add_argument('--chunk-size', default = 2000, type = int, help = 'lines per task sent to a worker')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        n_lines = batch_score(args.input_file, args.output_file, args.model,
+                              input_format = args.input_format,
+                              workers      = args.workers,
+                              chunk_size   = args.chunk_size)
+    except (LookupError, ValueError) as e:
+        sys.exit(str(e))
+    seconds = time.perf_counter() - start
+
+    batch_logger.info('{} lines scored in {:.1f} s ({:.0f} lines/s)'.format(n_lines, seconds, n_lines / seconds))
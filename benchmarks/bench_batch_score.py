@@ -0,0 +1,49 @@
+"""
+Throughput scaling of batch_score.py from 1 to N worker processes
+
+Replicates sst_train.txt to --lines lines in a temporary directory, scores it with batch_score
+for every number of workers, and checks that every run writes the same output.
+
+in project dir, run:
+$ python -m benchmarks.bench_batch_score --lines 3000000
+"""
+
+import argparse
+import filecmp
+import os
+import tempfile
+import time
+
+from batch_score import batch_score
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines',   default = 3000000, type = int, help = 'lines of the replicated file')
+    parser.add_argument('--workers', default = os.cpu_count(), type = int, help = 'up to this many workers')
+    parser.add_argument('--model',   default = 'sentiment_model_pickle_default_sia')
+    args = parser.parse_args()
+
+    with open('sst_train.txt', encoding = 'utf-8') as f:
+        list_line = f.readlines()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_file = os.path.join(tmp_dir, 'sst_train_replicated.txt')
+        with open(input_file, 'w', encoding = 'utf-8') as f:
+            for i in range(args.lines):
+                f.write(list_line[i % len(list_line)])
+
+        list_workers = sorted({1, 2, 4, 8, args.workers} & set(range(1, args.workers + 1)))
+        first_output = None
+        for workers in list_workers:
+            output_file = os.path.join(tmp_dir, 'scores_' + str(workers) + '.ndjson')
+            start       = time.perf_counter()
+            n_lines     = batch_score(input_file, output_file, args.model, workers = workers)
+            seconds     = time.perf_counter() - start
+
+            if first_output is None:
+                first_output, first_seconds = output_file, seconds
+            assert filecmp.cmp(first_output, output_file, shallow = False)
+            print('workers {:2d}   {:8d} lines   {:7.1f} s   {:8.0f} lines/s   speed-up {:4.2f}x'.format(
+                  workers, n_lines, seconds, n_lines / seconds, first_seconds / seconds))
@@ -0,0 +1,45 @@
+"""
+Benchmark of the DataFrame pre-processing (df_preprocessing, Base.read_data) on the three SST splits:
+row by row (df['text'].apply(text_preprocessing)) vs column-wise (Preprocessor.transform)
+
+in project dir, run:
+$ python -m benchmarks.bench_df_preprocessing
+"""
+
+import timeit
+
+import pandas as pd
+
+from utilities.text import text_preprocessing, Preprocessor
+
+
+list_data_file = ['sst_train.txt', 'sst_dev.txt', 'sst_test.txt']
+
+# flag combinations to compare; all the seven flags follow the order of text_preprocessing
+dict_flags = {'all flags on':       (True,  True,  True, True,  True,  True,  True),
+              'all but stop words': (True,  True,  True, True,  True,  False, True),
+              'html tags only':     (False, False, True, False, False, False, False)}
+
+
+def best_seconds(function, repeat = 3):
+    return min(timeit.repeat(function, number = 1, repeat = repeat))
+
+
+if __name__ == '__main__':
+
+    print('{:15s}  {:20s}  {:>6s}  {:>11s}  {:>11s}  {:>8s}'.format('file', 'flags', 'rows',
+                                                                   'row-wise s', 'column s', 'speed-up'))
+
+    for data_file in list_data_file:
+        series = pd.read_csv(data_file, sep = '\t', header = None, names = ['truth', 'text'])['text']
+
+        for name, flags in dict_flags.items():
+            preprocessor = Preprocessor(*flags)
+
+            # the two must agree before their speed is worth comparing
+            assert preprocessor.transform(series).equals(series.apply(lambda x: text_preprocessing(x, *flags)))
+
+            before = best_seconds(lambda: series.apply(lambda x: text_preprocessing(x, *flags)))
+            after  = best_seconds(lambda: preprocessor.transform(series))
+            print('{:15s}  {:20s}  {:6d}  {:11.3f}  {:11.3f}  {:7.1f}x'.format(data_file, name, len(series),
+                                                                             before, after, before / after))
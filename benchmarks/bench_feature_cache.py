@@ -0,0 +1,49 @@
+"""
+Benchmark of the feature cache (utilities/feature_cache.py): the features of the train, dev & test sets
+vectorized from text (fit & transform of the vect & tfidf steps) vs read back from the cache (memory-mapped),
+next to the time of the classifier fit they feed
+
+in project dir, run:
+$ python -m benchmarks.bench_feature_cache
+"""
+
+import tempfile
+import timeit
+
+from utilities.feature_cache import FeatureCache
+from utilities.pipeline      import VECTORIZERS, build_pipeline
+from utilities.training_data import read_sst
+
+
+def best_seconds(function, repeat = 5):
+    return min(timeit.repeat(function, number = 1, repeat = repeat))
+
+
+def vectorize(vectorizer, df_train, list_df):
+    features = build_pipeline(vectorizer)[:-1]
+    x_train  = features.fit_transform(df_train['text'])
+    return x_train, [features.transform(df['text']) for df in list_df]
+
+
+def read_cache(vectorizer, df_train, list_df, cache_dir):
+    feature_cache = FeatureCache(build_pipeline(vectorizer)[:-1], df_train['text'], cache_dir)
+    return feature_cache.x_train, [feature_cache.transform(df['text']) for df in list_df]
+
+
+if __name__ == '__main__':
+
+    df_train = read_sst('sst_train.txt')
+    list_df  = [read_sst('sst_dev.txt'), read_sst('sst_test.txt')]
+
+    print('{:10s}  {:>13s}  {:>13s}  {:>8s}  {:>13s}'.format('vectorizer', 'from text s', 'from cache s',
+                                                            'speed-up', 'clf fit s'))
+    for vectorizer in VECTORIZERS:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            x_train, _ = read_cache(vectorizer, df_train, list_df, cache_dir)   # fills the cache
+
+            before = best_seconds(lambda: vectorize(vectorizer, df_train, list_df))
+            after  = best_seconds(lambda: read_cache(vectorizer, df_train, list_df, cache_dir))
+            fit    = best_seconds(lambda: build_pipeline(vectorizer)['clf'].fit(x_train, df_train['truth']),
+                                  repeat = 3)
+            print('{:10s}  {:13.3f}  {:13.3f}  {:7.1f}x  {:13.3f}'.format(vectorizer, before, after,
+                                                                        before / after, fit))
@@ -0,0 +1,69 @@
+"""
+Benchmark of the Logistic Regression pipelines (utilities/pipeline.py): CountVectorizer (vocabulary) vs
+HashingVectorizer (no vocabulary), at a few hashing widths
+
+Each pipeline is trained on sst_train.txt and saved in a temporary directory, pickled and mapped
+(utilities/mapped_model.py), then, for each file, in a fresh process (see bench_model_file.py): load time, private memory added by the load, and single-sentence prediction
+latency on sst_test.txt; and the accuracy & macro F1 of those predictions.
+
+in project dir, run:
+$ python -m benchmarks.bench_hashing
+"""
+
+import logging
+import os
+import statistics
+import tempfile
+
+import pandas as pd
+
+from sklearn.metrics            import accuracy_score, f1_score
+from benchmarks.bench_model_file import run_child
+from utilities.model_file       import save_model_file
+from utilities.pipeline         import build_pipeline
+
+
+# (name, vectorizer, n_features)
+list_variant = [('count',         'count',   None),
+                ('hashing 2^16',  'hashing', 2 ** 16),
+                ('hashing 2^18',  'hashing', 2 ** 18),
+                ('hashing 2^20',  'hashing', 2 ** 20)]
+
+
+def read_sst(file_name):
+    return pd.read_csv(file_name, sep = '\t', header = None, names = ['truth', 'text'])
+
+
+if __name__ == '__main__':
+
+    logger   = logging.getLogger("bench_logger")
+    df_train = read_sst('sst_train.txt')
+    truth    = [label.replace('__label__', '') for label in read_sst('sst_test.txt')['truth']]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print('{:13s}  {:6s}  {:>10s}  {:>10s}  {:>12s}  {:>12s}  {:>8s}  {:>8s}'.format(
+            'vectorizer', 'format', 'size (KiB)', 'load (ms)', 'private KiB', 'us/sentence', 'accuracy', 'macro F1'))
+
+        for name, vectorizer, n_features in list_variant:
+            if n_features is None:
+                pipeline = build_pipeline(vectorizer)
+            else:
+                pipeline = build_pipeline(vectorizer, n_features)
+            pipeline.fit(df_train['text'], df_train['truth'].str.replace('__label__', '').astype(int))
+
+            for file_format in ['pickle', 'mapped']:
+                filename = os.path.join(tmp_dir, 'sentiment_model_' + vectorizer + str(n_features) + file_format)
+                save_model_file(filename, pipeline, type(pipeline), 'sentiment-analysis', 'bench', 'train', logger,
+                                file_format = file_format)
+
+                list_result = run_child(filename)
+                pred        = list_result[0]['pred']
+                print('{:13s}  {:6s}  {:10.0f}  {:10.2f}  {:12.0f}  {:12.1f}  {:8.4f}  {:8.4f}'.format(
+                    name,
+                    file_format,
+                    os.path.getsize(filename) / 1024,
+                    1000 * statistics.median(result['load_s']          for result in list_result),
+                    statistics.median(result['private_kib']            for result in list_result),
+                    statistics.median(result['us_per_sentence']        for result in list_result),
+                    accuracy_score(truth, pred),
+                    f1_score(truth, pred, average = 'macro')))
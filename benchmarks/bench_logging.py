@@ -0,0 +1,74 @@
+"""
+Throughput of /curl under each logging setting (LOG_MODE, LOG_SAMPLE_RATES), with stderr written to a file
+
+Every setting runs in a fresh process: sst_test.txt sentences posted one by one through the Flask test client.
+
+in project dir, run:
+$ python -m benchmarks.bench_logging
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+
+# (name, LOG_MODE, LOG_SAMPLE_RATES)
+list_setting = [('plain, every record',            'plain',      ''),
+                ('structured, every record',       'structured', ''),
+                ('structured, /curl sampled 1%',   'structured', 'main.curl_scoring=0.01'),
+                ('logging off (lower bound)',      'plain',      'main.curl_scoring=0')]
+
+child = '''
+import json, sys, time
+import pandas as pd
+from app import app, model_set
+
+model_set.default.service.result_cache.capacity = 0   # every request scored
+list_text = list(pd.read_csv('sst_test.txt', sep = '\\t', header = None, names = ['truth', 'text'])['text'])
+with app.test_client() as client:
+    list_seconds = []
+    for _ in range(3):
+        start = time.perf_counter()
+        for text in list_text:
+            client.post('/curl', json = {'sentence': text})
+        list_seconds.append(time.perf_counter() - start)
+
+# cost of the two INFO records of a /curl request, on the request thread
+from app import app_logger
+dict_request = {'sentence': list_text[0]}
+with app.test_request_context('/curl', method = 'POST'):
+    start = time.perf_counter()
+    for _ in range(20000):
+        app_logger.info('dict_request:      %s', dict_request)
+        app_logger.info('dict_request type: %s', type(dict_request))
+    us_per_request = (time.perf_counter() - start) / 20000 * 1e6
+
+print(json.dumps({'requests_per_s': len(list_text) / min(list_seconds), 'us_per_request': us_per_request}))
+'''
+
+
+if __name__ == '__main__':
+
+    # settings run in turn, rounds times, so that they all see the same machine noise; best run kept
+    rounds      = 3
+    dict_result = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for _ in range(rounds):
+            for name, mode, sample_rates in list_setting:
+                env = dict(os.environ, LOG_MODE = mode, LOG_SAMPLE_RATES = sample_rates)
+                with open(os.path.join(tmp_dir, 'stderr.log'), 'w') as f_err:
+                    output = subprocess.run([sys.executable, '-c', child],
+                                            env    = env,
+                                            stdout = subprocess.PIPE,
+                                            stderr = f_err,
+                                            check  = True).stdout
+                result            = json.loads(output)
+                best              = dict_result.get(name, {'requests_per_s': 0, 'us_per_request': float('inf')})
+                dict_result[name] = {'requests_per_s': max(best['requests_per_s'], result['requests_per_s']),
+                                     'us_per_request': min(best['us_per_request'], result['us_per_request'])}
+
+    for name, _, _ in list_setting:
+        print('{:32s} {:8.0f} requests/s   logging {:6.2f} us per request'.format(
+              name, dict_result[name]['requests_per_s'], dict_result[name]['us_per_request']))
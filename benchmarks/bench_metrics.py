@@ -0,0 +1,68 @@
+"""
+Overhead of the latency metrics (utilities/metrics.py)
+
+  - one LatencyMetrics.observe call
+  - pre-processing of sst_test.txt with every stage on: Preprocessor.__call__ vs Preprocessor.timed
+  - /curl requests through the Flask test client (result cache off), metrics on vs off
+
+in project dir, run:
+$ python -m benchmarks.bench_metrics
+"""
+
+import logging
+import timeit
+
+import pandas as pd
+
+import app as app_module
+
+from utilities.metrics import LatencyMetrics
+from utilities.text    import Preprocessor
+
+
+def best_of(fn, repeat = 5):
+    return min(timeit.repeat(fn, number = 1, repeat = repeat))
+
+
+def compare(fn_off, fn_on, rounds = 10):
+    """
+    best time of each, measured in alternation so that both see the same machine noise
+    """
+    list_off, list_on = [], []
+    for _ in range(rounds):
+        list_off.append(best_of(fn_off, repeat = 1))
+        list_on.append(best_of(fn_on, repeat = 1))
+    return min(list_off), min(list_on)
+
+
+if __name__ == '__main__':
+
+    list_text = list(pd.read_csv('sst_test.txt', sep = '\t', header = None, names = ['truth', 'text'])['text'])
+
+    # one observation
+    metrics = LatencyMetrics()
+    n       = 200000
+    seconds = best_of(lambda: [metrics.observe('stage', 1e-4) for _ in range(n)])
+    print('observe                         {:6.3f} us per call'.format(seconds / n * 1e6))
+
+    # every pre-processing stage, with & without timing
+    preprocessor = Preprocessor()
+    plain, timed = compare(lambda: [preprocessor(text) for text in list_text],
+                           lambda: [preprocessor.timed(text, metrics) for text in list_text])
+    print('pre-processing, all stages      {:6.1f} us -> {:6.1f} us per sentence   ({:+.1f}%)'.format(
+          plain / len(list_text) * 1e6, timed / len(list_text) * 1e6, (timed / plain - 1) * 100))
+
+    # /curl end to end, every request a cache miss; without the INFO log lines, which would dominate
+    logging.disable(logging.INFO)
+    app_module.model_set.default.service.result_cache.capacity = 0
+    list_payload = [{'sentence': text} for text in list_text]
+    with app_module.app.test_client() as client:
+        def requests(enabled):
+            app_module.latency_metrics.enabled = enabled
+            for payload in list_payload:
+                client.post('/curl', json = payload)
+
+        seconds_off, seconds_on = compare(lambda: requests(False), lambda: requests(True))
+
+    print('/curl request                   {:6.1f} us -> {:6.1f} us per request    ({:+.1f}%)'.format(
+          seconds_off / len(list_text) * 1e6, seconds_on / len(list_text) * 1e6, (seconds_on / seconds_off - 1) * 100))
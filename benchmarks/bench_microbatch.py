@@ -0,0 +1,99 @@
+"""
+Latency & throughput of the ASGI /curl (asgi.py) at varied concurrency, without and with micro-batching
+
+The ASGI app is called in-process (no network) by `concurrency` client coroutines, each sending sst_test.txt
+sentences one request after the other; the result cache is off. Run for the Logistic Regression pipeline
+(trained on sst_train.txt) and for the VADER model file.
+
+in project dir, run:
+$ python -m benchmarks.bench_microbatch
+"""
+
+import asyncio
+import json
+import logging
+import statistics
+import time
+
+import pandas as pd
+
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+from sklearn.linear_model            import LogisticRegression
+from sklearn.pipeline                import Pipeline
+
+from asgi                     import create_asgi_app
+from form_utilities.config    import Config
+from utilities.model_file     import load_model_file
+from utilities.model_registry import ModelRegistry, ModelSet
+
+
+list_concurrency = [1, 4, 16, 64, 256]
+n_requests       = 4000
+
+# (name, max_batch_size, max_wait_us)
+list_setting = [('no batching',  1,  0),
+                ('micro-batch', 64, 2000)]
+
+
+def read_sst(file_name):
+    return pd.read_csv(file_name, sep = '\t', header = None, names = ['truth', 'text'])
+
+
+async def run(application, list_body, concurrency):
+    """
+    requests/s and latencies (ms) of n_requests requests sent by concurrency clients
+    """
+    list_latency = []
+    counter      = iter(range(n_requests))
+
+    async def call(body):
+        list_message = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+        async def receive():
+            return list_message.pop(0)
+
+        async def send(message):
+            pass
+
+        await application({'type': 'http', 'path': '/curl', 'method': 'POST',
+                           'headers': [(b'content-type', b'application/json')]}, receive, send)
+
+    async def client():
+        for i in counter:
+            start = time.perf_counter()
+            await call(list_body[i % len(list_body)])
+            list_latency.append((time.perf_counter() - start) * 1e3)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    seconds = time.perf_counter() - start
+    await application.batcher.stop()
+
+    list_latency.sort()
+    return n_requests / seconds, statistics.median(list_latency), list_latency[int(len(list_latency) * 0.99)]
+
+
+if __name__ == '__main__':
+
+    logging.disable(logging.INFO)
+    df_train  = read_sst('sst_train.txt')
+    list_body = [json.dumps({'sentence': text}).encode('utf-8') for text in read_sst('sst_test.txt')['text']]
+
+    dict_model = {
+        'Logistic Regression': Pipeline([('vect',  CountVectorizer()),
+                                         ('tfidf', TfidfTransformer()),
+                                         ('clf',   LogisticRegression(solver = 'liblinear'))]).fit(df_train['text'],
+                                                                                                   df_train['truth']),
+        'VADER':               load_model_file('sentiment_model_pickle_default_sia', logging.getLogger())['model'],
+    }
+
+    for model_name, model in dict_model.items():
+        print(model_name)
+        print('  {:12s} {:>11s} {:>12s} {:>9s} {:>9s}'.format('', 'concurrency', 'requests/s', 'p50 ms', 'p99 ms'))
+        for setting_name, max_batch_size, max_wait_us in list_setting:
+            for concurrency in list_concurrency:
+                registry    = ModelRegistry(0, Config.MAX_SENTENCE_LENGTH, logging.getLogger())
+                registry.set_model(model, 'bench')
+                application = create_asgi_app(ModelSet({'bench': registry}, 'bench'), max_batch_size, max_wait_us)
+                throughput, p50, p99 = asyncio.run(run(application, list_body, concurrency))
+                print('  {:12s} {:11d} {:12.0f} {:9.2f} {:9.2f}'.format(setting_name, concurrency, throughput, p50, p99))
@@ -0,0 +1,72 @@
+"""
+Per-request cost of selecting one of N models served side by side (utilities/model_registry.py), as N grows
+
+For N models (alternately VADER and Logistic Regression trained on sst_dev.txt, each its own registry):
+  select     current_scoring_service() in a request context with an X-Model header
+  /curl      a whole /curl request (Flask test client, result caches off), X-Model rotating over the N models
+and, once: the per-call cost of text_predict (model type looked up on every call) vs the resolved predict
+function of a ScoringService.
+
+in project dir, run:
+$ python -m benchmarks.bench_model_dispatch
+"""
+
+import json
+import logging
+import timeit
+
+import pandas as pd
+
+from app                      import app, model_set
+from form_utilities.config    import Config
+from utilities.model_registry import ModelRegistry, ModelSet, current_scoring_service
+from utilities.pipeline       import build_pipeline
+from utilities.text           import text_predict
+
+
+list_n_models = [1, 2, 4, 8, 16, 32, 64]
+n_requests    = 2000
+sentence      = "The acting is great, but the plot is thin."
+
+
+def best_us(function, number, repeat = 5):
+    return min(timeit.repeat(function, number = number, repeat = repeat)) / number * 1e6
+
+
+if __name__ == '__main__':
+
+    logging.disable(logging.INFO)
+    df       = pd.read_csv('sst_dev.txt', sep = '\t', header = None, names = ['truth', 'text'])
+    pipeline = build_pipeline().fit(df['text'], df['truth'])
+    vader    = model_set.default.service.model
+    body     = json.dumps({'sentence': sentence})
+
+    print('{:>8s}  {:>12s}  {:>12s}'.format('models', 'select (us)', '/curl (us)'))
+    for n_models in list_n_models:
+        dict_registry = {}
+        for i in range(n_models):
+            registry = ModelRegistry(0, Config.MAX_SENTENCE_LENGTH, logging.getLogger())
+            registry.set_model(vader if i % 2 == 0 else pipeline, 'model_' + str(i))
+            dict_registry['model_' + str(i)] = registry
+        app.extensions['model_set'] = ModelSet(dict_registry, 'model_0')
+        list_name = list(dict_registry)
+
+        with app.test_request_context('/curl', method = 'POST', headers = {'X-Model': list_name[-1]}):
+            select = best_us(current_scoring_service, number = 20000)
+
+        with app.test_client() as client:
+            list_headers = [{'X-Model': list_name[i % n_models]} for i in range(n_requests)]
+            iterator     = iter(list_headers * 10)
+            curl         = best_us(lambda: client.post('/curl', data = body, content_type = 'application/json',
+                                                       headers = next(iterator)),
+                                   number = n_requests, repeat = 3)
+
+        print('{:8d}  {:12.2f}  {:12.1f}'.format(n_models, select, curl))
+
+    app.extensions['model_set'] = model_set
+
+    service = dict_registry['model_1'].service
+    print()
+    print('{:34s}  {:>10s}'.format('LR, one sentence', 'us/call'))
+    print('{:34s}  {:10.1f}'.format('text_predict (type look-up)', best_us(lambda: text_predict(sentence, pipeline), 2000)))
+    print('{:34s}  {:10.1f}'.format('ScoringService.predict (resolved)', best_us(lambda: service.predict(sentence), 2000)))
@@ -0,0 +1,93 @@
+"""
+Benchmark of the model file formats: pickle vs mapped (utilities/mapped_model.py)
+
+Trains the Logistic Regression pipeline on sst_train.txt, saves it in both formats in a temporary directory,
+then for each format, in a fresh process: load time, private (per-worker) memory added by the load,
+and single-sentence prediction latency on sst_test.txt.
+
+in project dir, run:
+$ python -m benchmarks.bench_model_file
+"""
+
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+from sklearn.linear_model            import LogisticRegression
+from sklearn.pipeline                import Pipeline
+from utilities.model_file            import load_model_file, save_model_file
+
+
+# run in a fresh process for each format: prints load seconds, private KiB added, us per sentence
+child = '''
+import json, logging, sys, time
+import pandas as pd
+
+def private_kib():
+    # anonymous (not file backed) memory: what every worker would hold its own copy of
+    with open('/proc/self/status') as f:
+        return sum(int(line.split()[1]) for line in f if line.startswith('RssAnon'))
+
+from utilities.model_file import load_model_file
+list_text = list(pd.read_csv('sst_test.txt', sep = '\\t', header = None, names = ['truth', 'text'])['text'])
+
+before = private_kib()
+start  = time.perf_counter()
+model  = load_model_file(sys.argv[1], logging.getLogger())['model']
+load_s = time.perf_counter() - start
+after  = private_kib()
+
+start = time.perf_counter()
+pred  = [str(model.predict([text])[0]) for text in list_text]
+us    = (time.perf_counter() - start) / len(list_text) * 1e6
+
+print(json.dumps({'load_s': load_s, 'private_kib': after - before, 'us_per_sentence': us, 'pred': pred}))
+'''
+
+
+def run_child(filename, repeat = 5):
+    list_result = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', child, filename],
+                                stdout = subprocess.PIPE,
+                                stderr = subprocess.DEVNULL,
+                                check  = True,
+                                universal_newlines = True).stdout
+        list_result.append(json.loads(output.strip().splitlines()[-1]))
+    return list_result
+
+
+if __name__ == '__main__':
+
+    logger   = logging.getLogger("bench_logger")
+    df_train = pd.read_csv('sst_train.txt', sep = '\t', header = None, names = ['truth', 'text'])
+    pipeline = Pipeline([('vect',  CountVectorizer()),
+                         ('tfidf', TfidfTransformer()),
+                         ('clf',   LogisticRegression(solver = 'liblinear'))]).fit(df_train['text'], df_train['truth'])
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dict_pred = {}
+        print('{:8s}  {:>10s}  {:>10s}  {:>12s}  {:>12s}'.format('format', 'size (KiB)', 'load (ms)',
+                                                               'private KiB', 'us/sentence'))
+        for file_format in ['pickle', 'mapped']:
+            filename = os.path.join(tmp_dir, 'sentiment_model_' + file_format)
+            save_model_file(filename, pipeline, type(pipeline), 'sentiment-analysis', 'bench', 'train', logger,
+                            file_format = file_format)
+
+            list_result            = run_child(filename)
+            dict_pred[file_format] = list_result[0]['pred']
+            print('{:8s}  {:10.0f}  {:10.2f}  {:12.0f}  {:12.1f}'.format(
+                file_format,
+                os.path.getsize(filename) / 1024,
+                1000 * statistics.median(result['load_s']          for result in list_result),
+                statistics.median(result['private_kib']            for result in list_result),
+                statistics.median(result['us_per_sentence']        for result in list_result)))
+
+        print('same predictions on sst_test.txt:', dict_pred['pickle'] == dict_pred['mapped'])
@@ -0,0 +1,90 @@
+"""
+Latency of /curl while the model is reloaded in the background (utilities/model_registry.py)
+
+A client thread sends sst_test.txt sentences to /curl (Flask test client, result cache off) for the whole run,
+while the model registry switches, in the background, between model files: VADER, and Logistic Regression
+trained on sst_train.txt, pickled & mapped. Latencies are split by whether a load was running when the
+request started; the load time of every version is reported from the registry history.
+
+in project dir, run:
+$ python -m benchmarks.bench_model_reload
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from app                  import app, model_registry
+from utilities.model_file import save_model_file
+from utilities.pipeline   import build_pipeline
+
+
+n_reloads = 12
+pause_s   = 0.5   # between the end of a load and the next reload
+
+
+def read_sst(file_name):
+    return pd.read_csv(file_name, sep = '\t', header = None, names = ['truth', 'text'])
+
+
+def percentiles(list_ms):
+    list_ms = sorted(list_ms)
+    return len(list_ms), list_ms[len(list_ms) // 2], list_ms[int(len(list_ms) * 0.99)], list_ms[-1]
+
+
+if __name__ == '__main__':
+
+    logging.disable(logging.INFO)
+    model_registry.result_cache.capacity = 0   # every request scored
+
+    df_train = read_sst('sst_train.txt')
+    pipeline = build_pipeline().fit(df_train['text'], df_train['truth'])
+    list_body = [json.dumps({'sentence': text}) for text in read_sst('sst_test.txt')['text']]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        list_filename = [model_registry.filename]
+        for file_format in ['pickle', 'mapped']:
+            filename = os.path.join(tmp_dir, 'sentiment_model_lr_' + file_format)
+            save_model_file(filename, pipeline, type(pipeline), 'sentiment-analysis', 'bench', 'train',
+                            logging.getLogger(), file_format = file_format)
+            list_filename.append(filename)
+
+        dict_latency = {'steady': [], 'loading': []}
+        done         = threading.Event()
+
+        def client():
+            with app.test_client() as test_client:
+                i = 0
+                while not done.is_set():
+                    loading = model_registry.loading
+                    start   = time.perf_counter()
+                    test_client.post('/curl', data = list_body[i % len(list_body)],
+                                     content_type = 'application/json')
+                    dict_latency['loading' if loading else 'steady'].append((time.perf_counter() - start) * 1e3)
+                    i += 1
+
+        thread = threading.Thread(target = client)
+        thread.start()
+        time.sleep(pause_s)
+        for i in range(n_reloads):
+            model_registry.reload(list_filename[(i + 1) % len(list_filename)])
+            while model_registry.loading:
+                time.sleep(0.001)
+            time.sleep(pause_s)
+        done.set()
+        thread.join()
+
+        print('{:8s}  {:>8s}  {:>8s}  {:>8s}  {:>8s}'.format('requests', 'count', 'p50 ms', 'p99 ms', 'max ms'))
+        for name, list_ms in dict_latency.items():
+            print('{:8s}  {:8d}  {:8.2f}  {:8.2f}  {:8.2f}'.format(name, *percentiles(list_ms)))
+
+        print()
+        print('{:45s}  {:>8s}'.format('model file loaded', 'load ms'))
+        for record in list(model_registry.history)[1:]:
+            print('{:45s}  {:8.1f}'.format(os.path.basename(record['filename']) + ' ' + record['status'],
+                                           record['load_ms']))
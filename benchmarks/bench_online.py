@@ -0,0 +1,90 @@
+"""
+Benchmark of the online learning (utilities/online.py):
+  - update throughput: sentences learnt per second, per mini-batch size, and the cost of a checkpoint
+  - accuracy drift: the online model, started on the first half of sst_train.txt and updated with the rest
+    as it arrives, vs a full retraining (Logistic Regression pipeline of train.py) on all the sentences
+    seen so far; both evaluated on sst_dev.txt
+
+in project dir, run:
+$ python -m benchmarks.bench_online
+"""
+
+import logging
+import os
+import tempfile
+
+from time                    import perf_counter
+
+from sklearn.metrics         import accuracy_score, f1_score
+from utilities.online        import OnlineLearner
+from utilities.pipeline      import build_pipeline
+from utilities.text          import preprocessor
+from utilities.training_data import read_sst
+
+
+list_batch_size = [1, 32, 256, 1024]
+
+# sentences of sst_train.txt the online model starts from, and the steps the rest arrives in
+INITIAL_SHARE   = 0.5
+N_STEPS         = 4
+
+
+def scores(df, list_pred):
+    return accuracy_score(df['truth'], list_pred), f1_score(df['truth'], list_pred, average = 'macro')
+
+
+if __name__ == '__main__':
+
+    logger = logging.getLogger('bench_logger')
+    logging.disable(logging.INFO)
+
+    df_train = read_sst('sst_train.txt')
+    df_dev   = read_sst('sst_dev.txt')
+    list_row = list(zip(df_train['text'], df_train['truth'].astype(int)))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        print('{:>10s}  {:>12s}'.format('batch size', 'sentences/s'))
+        for batch_size in list_batch_size:
+            learner = OnlineLearner(os.path.join(tmp_dir, 'model_' + str(batch_size)), batch_size, 0, 0, logger)
+            start   = perf_counter()
+            for text, label in list_row:
+                learner.learn(text, label)
+            learner.update()
+            print('{:10d}  {:12.0f}'.format(batch_size, len(list_row) / (perf_counter() - start)))
+
+        # a checkpoint writes the model file only if a sentence was learnt since the last one
+        start = perf_counter()
+        for text, label in list_row[:5]:
+            learner.learn(text, label)
+            learner.checkpoint()
+        print('checkpoint: {:.1f} ms, model file: {:.1f} MB'.format((perf_counter() - start) / 5 * 1e3,
+                                                                    os.path.getsize(learner.model_file) / 1e6))
+
+        # accuracy drift
+        print()
+        print('{:>6s}  {:>16s}  {:>16s}  {:>10s}  {:>16s}  {:>16s}  {:>10s}'.format(
+              'seen', 'online accuracy', 'online macro F1', 'update s', 'retrain accuracy', 'retrain macro F1',
+              'retrain s'))
+
+        learner   = OnlineLearner(os.path.join(tmp_dir, 'model_drift'), 256, 0, 0, logger)
+        list_text = [preprocessor(text) for text in df_dev['text']]
+        n_initial = int(len(list_row) * INITIAL_SHARE)
+        list_end  = [n_initial + (len(list_row) - n_initial) * step // N_STEPS for step in range(N_STEPS + 1)]
+        seen      = 0
+        for end in list_end:
+            start = perf_counter()
+            for text, label in list_row[seen:end]:
+                learner.learn(text, label)
+            learner.update()
+            update_s = perf_counter() - start
+            seen     = end
+
+            start     = perf_counter()
+            pipeline  = build_pipeline('count').fit(df_train['text'][:seen], df_train['truth'][:seen])
+            retrain_s = perf_counter() - start
+
+            online_accuracy,  online_f1  = scores(df_dev, learner.model.predict(list_text))
+            retrain_accuracy, retrain_f1 = scores(df_dev, pipeline.predict(list_text))
+            print('{:6d}  {:16.3f}  {:16.3f}  {:10.3f}  {:16.3f}  {:16.3f}  {:10.3f}'.format(
+                  seen, online_accuracy, online_f1, update_s, retrain_accuracy, retrain_f1, retrain_s))
@@ -0,0 +1,53 @@
+"""
+Micro-benchmark of the text pre-processing:
+text_preprocessing (set-up on every call) vs Preprocessor (set-up once)
+
+in project dir, run:
+$ python -m benchmarks.bench_preprocessing
+"""
+
+import timeit
+
+from utilities.text import text_preprocessing, Preprocessor
+
+
+# sentences to pre-process, in SST format: __label__N<TAB>text
+data_file = 'sst_dev.txt'
+
+# flag combinations to compare; all the seven flags follow the order of text_preprocessing
+dict_flags = {'all flags on':       (True,  True,  True,  True,  True,  True,  True),
+              'all but stop words': (True,  True,  True,  True,  True,  False, True),
+              'html tags only':     (False, False, True,  False, False, False, False)}
+
+
+def read_sentences(file_name):
+    with open(file_name, encoding = 'utf-8') as f:
+        return [line.rstrip('\n').split('\t', 1)[-1] for line in f]
+
+
+def per_sentence_us(function, list_text, repeat = 3):
+    """
+    best of repeat runs over all the sentences, in microseconds per sentence
+    """
+    seconds = min(timeit.repeat(lambda: [function(text) for text in list_text],
+                                number = 1,
+                                repeat = repeat))
+    return seconds / len(list_text) * 1e6
+
+
+if __name__ == '__main__':
+
+    list_text = read_sentences(data_file)
+    print('{} sentences from {}'.format(len(list_text), data_file))
+    print('{:20s}  {:>12s}  {:>12s}  {:>8s}'.format('flags', 'before (us)', 'after (us)', 'speed-up'))
+
+    for name, flags in dict_flags.items():
+        preprocessor = Preprocessor(*flags)
+
+        # the two must agree before their speed is worth comparing
+        assert [preprocessor(text) for text in list_text] == \
+               [text_preprocessing(text, *flags) for text in list_text]
+
+        before = per_sentence_us(lambda text: text_preprocessing(text, *flags), list_text)
+        after  = per_sentence_us(preprocessor, list_text)
+        print('{:20s}  {:12.1f}  {:12.1f}  {:7.1f}x'.format(name, before, after, before / after))
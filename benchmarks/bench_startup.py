@@ -0,0 +1,69 @@
+"""
+Cold-start benchmark: time to import a module in a fresh Python process
+
+in project dir, run:
+$ python -m benchmarks.bench_startup                    # app
+$ python -m benchmarks.bench_startup utilities.text train
+$ python -m benchmarks.bench_startup --nltk             # NLTK set-up: nltk.download vs local look-up
+"""
+
+import statistics
+import subprocess
+import sys
+
+
+# the import is timed inside the child process, so interpreter start-up is left out
+snippet = "import time; t = time.perf_counter(); import {}; print(time.perf_counter() - t)"
+
+# NLTK set-up at app start-up, before and after resources were bundled with the app
+nltk_snippets = {
+    'nltk.download':       "import time, nltk; t = time.perf_counter(); "
+                           "[nltk.download(r, quiet = True) for r in ('vader_lexicon', 'stopwords', 'punkt')]; "
+                           "print(time.perf_counter() - t)",
+    'load_nltk_resources': "import time, logging; "
+                           "from form_utilities.config import Config; "
+                           "from utilities.nltk_resources import load_nltk_resources; "
+                           "t = time.perf_counter(); "
+                           "load_nltk_resources(Config.NLTK_DATA_DIR, Config.NLTK_RESOURCES, logging.getLogger()); "
+                           "print(time.perf_counter() - t)",
+}
+
+
+def import_seconds(module, repeat = 5):
+    """
+    median and all the timings of importing module, each in a new process
+    """
+    return child_seconds(snippet.format(module), repeat)
+
+
+def child_seconds(code, repeat = 5):
+    """
+    median and all the timings printed by code, each run in a new process
+    """
+    list_seconds = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code],
+                                stdout = subprocess.PIPE,
+                                stderr = subprocess.DEVNULL,
+                                check  = True,
+                                universal_newlines = True).stdout
+        list_seconds.append(float(output.strip().splitlines()[-1]))
+
+    return statistics.median(list_seconds), list_seconds
+
+
+if __name__ == '__main__':
+
+    if sys.argv[1:] == ['--nltk']:
+        for name, code in nltk_snippets.items():
+            median, list_seconds = child_seconds(code)
+            print('{:26s}  median {:8.4f} s'.format(name, median))
+        sys.exit()
+
+    modules = sys.argv[1:] or ['app']
+
+    for module in modules:
+        median, list_seconds = import_seconds(module)
+        print('import {:20s}  median {:8.3f} s   ({})'.format(module,
+                                                              median,
+                                                              ', '.join('{:.3f}'.format(s) for s in list_seconds)))
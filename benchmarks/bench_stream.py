@@ -0,0 +1,77 @@
+"""
+Benchmark of the /curl/stream endpoint: memory vs size of the request body
+
+Streams NDJSON bodies of growing size (sst_train.txt sentences, repeated) through the app, with the body
+generated and the response consumed piece by piece, and reports the peak Python memory of the request
+(tracemalloc) and the throughput. The peak should not grow with the number of lines.
+
+in project dir, run:
+$ python -m benchmarks.bench_stream
+"""
+
+import json
+import time
+import tracemalloc
+
+import pandas as pd
+
+from app import app
+
+
+list_n_lines = [10000, 100000, 500000]
+
+
+class NDJSONBody:
+    """
+    a request body of n_lines {"sentence": ...} lines, generated as it is read
+    """
+    def __init__(self, list_text, n_lines):
+        self.lines   = [(json.dumps({"sentence": text}) + "\n").encode('utf-8') for text in list_text]
+        self.n_lines = n_lines
+        self.length  = sum(len(self.lines[i % len(self.lines)]) for i in range(n_lines))
+        self.i       = 0
+
+    def readline(self, size = -1):
+        if self.i == self.n_lines:
+            return b''
+        line    = self.lines[self.i % len(self.lines)]
+        self.i += 1
+        return line
+
+    def read(self, size = -1):
+        return self.readline()
+
+    # only as much of tell & seek as the test client uses, to get the content length
+    def tell(self):
+        return self.length if self.i < 0 else 0
+
+    def seek(self, offset, whence = 0):
+        self.i = -1 if whence == 2 else 0
+
+
+if __name__ == '__main__':
+
+    list_text = list(pd.read_csv('sst_train.txt', sep = '\t', header = None, names = ['truth', 'text'])['text'])
+
+    with app.test_client() as client:
+        for n_lines in [len(list_text)] + list_n_lines:
+            body = NDJSONBody(list_text, n_lines)
+
+            tracemalloc.start()
+            start    = time.perf_counter()
+            response = client.post('/curl/stream',
+                                   input_stream   = body,
+                                   content_length = body.length,
+                                   content_type   = 'application/x-ndjson',
+                                   buffered       = False)
+            n_results = sum(chunk.count(b'\n') for chunk in response.response)
+            seconds   = time.perf_counter() - start
+            _, peak   = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            assert n_results == n_lines
+            if n_lines == len(list_text):
+                # warm-up: fills the result cache, which is bounded but not counted in the peak
+                continue
+            print('{:7d} lines  {:8.1f} MiB in  peak {:6.2f} MiB  {:8.0f} lines/s'.format(
+                  n_lines, body.length / 2 ** 20, peak / 2 ** 20, n_lines / seconds))
@@ -0,0 +1,64 @@
+"""
+Benchmark of the hyperparameter sweep (sweep.py): one full training per configuration, serially (as rerunning
+train.py for each), vs run_sweep (pre-processing & features shared by the configurations of the same flags),
+with a cold & a warm pre-processing cache, and with a pool of os.cpu_count() workers
+
+in project dir, run:
+$ python -m benchmarks.bench_sweep
+"""
+
+import logging
+import os
+import tempfile
+
+from time                    import perf_counter
+
+from sweep                   import clf_grid, flag_grid, run_sweep
+from train                   import LogisticRegressor
+from utilities.training_data import read_split
+
+
+list_vary       = ['lower_case', 'rm_punctuation', 'rm_stop_words']
+list_vectorizer = ['count']
+list_clf_params = clf_grid([0.3, 1.0, 3.0], ['l2'])
+
+
+def run_serial(list_flags):
+    """
+    every configuration on its own: read, pre-process, vectorize, fit & evaluate
+    """
+    list_performance = []
+    for flags in list_flags:
+        for clf_params in list_clf_params:
+            regressor = LogisticRegressor()
+            regressor.pipeline.set_params(**{'clf__' + name: value for name, value in clf_params.items()})
+            regressor.fit(read_split('sst_train.txt', flags, workers = 1))
+            df_dev = regressor.predict_df(read_split('sst_dev.txt', flags, workers = 1))
+            list_performance.append(regressor.performance(df_dev))
+    return list_performance
+
+
+if __name__ == '__main__':
+
+    logging.disable(logging.INFO)
+
+    list_flags = flag_grid(list_vary)
+    n_config   = len(list_flags) * len(list_vectorizer) * len(list_clf_params)
+    print('{} configurations ({} flag combinations x {} classifier settings), cpus: {}'.format(
+          n_config, len(list_flags), len(list_clf_params), os.cpu_count()))
+
+    start = perf_counter()
+    run_serial(list_flags)
+    serial_s = perf_counter() - start
+    print('{:40s}  {:7.2f} s  {:6.3f} s/config'.format('serial, one training per configuration', serial_s,
+                                                       serial_s / n_config))
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name, workers in [('run_sweep, cold cache, 1 worker', 1),
+                              ('run_sweep, warm cache, 1 worker', 1),
+                              ('run_sweep, warm cache, ' + str(os.cpu_count()) + ' worker(s)', os.cpu_count())]:
+            start = perf_counter()
+            run_sweep(list_flags, list_vectorizer, list_clf_params, cache_dir = cache_dir, workers = workers)
+            seconds = perf_counter() - start
+            print('{:40s}  {:7.2f} s  {:6.3f} s/config  {:5.1f}x'.format(name, seconds, seconds / n_config,
+                                                                         serial_s / seconds))
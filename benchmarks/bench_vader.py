@@ -0,0 +1,42 @@
+"""
+Throughput of the VADER model: SentimentIntensityAnalyzer.polarity_scores vs CompiledVader
+
+in project dir, run:
+$ python -m benchmarks.bench_vader
+"""
+
+import logging
+import timeit
+
+from utilities.model_file import load_model_file
+from utilities.vader      import CompiledVader
+
+
+model_file = 'sentiment_model_pickle_default_sia'
+data_files = ['sst_test.txt', 'sst_train.txt']
+
+
+if __name__ == '__main__':
+
+    model          = load_model_file(model_file, logging.getLogger("bench_logger"))['model']
+    compiled_vader = CompiledVader(model)
+
+    for data_file in data_files:
+        with open(data_file, encoding = 'utf-8') as f:
+            list_text = [line.rstrip('\n').split('\t', 1)[-1] for line in f]
+
+        # numerically identical on every sentence
+        assert [compiled_vader.polarity_scores(text) for text in list_text] == \
+               [model.polarity_scores(text) for text in list_text]
+
+        before = min(timeit.repeat(lambda: [model.polarity_scores(text) for text in list_text],
+                                   number = 1, repeat = 3))
+        after  = min(timeit.repeat(lambda: [compiled_vader.polarity_scores(text) for text in list_text],
+                                   number = 1, repeat = 3))
+
+        print('{:14s} {:6d} sentences, identical scores   polarity_scores {:8.0f} /s   '
+              'CompiledVader {:8.0f} /s   {:4.1f}x'.format(data_file,
+                                                           len(list_text),
+                                                           len(list_text) / before,
+                                                           len(list_text) / after,
+                                                           before / after))
@@ -0,0 +1,68 @@
+"""
+Benchmark of the VADER evaluation of train.py on sst_test.txt:
+  before  df['text'].apply(polarity_scores) row by row, pd.cut(bins = 5), sklearn accuracy_score & f1_score
+  after   compound_scores (CompiledVader, in os.cpu_count() processes), np.digitize by fixed thresholds,
+          numpy accuracy & macro F1 (utilities/vader_thresholds.py)
+and how many sentences of sst_dev.txt change class with the batch they are scored in (pd.cut vs thresholds)
+
+in project dir, run:
+$ python -m benchmarks.bench_vader_eval
+"""
+
+import os
+import timeit
+
+import numpy  as np
+import pandas as pd
+
+from nltk.sentiment.vader       import SentimentIntensityAnalyzer
+from sklearn.metrics            import accuracy_score, f1_score
+from utilities.training_data    import read_sst
+from utilities.vader_thresholds import DEFAULT_THRESHOLDS, classification_scores, classify, compound_scores
+
+
+def best_seconds(function, repeat = 3):
+    return min(timeit.repeat(function, number = 1, repeat = repeat))
+
+
+def evaluate_before(model, df):
+    scores = df['text'].apply(lambda text: model.polarity_scores(text)['compound'])
+    pred   = pd.cut(scores, bins = 5, labels = [1, 2, 3, 4, 5])
+    return accuracy_score(df['truth'], pred), f1_score(df['truth'], pred, average = 'macro')
+
+
+def evaluate_after(model, df, workers):
+    pred = classify(compound_scores(list(df['text']), model, workers), DEFAULT_THRESHOLDS)
+    return classification_scores(df['truth'], pred)
+
+
+if __name__ == '__main__':
+
+    model   = SentimentIntensityAnalyzer()
+    df_test = read_sst('sst_test.txt')
+    workers = os.cpu_count()
+    evaluate_after(model, df_test, 1)   # builds the CompiledVader once
+
+    before  = best_seconds(lambda: evaluate_before(model, df_test))
+    after_1 = best_seconds(lambda: evaluate_after(model, df_test, 1))
+    after_n = best_seconds(lambda: evaluate_after(model, df_test, workers))
+    print('{} sentences, cpus: {}'.format(len(df_test), workers))
+    print('{:45s}  {:7.3f} s'.format('before: apply, pd.cut, sklearn metrics', before))
+    print('{:45s}  {:7.3f} s  {:5.1f}x'.format('after:  batch, thresholds, numpy, 1 worker', after_1, before / after_1))
+    print('{:45s}  {:7.3f} s  {:5.1f}x'.format('after:  ... ' + str(workers) + ' worker(s)', after_n, before / after_n))
+
+    pred   = np.random.RandomState(0).randint(1, 6, 10 ** 5)
+    truth  = np.random.RandomState(1).randint(1, 6, 10 ** 5)
+    print('{:45s}  {:7.2f} ms'.format('metrics of 100k predictions, sklearn',
+                                      best_seconds(lambda: (accuracy_score(truth, pred),
+                                                            f1_score(truth, pred, average = 'macro'))) * 1e3))
+    print('{:45s}  {:7.2f} ms'.format('metrics of 100k predictions, numpy',
+                                      best_seconds(lambda: classification_scores(truth, pred)) * 1e3))
+
+    # the same sentences, scored in the whole set and in batches of 100
+    scores   = compound_scores(list(read_sst('sst_dev.txt')['text']), model, 1)
+    cut_all  = np.asarray(pd.cut(scores, bins = 5, labels = False))
+    cut_part = np.concatenate([np.asarray(pd.cut(scores[index:index + 100], bins = 5, labels = False))
+                               for index in range(0, len(scores), 100)])
+    print('sentences of sst_dev.txt whose class changes with the batch: pd.cut {}, thresholds 0'.format(
+          int((cut_all != cut_part).sum())))
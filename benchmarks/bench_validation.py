@@ -0,0 +1,79 @@
+"""
+Request validation with 1 MB adversarial inputs: before (re.findall, set(), get_json) vs utilities/validation.py
+
+in project dir, run:
+$ python -m benchmarks.bench_validation
+"""
+
+import json
+import re
+import timeit
+import tracemalloc
+
+from flask                import request
+
+from app                  import app
+from utilities.validation import RE_ENGLISH_LETTER, InvalidRequest, check_sentence, read_json_body
+
+
+MB = 1024 * 1024
+
+
+def measure(fn, number = 5):
+    """
+    best seconds per call, and peak traced memory of one call
+    """
+    seconds = min(timeit.repeat(fn, number = number, repeat = 3)) / number
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def report(name, before, after):
+    print('{:44s} {:9.3f} ms {:8.2f} MiB  ->  {:9.4f} ms {:8.2f} MiB'.format(
+          name, before[0] * 1e3, before[1] / MB, after[0] * 1e3, after[1] / MB))
+
+
+if __name__ == '__main__':
+
+    letters    = 'a' * MB
+    no_letters = '1234 !?. ' * (MB // 9)
+    max_length = app.config['MAX_SENTENCE_LENGTH']
+    print('{:44s} {:>24s}      {:>24s}'.format('', 'before', 'after'))
+
+    # letter check
+    for name, sentence in [('1 MB of letters', letters), ('1 MB without a letter', no_letters)]:
+        report(name + ': letter check',
+               measure(lambda: len(re.findall("[a-zA-Z]", sentence)) == 0),
+               measure(lambda: RE_ENGLISH_LETTER.search(sentence) is None))
+        report(name + ': with the length guard',
+               measure(lambda: len(re.findall("[a-zA-Z]", sentence)) == 0),
+               measure(lambda: check_sentence(sentence, max_length)))
+
+    # repeated values of one key
+    list_value = ['a'] * (MB // 4)
+    report('1 MB list of repeated values',
+           measure(lambda: len(set(list_value)) == 1),
+           measure(lambda: list_value.count(list_value[0]) == len(list_value)))
+
+    # 1 MB body, announced by Content-Length, or sent chunked
+    body = json.dumps({'sentence': letters}).encode('utf-8')
+
+    def get_json(environ):
+        with app.test_request_context('/curl', method = 'POST', data = body, content_type = 'application/json',
+                                      environ_overrides = environ):
+            return request.get_json()
+
+    def read_body(environ):
+        with app.test_request_context('/curl', method = 'POST', data = body, content_type = 'application/json',
+                                      environ_overrides = environ):
+            try:
+                return read_json_body(request, app.config['MAX_PAYLOAD_BYTES'])
+            except InvalidRequest:
+                return None
+
+    chunked = {'CONTENT_LENGTH': '', 'wsgi.input_terminated': True}
+    report('1 MB body, with Content-Length', measure(lambda: get_json({})),      measure(lambda: read_body({})))
+    report('1 MB body, chunked',             measure(lambda: get_json(chunked)), measure(lambda: read_body(chunked)))
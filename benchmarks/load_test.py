@@ -0,0 +1,132 @@
+"""
+Load test of the /curl endpoint: requests/sec and latency at a given concurrency
+
+in project dir, run against a running server:
+$ python -m benchmarks.load_test --url http://localhost:99/curl
+
+or let it start the two setups one after the other and compare them:
+$ python -m benchmarks.load_test --compare
+  devserver  python app.py                                      (Werkzeug, one process)
+  gunicorn   gunicorn --config gunicorn.conf.py wsgi:application (pre-forked workers)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+# sentences sent in turn, in SST format: __label__N<TAB>text
+data_file = 'sst_dev.txt'
+
+# how to start each setup on a given port
+dict_server = {
+    'devserver': lambda port: [sys.executable, '-c',
+                               'from app import app; app.run(port = {}, host = "127.0.0.1")'.format(port)],
+    'gunicorn':  lambda port: [sys.executable, '-c', 'from gunicorn.app.wsgiapp import run; run()',
+                               '--config', 'gunicorn.conf.py',
+                               '--bind',   '127.0.0.1:{}'.format(port),
+                               '--access-logfile', '/dev/null',
+                               'wsgi:application'],
+}
+
+
+def read_sentences(file_name):
+    with open(file_name, encoding = 'utf-8') as f:
+        return [line.rstrip('\n').split('\t', 1)[-1] for line in f]
+
+
+def post(url, sentence):
+    """
+    one request; returns its latency in seconds
+    """
+    data    = json.dumps({'sentence': sentence}).encode('utf-8')
+    request = urllib.request.Request(url, data = data, headers = {'Content-Type': 'application/json'})
+    start   = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def load_test(url, list_sentence, n_requests, concurrency):
+    """
+    send n_requests requests from concurrency threads; returns requests/sec and latency percentiles (ms)
+    """
+    sentences = [list_sentence[i % len(list_sentence)] for i in range(n_requests)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers = concurrency) as executor:
+        list_latency = list(executor.map(lambda sentence: post(url, sentence), sentences))
+    elapsed = time.perf_counter() - start
+
+    list_latency.sort()
+    return {'requests':    n_requests,
+            'concurrency': concurrency,
+            'rps':         n_requests / elapsed,
+            'p50_ms':      1000 * statistics.median(list_latency),
+            'p95_ms':      1000 * list_latency[int(0.95 * (len(list_latency) - 1))],
+            'p99_ms':      1000 * list_latency[int(0.99 * (len(list_latency) - 1))]}
+
+
+def wait_until_up(url, timeout = 60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            post(url, 'ping')
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('server did not come up at ' + url)
+
+
+def print_result(name, result):
+    print('{:10s}  {:6d} requests  concurrency {:3d}  {:8.1f} req/s  '
+          'p50 {:7.2f} ms  p95 {:7.2f} ms  p99 {:7.2f} ms'.format(name,
+                                                                 result['requests'],
+                                                                 result['concurrency'],
+                                                                 result['rps'],
+                                                                 result['p50_ms'],
+                                                                 result['p95_ms'],
+                                                                 result['p99_ms']))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description = 'Load test of the /curl endpoint')
+    parser.add_argument('--url',         default = 'http://localhost:99/curl')
+    parser.add_argument('--requests',    type = int, default = 2000)
+    parser.add_argument('--concurrency', type = int, default = 16)
+    parser.add_argument('--compare',     action = 'store_true',
+                        help = 'start the dev server and gunicorn in turn, and load test both')
+    parser.add_argument('--port',        type = int, default = 8099,
+                        help = 'port used by the servers started with --compare')
+    parser.add_argument('--cache-size',  type = int, default = 0,
+                        help = 'RESULT_CACHE_SIZE of the servers started with --compare (0: every request scored)')
+    args = parser.parse_args()
+
+    list_sentence = read_sentences(data_file)
+
+    if not args.compare:
+        print_result('server', load_test(args.url, list_sentence, args.requests, args.concurrency))
+        sys.exit()
+
+    url = 'http://127.0.0.1:{}/curl'.format(args.port)
+    for name, command in dict_server.items():
+        server = subprocess.Popen(command(args.port),
+                                  stdout = subprocess.DEVNULL,
+                                  stderr = subprocess.DEVNULL,
+                                  env    = dict(os.environ,
+                                                PYTHONWARNINGS    = 'ignore',
+                                                RESULT_CACHE_SIZE = str(args.cache_size)))
+        try:
+            wait_until_up(url)
+            print_result(name, load_test(url, list_sentence, args.requests, args.concurrency))
+        finally:
+            server.terminate()
+            server.wait()
@@ -0,0 +1,276 @@
+"""
+Benchmark suite of the service, with results stored as JSON, to compare runs and flag regressions
+
+Measured, on fixed inputs (sst_dev.txt, sst_test.txt; models trained on sst_train.txt):
+  latency        single-sentence scoring (ScoringService.score, result cache off), p50 & p99, per model type
+  throughput     batch scoring (ScoringService.score_sentences, chunks of BATCH_SIZE), sentences per second
+  preprocessing  Preprocessor cost per flag combination, per sentence
+  cold start     time to import app in a fresh process, and the memory of that process (one worker)
+
+in project dir, run:
+$ python -m benchmarks.suite --output bench_results.json
+$ python -m benchmarks.suite --output new.json --compare bench_results.json --threshold 0.2
+$ python -m benchmarks.suite --compare bench_results.json --input new.json    # compare two stored runs
+
+With --compare, the exit status is 1 if a metric got worse than the baseline by more than the threshold
+(a share of the baseline value). Timings are noisy: compare runs made on the same machine, at rest.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from time import perf_counter, strftime
+
+
+BATCH_SIZE = 256
+
+# flag combinations of the pre-processing; the seven flags follow the order of text_preprocessing
+dict_flags = {'none':                 (False, False, False, False, False, False, False),
+              'lower_case':           (True,  False, False, False, False, False, False),
+              'rm_num':               (False, True,  False, False, False, False, False),
+              'rm_html_tags':         (False, False, True,  False, False, False, False),
+              'rm_whitespaces':       (False, False, False, True,  False, False, False),
+              'rm_punctuation':       (False, False, False, False, True,  False, False),
+              'rm_stop_words':        (False, False, False, False, False, True,  False),
+              'conv_accented_char':   (False, False, False, False, False, False, True),
+              'all':                  (True,  True,  True,  True,  True,  True,  True)}
+
+# run in a fresh process: seconds to import app, and the memory of the process afterwards
+cold_start_child = '''
+import json, time
+start  = time.perf_counter()
+import app
+import_s = time.perf_counter() - start
+
+def status_kib(field):
+    with open('/proc/self/status') as f:
+        return sum(int(line.split()[1]) for line in f if line.startswith(field + ':'))
+
+print(json.dumps({'import_s': import_s, 'rss_kib': status_kib('VmRSS'), 'private_kib': status_kib('RssAnon')}))
+'''
+
+
+def read_sentences(file_name, limit = None):
+    with open(file_name, encoding = 'utf-8') as f:
+        list_text = [line.rstrip('\n').split('\t', 1)[-1] for line in f]
+    return list_text[:limit]
+
+
+def metric(value, unit, higher_is_better = False):
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+
+def percentile(list_value, share):
+    list_value = sorted(list_value)
+    return list_value[min(len(list_value) - 1, int(len(list_value) * share))]
+
+
+def build_models(tmp_dir):
+    """
+    name: model, for every model type served; the Logistic Regression ones trained on sst_train.txt
+    """
+    import pandas as pd
+
+    from utilities.model_file import load_model_file, save_model_file
+    from utilities.pipeline   import build_pipeline
+
+    logger   = logging.getLogger('bench_logger')
+    df_train = pd.read_csv('sst_train.txt', sep = '\t', header = None, names = ['truth', 'text'])
+
+    dict_model = {'vader': load_model_file('sentiment_model_pickle_default_sia', logger)['model']}
+    for vectorizer in ['count', 'hashing']:
+        pipeline = build_pipeline(vectorizer).fit(df_train['text'], df_train['truth'])
+        dict_model['lr_' + vectorizer] = pipeline
+
+        filename = os.path.join(tmp_dir, 'sentiment_model_' + vectorizer)
+        save_model_file(filename, pipeline, type(pipeline), 'sentiment-analysis', 'bench', 'train', logger,
+                        file_format = 'mapped')
+        dict_model['lr_' + vectorizer + '_mapped'] = load_model_file(filename, logger)['model']
+
+    return dict_model
+
+
+def bench_scoring(dict_model, list_text, repeat):
+    """
+    latency of single sentences, and throughput of batches, of every model
+    """
+    from utilities.scoring import ScoringService
+
+    dict_result = {}
+    for name, model in dict_model.items():
+        service = ScoringService(model, name, 0, 10 ** 6)
+        service.score_sentences(list_text[:BATCH_SIZE])   # warm-up
+
+        list_us = []
+        for _ in range(repeat):
+            for text in list_text:
+                start = perf_counter()
+                service.score(text)
+                list_us.append((perf_counter() - start) * 1e6)
+        dict_result['latency.' + name + '.p50'] = metric(percentile(list_us, 0.50), 'us')
+        dict_result['latency.' + name + '.p99'] = metric(percentile(list_us, 0.99), 'us')
+
+        list_seconds = []
+        for _ in range(repeat):
+            start = perf_counter()
+            for index in range(0, len(list_text), BATCH_SIZE):
+                service.score_sentences(list_text[index:index + BATCH_SIZE])
+            list_seconds.append(perf_counter() - start)
+        dict_result['throughput.' + name] = metric(len(list_text) / min(list_seconds), 'sentences/s',
+                                                   higher_is_better = True)
+
+    return dict_result
+
+
+def bench_preprocessing(list_text, repeat):
+    from utilities.text import Preprocessor
+
+    dict_result = {}
+    for name, flags in dict_flags.items():
+        preprocessor = Preprocessor(*flags)
+        list_seconds = []
+        for _ in range(repeat):
+            start = perf_counter()
+            for text in list_text:
+                preprocessor(text)
+            list_seconds.append(perf_counter() - start)
+        dict_result['preprocessing.' + name] = metric(min(list_seconds) / len(list_text) * 1e6, 'us/sentence')
+
+    return dict_result
+
+
+def bench_cold_start(repeat):
+    list_result = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', cold_start_child],
+                                stdout = subprocess.PIPE,
+                                stderr = subprocess.DEVNULL,
+                                env    = dict(os.environ, PYTHONHASHSEED = '0', MODEL_WATCH_INTERVAL_S = '0'),
+                                check  = True,
+                                universal_newlines = True).stdout
+        list_result.append(json.loads(output.strip().splitlines()[-1]))
+
+    return {'cold_start.import_app': metric(statistics.median(result['import_s'] for result in list_result), 's'),
+            'memory.worker_rss':     metric(statistics.median(result['rss_kib'] for result in list_result), 'KiB'),
+            'memory.worker_private': metric(statistics.median(result['private_kib'] for result in list_result),
+                                            'KiB')}
+
+
+def environment():
+    """
+    what the results depend on besides the code
+    """
+    import nltk
+    import numpy
+    import sklearn
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], stdout = subprocess.PIPE,
+                                stderr = subprocess.DEVNULL, universal_newlines = True).stdout.strip()
+    except OSError:
+        commit = ''
+
+    return {'time':     strftime('%Y-%m-%d %H:%M:%S'),
+            'commit':   commit,
+            'python':   platform.python_version(),
+            'platform': platform.platform(),
+            'cpus':     os.cpu_count(),
+            'numpy':    numpy.__version__,
+            'sklearn':  sklearn.__version__,
+            'nltk':     nltk.__version__}
+
+
+def run_suite(quick = False):
+    """
+    return {'environment': ..., 'metrics': {name: {'value', 'unit', 'higher_is_better'}}}
+    """
+    repeat    = 1 if quick else 3
+    limit     = 300 if quick else None
+    list_test = read_sentences('sst_test.txt', limit)
+    list_dev  = read_sentences('sst_dev.txt',  limit)
+
+    dict_metric = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dict_metric.update(bench_scoring(build_models(tmp_dir), list_test, repeat))
+    dict_metric.update(bench_preprocessing(list_dev, repeat))
+    dict_metric.update(bench_cold_start(repeat))
+
+    return {'environment': environment(), 'metrics': dict_metric}
+
+
+def compare(dict_new, dict_baseline, threshold):
+
+    """
+    Compare the metrics of two runs
+
+      dict_new, dict_baseline  dict   results of run_suite
+      threshold                float  largest change for the worse accepted, as a share of the baseline value
+
+    return a list of (name, baseline value, new value, change for the worse, regression), one per metric
+    of both runs; change > 0 is worse, whichever way the metric is better
+    """
+
+    list_row = []
+    for name, new in dict_new['metrics'].items():
+        baseline = dict_baseline['metrics'].get(name)
+        if baseline is None or baseline['value'] == 0:
+            continue
+        change = (new['value'] - baseline['value']) / baseline['value']
+        if new['higher_is_better']:
+            change = -change
+        list_row.append((name, baseline['value'], new['value'], change, change > threshold))
+
+    return list_row
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description = 'Benchmark suite of the service')
+    parser.add_argument('--output',    help = 'JSON file to write the results of this run to')
+    parser.add_argument('--input',     help = 'JSON file of a stored run, compared instead of running the suite')
+    parser.add_argument('--compare',   help = 'JSON file of the baseline run')
+    parser.add_argument('--threshold', type = float, default = 0.2,
+                        help = 'change for the worse flagged as a regression, as a share of the baseline')
+    parser.add_argument('--quick',     action = 'store_true', help = 'fewer sentences & repeats (smoke test)')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    if args.input:
+        with open(args.input) as f:
+            dict_result = json.load(f)
+    else:
+        start       = time.time()
+        dict_result = run_suite(args.quick)
+        for name, value in dict_result['metrics'].items():
+            print('{:40s}  {:14.2f}  {}'.format(name, value['value'], value['unit']))
+        print('suite ran in {:.0f} s'.format(time.time() - start))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(dict_result, f, indent = 2, sort_keys = True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            dict_baseline = json.load(f)
+        list_row = compare(dict_result, dict_baseline, args.threshold)
+
+        print()
+        print('{:40s}  {:>14s}  {:>14s}  {:>8s}'.format('metric', 'baseline', 'new', 'worse by'))
+        for name, baseline, new, change, regression in list_row:
+            print('{:40s}  {:14.2f}  {:14.2f}  {:7.1%}{}'.format(name, baseline, new, change,
+                                                                  '  REGRESSION' if regression else ''))
+
+        list_regression = [row[0] for row in list_row if row[4]]
+        if list_regression:
+            print('{} regression(s) beyond {:.0%}: {}'.format(len(list_regression), args.threshold,
+                                                               ', '.join(list_regression)))
+            sys.exit(1)
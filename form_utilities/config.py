@@ -11,3 +11,61 @@ class Config(object):
     # to get URL from environment first, otherwise create 'app.db'
     SQLALCHEMY_DATABASE_URI        = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Request validation
+    # largest JSON body of /curl (and swagger-ui) & of /curl/batch, in bytes, and longest sentence, in characters;
+    # checked before the body is read / the sentence is scored
+    MAX_PAYLOAD_BYTES              = int(os.environ.get('MAX_PAYLOAD_BYTES') or 64 * 1024)
+    BATCH_MAX_PAYLOAD_BYTES        = int(os.environ.get('BATCH_MAX_PAYLOAD_BYTES') or 16 * 1024 * 1024)
+    MAX_SENTENCE_LENGTH            = int(os.environ.get('MAX_SENTENCE_LENGTH') or 10000)
+
+    # Batch scoring
+    # maximum number of sentences accepted by one /curl/batch request
+    BATCH_MAX_SENTENCES            = int(os.environ.get('BATCH_MAX_SENTENCES') or 1000)
+
+    # Streaming scoring
+    # number of lines of a /curl/stream body scored per model call, and the longest line accepted
+    STREAM_CHUNK_SIZE              = int(os.environ.get('STREAM_CHUNK_SIZE') or 256)
+    STREAM_MAX_LINE_BYTES          = int(os.environ.get('STREAM_MAX_LINE_BYTES') or 64 * 1024)
+
+    # Micro-batching (ASGI serving, see asgi.py)
+    # concurrent /curl requests are scored together: at most MICROBATCH_MAX_SIZE per batch, and the first
+    # request of a batch waits at most MICROBATCH_MAX_WAIT_US microseconds for others
+    MICROBATCH_MAX_SIZE            = int(os.environ.get('MICROBATCH_MAX_SIZE') or 64)
+    MICROBATCH_MAX_WAIT_US         = int(os.environ.get('MICROBATCH_MAX_WAIT_US') or 2000)
+
+    # Model
+    # model file served at start-up, and the model files the admin endpoint may switch to
+    MODEL_FILE                     = os.environ.get('MODEL_FILE') or 'sentiment_model_pickle_default_sia'
+    MODEL_FILES                    = (os.environ.get('MODEL_FILES') or
+                                      'sentiment_model_pickle,sentiment_model_pickle_default_sia').split(',')
+    # models served side by side, selected per request by the X-Model header or ?model=xxx: 'name=file,...',
+    # e.g. 'vader=sentiment_model_pickle_default_sia,lr=sentiment_model_pickle'; empty serves MODEL_FILE only
+    # (as 'default'). DEFAULT_MODEL serves the requests that select none; empty: the first one
+    MODELS                         = os.environ.get('MODELS') or ''
+    DEFAULT_MODEL                  = os.environ.get('DEFAULT_MODEL') or ''
+    # seconds between two checks of the model file, which is reloaded once replaced; 0 does not watch
+    MODEL_WATCH_INTERVAL_S         = float(os.environ.get('MODEL_WATCH_INTERVAL_S') or 2)
+    # token expected in the X-Admin-Token header of the /admin endpoints; empty disables them
+    ADMIN_TOKEN                    = os.environ.get('ADMIN_TOKEN') or ''
+
+    # Result cache
+    # maximum number of (model version, sentence) results kept in memory; 0 disables the cache
+    RESULT_CACHE_SIZE              = int(os.environ.get('RESULT_CACHE_SIZE') or 10000)
+
+    # Latency metrics
+    # per-stage timing histograms of /curl, exposed on /metrics; METRICS_ENABLED=0 turns the timing off
+    METRICS_ENABLED                = os.environ.get('METRICS_ENABLED', '1') == '1'
+
+    # Logging
+    # 'plain': text lines written to stderr in the request thread
+    # 'structured': JSON lines, queued and written to stderr by a background thread
+    LOG_MODE                       = os.environ.get('LOG_MODE') or 'plain'
+    # share of the INFO records of app_logger kept per route (Flask endpoint), '*' for the others;
+    # e.g. 'main.curl_scoring=0.01,*=1'. Empty keeps them all. WARNING and above are always kept.
+    LOG_SAMPLE_RATES               = os.environ.get('LOG_SAMPLE_RATES') or ''
+
+    # NLTK resources
+    # loaded from this directory only, never downloaded at start-up
+    NLTK_DATA_DIR                  = os.environ.get('NLTK_DATA') or os.path.abspath(os.path.join(basedir, '..', 'nltk_data'))
+    NLTK_RESOURCES                 = ['vader_lexicon', 'stopwords', 'punkt']
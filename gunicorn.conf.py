@@ -0,0 +1,36 @@
+"""
+gunicorn setting for production serving
+
+$ gunicorn --config gunicorn.conf.py wsgi:application
+
+Every setting can be overridden from the environment:
+  BIND          address to listen on                        (default 0.0.0.0:99)
+  WEB_WORKERS   number of pre-forked worker processes       (default number of CPUs)
+  WEB_THREADS   number of request threads per worker        (default 4)
+  WEB_TIMEOUT   seconds before a silent worker is restarted (default 30)
+"""
+
+import gc
+import multiprocessing
+import os
+
+
+bind         = os.environ.get('BIND') or '0.0.0.0:99'
+workers      = int(os.environ.get('WEB_WORKERS') or multiprocessing.cpu_count())
+threads      = int(os.environ.get('WEB_THREADS') or 4)
+worker_class = 'gthread'
+timeout      = int(os.environ.get('WEB_TIMEOUT') or 30)
+keepalive    = 5
+
+# import the app (and so load the model) once in the master, before forking the workers;
+# the workers then share the model pages copy-on-write instead of each loading its own copy
+preload_app  = True
+
+accesslog    = '-'
+errorlog     = '-'
+
+
+def when_ready(server):
+    # move everything loaded so far out of the garbage collector's reach, so that collections
+    # in the workers do not write to (and so copy) the shared pages
+    gc.freeze()
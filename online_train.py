@@ -0,0 +1,128 @@
+"""
+Incremental learning: update the online model with labelled sentences (__label__N<TAB>text, as sst_train.txt),
+in mini-batches, and checkpoint it to a model file that the service reloads without restarting
+(see ModelRegistry.watch & utilities/online.py)
+
+The online model is a Pipeline(HashingVectorizer, SGDClassifier): a fixed-width hashed feature space, and
+a linear classifier updated by partial_fit. The model file is created by the first run, and updated by the
+next ones; '-' reads the sentences from the standard input, as they come: the ones received are checkpointed
+after --interval seconds, even if no other sentence follows.
+
+in project dir, run:
+$ python online_train.py sst_train.txt --output sentiment_model_online          # start from the training set
+$ tail -n 0 -f corrected_labels.txt | python online_train.py - --output sentiment_model_online --interval 60
+$ python online_train.py --help
+
+and serve it, e.g.: MODELS="lr=sentiment_model_pickle,online=sentiment_model_online"
+"""
+
+import argparse
+import logging
+import queue
+import sys
+import threading
+
+from time                    import perf_counter
+
+from utilities.online        import OnlineLearner
+from utilities.training_data import parse_sst_line
+
+
+# Logging setting
+logging.basicConfig(level  = logging.INFO,
+                    format = "%(asctime)s  %(levelname)8s  %(filename)12s  %(funcName)12s  %(lineno)4d  %(message)s")
+online_logger = logging.getLogger("online_logger")
+
+# lines read ahead of the learner from the standard input
+READ_AHEAD_LINES = 10000
+
+
+def read_lines(f, learner):
+    """
+    the lines of f, as they come; while none comes, the learner is checkpointed once checkpoint_interval
+    seconds passed (a line read by a thread, so that waiting for the next one does not hold back a checkpoint)
+    """
+    if not learner.checkpoint_interval:
+        yield from f
+        return
+
+    lines = queue.Queue(maxsize = READ_AHEAD_LINES)
+
+    def run():
+        try:
+            for line in f:
+                lines.put(line)
+            lines.put(None)
+        except Exception as e:
+            lines.put(e)
+
+    threading.Thread(target = run, name = 'line-reader', daemon = True).start()
+    while True:
+        # until the next checkpoint is due, or a whole interval if nothing is to be checkpointed
+        timeout = learner.checkpoint_time + learner.checkpoint_interval - perf_counter()
+        try:
+            line = lines.get(timeout = timeout if timeout > 0 else learner.checkpoint_interval)
+        except queue.Empty:
+            learner.checkpoint_if_due()
+            continue
+        if line is None:
+            return
+        if isinstance(line, Exception):
+            raise line
+        yield line
+
+
+def learn_lines(learner, lines):
+    """
+    to learn every labelled line of lines; return the number of lines learnt
+    """
+    n_lines = 0
+    for line_number, line in enumerate(lines, start = 1):
+        if not line.strip():
+            continue
+        try:
+            label, text = parse_sst_line(line)
+            learner.learn(text, label)
+        except ValueError as e:
+            # a bad line of a trickle is skipped, not fatal
+            online_logger.warning('line %d skipped: %s', line_number, e)
+            continue
+        n_lines += 1
+    return n_lines
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description = 'Update the online sentiment model with labelled sentences.')
+    parser.add_argument('input_files',  nargs = '+', metavar = 'input_file',
+                        help = "labelled sentences (__label__N<TAB>text); '-' for the standard input")
+    parser.add_argument('--output',     default = 'sentiment_model_online', help = 'model file, read & updated')
+    parser.add_argument('--batch-size', default = 256, type = int, help = 'sentences per update')
+    parser.add_argument('--every',      default = 5000, type = int,
+                        help = 'sentences learnt between checkpoints (0: at the end only)')
+    parser.add_argument('--interval',   default = 60, type = float,
+                        help = 'seconds after which the sentences received are checkpointed (0: no time limit)')
+    args = parser.parse_args()
+
+    try:
+        learner = OnlineLearner(args.output, args.batch_size, args.every, args.interval, online_logger)
+    except ValueError as e:
+        sys.exit(str(e))
+    online_logger.info('%s, batch size %d', learner, args.batch_size)
+
+    start   = perf_counter()
+    n_lines = 0
+    try:
+        for input_file in args.input_files:
+            if input_file == '-':
+                n_lines += learn_lines(learner, read_lines(sys.stdin, learner))
+            else:
+                with open(input_file, encoding = 'utf-8') as f:
+                    n_lines += learn_lines(learner, f)
+    except KeyboardInterrupt:
+        online_logger.info('interrupted')
+    finally:
+        learner.checkpoint()
+
+    seconds = perf_counter() - start
+    online_logger.info('{} lines learnt in {:.1f} s ({:.0f} lines/s)'.format(n_lines, seconds, n_lines / seconds))
@@ -0,0 +1,187 @@
+"""
+Hyperparameter sweep over the text pre-processing flags and the Logistic Regression settings
+
+Every configuration of the grid (flags x vectorizer x classifier settings) is trained on the training set, and
+evaluated on the dev set (accuracy & macro F1 score, as Base.performance of train.py). The configurations
+that share the same flags are run together, by one worker process of a pool:
+  - every set is pre-processed once per flag combination (and cached on disk, see utilities/training_data.py:
+    a later sweep, or train.py, reads it back)
+  - the tf-idf features are computed once per flag combination & vectorizer, and shared by the classifier settings
+    (and cached on disk, see utilities/feature_cache.py: a later sweep trains the classifiers only)
+
+The results are written as a CSV table, one row per configuration, best macro F1 score first.
+
+in project dir, run:
+$ python sweep.py --output sweep_results.csv                          # 128 flag combinations, C = 1
+$ python sweep.py --vary lower_case rm_stop_words --C 0.1 1 10 --penalty l1 l2 --vectorizer count hashing
+$ python sweep.py --help
+"""
+
+import argparse
+import itertools
+import logging
+import multiprocessing
+import os
+
+import pandas as pd
+
+from time                           import perf_counter
+
+from train                          import Base
+from utilities                      import preprocessing_config
+from utilities.feature_cache        import FeatureCache
+from utilities.pipeline             import VECTORIZERS, build_pipeline
+from utilities.training_data        import read_split
+
+
+# Logging setting
+logging.basicConfig(level  = logging.INFO,
+                    format = "%(asctime)s  %(levelname)8s  %(filename)12s  %(funcName)12s  %(lineno)4d  %(message)s")
+sweep_logger = logging.getLogger("sweep_logger")
+
+# the seven flags of text_preprocessing, in order
+FLAG_NAMES = ['lower_case', 'rm_num', 'rm_html_tags', 'rm_whitespaces', 'rm_punctuation', 'rm_stop_words',
+              'conv_accented_char']
+
+
+def flag_grid(list_vary = FLAG_NAMES):
+    """
+    every combination of the flags of list_vary (on & off); the other flags keep their setting
+    of utilities/preprocessing_config.py
+
+    return a list of tuples of the seven flags, in order
+    """
+    unknown = set(list_vary) - set(FLAG_NAMES)
+    if unknown:
+        raise ValueError('flags are expected to be in ' + str(FLAG_NAMES) + ', got: ' + str(sorted(unknown)))
+
+    dict_config = {name: getattr(preprocessing_config, 'f_' + name) for name in FLAG_NAMES}
+
+    list_flags = []
+    for values in itertools.product([False, True], repeat = len(list_vary)):
+        dict_flags = {**dict_config, **dict(zip(list_vary, values))}
+        list_flags.append(tuple(bool(dict_flags[name]) for name in FLAG_NAMES))
+    return list(dict.fromkeys(list_flags))
+
+
+def clf_grid(list_c = [1.0], list_penalty = ['l2']):
+    """
+    every combination of the LogisticRegression settings, as build_pipeline clf_params
+    """
+    return [{'C': c, 'penalty': penalty} for c, penalty in itertools.product(list_c, list_penalty)]
+
+
+def evaluate_flags(flags, list_vectorizer, list_clf_params, train_file, dev_file, cache_dir):
+
+    """
+    Train & evaluate every configuration of one flag combination (run by a worker process)
+
+    return a list of result rows (dicts), one per vectorizer & classifier setting
+    """
+
+    start    = perf_counter()
+    df_train = read_split(train_file, flags, cache_dir = cache_dir, workers = 1)
+    df_dev   = read_split(dev_file,   flags, cache_dir = cache_dir, workers = 1)
+    read_s   = perf_counter() - start
+
+    base     = Base()
+    list_row = []
+    for vectorizer in list_vectorizer:
+        # vect & tfidf steps, fitted once for every classifier setting (or read from the feature cache)
+        start    = perf_counter()
+        features = build_pipeline(vectorizer)[:-1]
+        if cache_dir is None:
+            x_train = features.fit_transform(df_train['text'])
+            x_dev   = features.transform(df_dev['text'])
+        else:
+            feature_cache = FeatureCache(features, df_train['text'], cache_dir)
+            x_train       = feature_cache.x_train
+            x_dev         = feature_cache.transform(df_dev['text'])
+        vect_s   = perf_counter() - start
+
+        for clf_params in list_clf_params:
+            start = perf_counter()
+            clf   = build_pipeline(vectorizer, clf_params = clf_params)['clf']
+            clf.fit(x_train, df_train['truth'])
+            df_pred = df_dev.assign(pred = clf.predict(x_dev))
+
+            list_row.append({**dict(zip(FLAG_NAMES, flags)),
+                             'vectorizer': vectorizer,
+                             **clf_params,
+                             **base.performance(df_pred),
+                             'fit_s':      perf_counter() - start,
+                             'vect_s':     vect_s,
+                             'read_s':     read_s})
+
+    return list_row
+
+
+def run_sweep(list_flags, list_vectorizer, list_clf_params,
+              train_file = 'sst_train.txt',
+              dev_file   = 'sst_dev.txt',
+              cache_dir  = '.preprocessing_cache',
+              workers    = os.cpu_count()):
+
+    """
+    Run every configuration of the grid
+
+      list_flags       list  tuples of the seven flags (see flag_grid)
+      list_vectorizer  list  of VECTORIZERS
+      list_clf_params  list  LogisticRegression settings (see clf_grid)
+      train_file       str   set the configurations are trained on
+      dev_file         str   set the configurations are evaluated on
+      cache_dir        str   directory of the pre-processed sets & their features; None does not cache
+      workers          int   worker processes, one flag combination at a time each; 1 runs in this process
+
+    return a DataFrame of the results, one row per configuration, best macro F1 score first
+    """
+
+    list_task = [(flags, list_vectorizer, list_clf_params, train_file, dev_file, cache_dir) for flags in list_flags]
+    sweep_logger.info('{} configurations: {} flag combinations x {} vectorizers x {} classifier settings, '
+                      'workers: {}'.format(len(list_flags) * len(list_vectorizer) * len(list_clf_params),
+                                           len(list_flags), len(list_vectorizer), len(list_clf_params), workers))
+
+    list_row = []
+    if workers == 1:
+        for task in list_task:
+            list_row.extend(evaluate_flags(*task))
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            for list_task_row in pool.starmap(evaluate_flags, list_task, chunksize = 1):
+                list_row.extend(list_task_row)
+
+    return pd.DataFrame(list_row).sort_values('macro_f1', ascending = False, kind = 'stable') \
+                                 .reset_index(drop = True)
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description = 'Sweep the pre-processing flags & classifier settings.')
+    parser.add_argument('--vary',       nargs = '+', default = FLAG_NAMES, choices = FLAG_NAMES, metavar = 'FLAG',
+                        help = 'flags tried on & off (default: all seven); the others keep their setting')
+    parser.add_argument('--vectorizer', nargs = '+', default = ['count'], choices = VECTORIZERS)
+    parser.add_argument('--C',          nargs = '+', default = [1.0], type = float, dest = 'list_c',
+                        help = 'inverse regularisation strengths')
+    parser.add_argument('--penalty',    nargs = '+', default = ['l2'], choices = ['l1', 'l2'])
+    parser.add_argument('--train',      default = 'sst_train.txt', dest = 'train_file')
+    parser.add_argument('--dev',        default = 'sst_dev.txt',   dest = 'dev_file')
+    parser.add_argument('--cache-dir',  default = '.preprocessing_cache',
+                        help = 'directory of the pre-processed sets & their features')
+    parser.add_argument('--no-cache',   action = 'store_true', help = 'pre-process & vectorize the sets again, '
+                                                                      'cache nothing')
+    parser.add_argument('--workers',    default = os.cpu_count(), type = int, help = 'worker processes')
+    parser.add_argument('--output',     default = 'sweep_results.csv', help = 'CSV file of the results')
+    args = parser.parse_args()
+
+    start    = perf_counter()
+    df_sweep = run_sweep(flag_grid(args.vary), args.vectorizer, clf_grid(args.list_c, args.penalty),
+                         train_file = args.train_file,
+                         dev_file   = args.dev_file,
+                         cache_dir  = None if args.no_cache else args.cache_dir,
+                         workers    = args.workers)
+    df_sweep.to_csv(args.output, index = False)
+
+    print(df_sweep.head(10).to_string())
+    sweep_logger.info('{} configurations run in {:.1f} s, results: {}'.format(len(df_sweep),
+                                                                             perf_counter() - start,
+                                                                             args.output))
@@ -1,19 +1,17 @@
-import re
 import logging
 
-from flask                import request, jsonify, Blueprint
-from flask_restplus       import Api, Resource, fields
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-
-HTTP_BAD_REQUEST = 400
+from flask                    import request, Blueprint, current_app
+from flask_restplus           import Api, Resource, fields
+from utilities.model_registry import current_scoring_service
+from utilities.validation     import InvalidRequest, read_json_body, respond_with
 
 # Logging setting
-logging.basicConfig(level  = logging.INFO,
-                    format = "%(asctime)s  %(levelname)8s  %(filename)12s  %(funcName)12s  %(lineno)4d  %(message)s")
+# (configured by app.py)
 logger = logging.getLogger("mylogger")
 
-# NLTK setting
-sid = SentimentIntensityAnalyzer()
+# Scoring setting
+# the sentences are scored by the ScoringService of the model selected by the request (see
+# utilities/model_registry.py): the same models, result caches & validation as /curl
 
 # Flask Blueprint setting
 # (Registration is in app.py)
@@ -91,83 +89,29 @@ class MainClass(Resource):
     def post(self):
 
         # to retrieve the input sentence related to this request
-        # Flask helps to raise error if curl --data is not in JSON data type
-        dict_request = request.json
-        logger.info('dict_request:      ' + str(dict_request))
-        logger.info('dict_request type: ' + str(type(dict_request)))
-
-        # raise error if failed to decode JSON object
-        if len(dict_request) == 0:
-            message = "Failed to decode JSON object: No key/value pair in JSON. " \
-                      "Expecting one, with key of 'sentence'."
-            response = respond_with(message)
-            return response
-        elif len(dict_request) > 1:
-            message = "Failed to decode JSON object: More than one key/value pair in JSON. " \
-                      "Expecting only one, with key of 'sentence'."
+        # (None if it is not sent as JSON; an oversize or invalid JSON body is rejected, as by /curl)
+        try:
+            scoring_service = current_scoring_service()
+            dict_request    = read_json_body(request, current_app.config['MAX_PAYLOAD_BYTES'])
+        except InvalidRequest as e:
+            return respond_with(e.message, e.status_code)
+        logger.info('dict_request:      %s', dict_request)
+        logger.info('dict_request type: %s', type(dict_request))
+
+        # raise error if failed to decode JSON object, or if the input sentence is not valid
+        message = scoring_service.check_request(dict_request)
+        if message is not None:
             response = respond_with(message)
             return response
-        elif len(dict_request) == 1:
-            # get_json() is modified to accept different values for one key.
-            # In such case, it will return a list of values for the key.
-            #   eg. {'sentence': ['I love you.', 'I hate you.']}
-            # By default, it will only return the last value for the key.
-            #   eg. {'sentence': 'I hate you.'}
-
-            value = dict_request[next(iter(dict_request))]  # the value of the only key (either a str or a list)
-
-            # more than one value for the key
-            if type(value) is list:
-                if len(set(value)) == 1:
-                    # all the values are the same
-                    message = "Failed to decode JSON object: Repeated key/value pairs in JSON. " \
-                              "Expecting only one, with key of 'sentence'."
-                    response = respond_with(message)
-                else:
-                    message = "Failed to decode JSON object: More than one value for one key in JSON. " \
-                              "Expecting only one, with key of 'sentence'."
-                    response = respond_with(message)
-                return response
-            elif "sentence" not in dict_request.keys():
-                message = "Failed to decode JSON object: Expecting key/value pair with key of 'sentence'."
-                response = respond_with(message)
-                return response
-            elif not isinstance(dict_request["sentence"], str):
-                message = "Failed to decode JSON object: Expecting str data type for value in key/value pair " \
-                          "(enclosed in double quotes)."
-                response = respond_with(message)
-                return response
-        else:
-            pass
 
         # extract the input data
         sentence = dict_request["sentence"]
 
-        # raise error if the input sentence is not valid
-        if len(re.findall("[a-zA-Z]", sentence)) == 0:
-            message = "Failed to find English letter in the input sentence. Please try again."
-            response = respond_with(message)
-            return response
-        else:
-            pass
-
         # return floats for sentiment strength based on the input sentence
-        try:
-            dict_score = sid.polarity_scores(sentence)
-        except:
-            print("error in sid.polarity_scores(sentence)")
+        dict_score = scoring_service.score(sentence)
 
         return {
                     "status":   "Sentence analysed",
-                    "sentence": request.json["sentence"],
+                    "sentence": sentence,
                     "result":   dict_score
                }
-
-# Helper Methods
-def respond_with(message):
-    response = jsonify(status        = "error",
-                       status_code   = str(HTTP_BAD_REQUEST) + " - Bad Request",
-                       error_message = message)
-    # set the status code to 400
-    response.status_code = HTTP_BAD_REQUEST
-    return response
@@ -5,7 +5,7 @@ $ pytest -vv --disable-warnings
 '''
 
 import json
-from app                    import app, logger
+from app                    import app
 from pathlib                import Path
 # import JSONMixin to handle the 1-key multi-value scenario
 from werkzeug.wrappers.json import JSONMixin
@@ -372,6 +372,131 @@ def test_102():
         assert json.loads(response.data) == expected_response
 
 
+# batch scoring
+# per-sentence results and errors, in the order of the input sentences
+def test_201():
+    payload              = '{"sentences": ["I feel good.", 123, "!!! ???", "I feel bad."]}'
+    expected_status_code = 200
+    expected_response    = {
+        "results": [
+            {
+                "score":    {"compound": 0.4404, "neg": 0.0, "neu": 0.256, "pos": 0.744},
+                "sentence": "I feel good.",
+                "status":   "complete"
+            },
+            {
+                "error_message": "Failed to decode JSON object: Expecting str data type for value in "
+                                 "key/value pair (enclosed in double quotes).",
+                "sentence":      123,
+                "status":        "error",
+                "status_code":   "400 - Bad Request"
+            },
+            {
+                "error_message": "Failed to find English letter in the input sentence. Please try again.",
+                "sentence":      "!!! ???",
+                "status":        "error",
+                "status_code":   "400 - Bad Request"
+            },
+            {
+                "score":    {"compound": -0.5423, "neg": 0.778, "neu": 0.222, "pos": 0.0},
+                "sentence": "I feel bad.",
+                "status":   "complete"
+            }
+        ],
+        "status": "complete"
+    }
+
+    with app.test_client() as client:
+        # send request to server, and get response
+        response = client.post('http://localhost:98/curl/batch',
+                               json = json.loads(payload))
+        # check whether we get the expected response back
+        assert response.status_code      == expected_status_code
+        assert json.loads(response.data) == expected_response
+
+# key is not "sentences"
+def test_202():
+    payload              = '{"sentence": ["I feel good."]}'
+    expected_status_code = 400
+    expected_response    = {
+        "error_message": "Failed to decode JSON object: Expecting key/value pair with key of 'sentences'.",
+        "status":        "error",
+        "status_code":   "400 - Bad Request"
+    }
+
+    with app.test_client() as client:
+        # send request to server, and get response
+        response = client.post('http://localhost:98/curl/batch',
+                               json = json.loads(payload))
+        # check whether we get the expected response back
+        assert response.status_code      == expected_status_code
+        assert json.loads(response.data) == expected_response
+
+# value is not a list
+def test_203():
+    payload              = '{"sentences": "I feel good."}'
+    expected_status_code = 400
+    expected_response    = {
+        "error_message": "Failed to decode JSON object: Expecting list data type for value in key/value pair "
+                         "(enclosed in square brackets).",
+        "status":        "error",
+        "status_code":   "400 - Bad Request"
+    }
+
+    with app.test_client() as client:
+        # send request to server, and get response
+        response = client.post('http://localhost:98/curl/batch',
+                               json = json.loads(payload))
+        # check whether we get the expected response back
+        assert response.status_code      == expected_status_code
+        assert json.loads(response.data) == expected_response
+
+
+# the swagger-ui endpoint scores with the same service as /curl: same scores, same validation
+def test_206():
+    with app.test_client() as client:
+        curl_response    = client.post('http://localhost:98/curl',                      json = {"sentence": "I feel good."})
+        swagger_response = client.post('http://localhost:98/swagger-ui/Analyser APIs/', json = {"sentence": "I feel good."})
+        assert swagger_response.status_code == 200
+        assert json.loads(swagger_response.data) == {"status":   "Sentence analysed",
+                                                     "sentence": "I feel good.",
+                                                     "result":   json.loads(curl_response.data)["score"]}
+
+        curl_response    = client.post('http://localhost:98/curl',                      json = {"sentence": "!!! ???"})
+        swagger_response = client.post('http://localhost:98/swagger-ui/Analyser APIs/', json = {"sentence": "!!! ???"})
+        assert swagger_response.status_code == curl_response.status_code == 400
+        assert json.loads(swagger_response.data) == json.loads(curl_response.data)
+
+
+# a body larger than MAX_PAYLOAD_BYTES is rejected with 413, before it is decoded
+def test_207():
+    payload              = '{"sentence": "' + 'a' * app.config['MAX_PAYLOAD_BYTES'] + '"}'
+    expected_status_code = 413
+    expected_response    = {
+        "error_message": "Payload too large. Expecting at most " + str(app.config['MAX_PAYLOAD_BYTES']) + " bytes.",
+        "status":        "error",
+        "status_code":   "413 - Payload Too Large"
+    }
+
+    with app.test_client() as client:
+        response = client.post('http://localhost:98/curl', data = payload, content_type = 'application/json')
+        assert response.status_code      == expected_status_code
+        assert json.loads(response.data) == expected_response
+
+# a sentence longer than MAX_SENTENCE_LENGTH, and a body that is not valid JSON
+def test_208():
+    with app.test_client() as client:
+        response = client.post('http://localhost:98/curl',
+                               json = {"sentence": "a" * (app.config['MAX_SENTENCE_LENGTH'] + 1)})
+        assert response.status_code == 400
+        assert json.loads(response.data)["error_message"] == \
+               "Sentence too long. Expecting at most " + str(app.config['MAX_SENTENCE_LENGTH']) + " characters."
+
+        response = client.post('http://localhost:98/curl', data = '{"sentence": ', content_type = 'application/json')
+        assert response.status_code == 400
+        assert json.loads(response.data)["error_message"].startswith("Failed to decode JSON object: Expecting value")
+
+
 
 
 
@@ -398,6 +523,82 @@ def test_102():
 #             assert response.status_code      == expected_status_code
 #             assert json.loads(response.data) == expected_response
 
+# streaming endpoint: one result per non-blank line, in order; bad lines get an error result of their own
+def test_204():
+    payload              = '{"sentence": "I feel good."}\n' \
+                           '\n' \
+                           '{"sentence": 123}\n' \
+                           'I feel bad.\n' \
+                           '{"sentence": "I feel bad.", "score": 1}\n' \
+                           '{"sentence": "I feel bad."}'
+    expected_status_code = 200
+    expected_response    = [
+        {
+            "score":    {"compound": 0.4404, "neg": 0.0, "neu": 0.256, "pos": 0.744},
+            "sentence": "I feel good.",
+            "status":   "complete"
+        },
+        {
+            "error_message": "Failed to decode JSON object: Expecting str data type for value in "
+                             "key/value pair (enclosed in double quotes).",
+            "sentence":      123,
+            "status":        "error",
+            "status_code":   "400 - Bad Request"
+        },
+        {
+            "error_message": "Failed to decode JSON object: Expecting value: line 1 column 1 (char 0)",
+            "sentence":      None,
+            "status":        "error",
+            "status_code":   "400 - Bad Request"
+        },
+        {
+            "error_message": "Failed to decode JSON object: Expecting only one key/value pair, "
+                             "with key of 'sentence'.",
+            "sentence":      None,
+            "status":        "error",
+            "status_code":   "400 - Bad Request"
+        },
+        {
+            "score":    {"compound": -0.5423, "neg": 0.778, "neu": 0.222, "pos": 0.0},
+            "sentence": "I feel bad.",
+            "status":   "complete"
+        }
+    ]
+
+    with app.test_client() as client:
+        # send request to server, and get response
+        response = client.post('http://localhost:98/curl/stream',
+                               data         = payload,
+                               content_type = 'application/x-ndjson')
+        # check whether we get the expected response back
+        assert response.status_code == expected_status_code
+        assert response.mimetype    == 'application/x-ndjson'
+        assert [json.loads(line) for line in response.data.splitlines()] == expected_response
+
+# streaming endpoint: results are sent chunk by chunk, and a too long line is skipped without being kept
+def test_205():
+    chunk_size, max_line_size = app.config['STREAM_CHUNK_SIZE'], app.config['STREAM_MAX_LINE_BYTES']
+    app.config['STREAM_CHUNK_SIZE'], app.config['STREAM_MAX_LINE_BYTES'] = 2, 100
+    payload = '{"sentence": "I feel good."}\n' * 3 + \
+              '{"sentence": "' + 'a' * 200 + '"}\n' + \
+              '{"sentence": "I feel bad."}\n'
+
+    try:
+        with app.test_client() as client:
+            response = client.post('http://localhost:98/curl/stream',
+                                   data         = payload,
+                                   content_type = 'application/x-ndjson',
+                                   buffered     = False)
+            list_chunk = list(response.response)
+    finally:
+        app.config['STREAM_CHUNK_SIZE'], app.config['STREAM_MAX_LINE_BYTES'] = chunk_size, max_line_size
+
+    list_result = [json.loads(line) for chunk in list_chunk for line in chunk.splitlines()]
+    assert [chunk.count(b'\n') for chunk in list_chunk] == [2, 2, 1]
+    assert [result["status"] for result in list_result] == ["complete", "complete", "complete", "error", "complete"]
+    assert list_result[3]["error_message"] == "Line too long. Expecting at most 100 bytes per line."
+    assert list_result[4]["sentence"]      == "I feel bad."
+
 
 
 
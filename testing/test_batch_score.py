@@ -0,0 +1,65 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+import json
+import logging
+
+import pytest
+
+from batch_score          import batch_score
+from sklearn.linear_model import LogisticRegression
+from utilities.model_file import load_model_file, save_model_file
+from utilities.text       import text_predict_batch
+
+model_file = 'sentiment_model_pickle_default_sia'
+
+
+# the same scores, in input order, with 1 or 2 worker processes and chunks smaller than the file
+def test_701(tmp_path):
+    with open('sst_dev.txt', encoding = 'utf-8') as f:
+        list_line = [line.rstrip('\n').split('\t', 1) for line in f]
+    model           = load_model_file(model_file, logging.getLogger("test_logger"))['model']
+    list_dict_score = text_predict_batch([text for _, text in list_line], model)
+    expected        = [{'truth': int(label.replace('__label__', '')), 'score': dict_score}
+                       for (label, _), dict_score in zip(list_line, list_dict_score)]
+
+    for workers in [1, 2]:
+        output_file = str(tmp_path / ('scores_' + str(workers) + '.ndjson'))
+        n_lines     = batch_score('sst_dev.txt', output_file, model_file, workers = workers, chunk_size = 100)
+
+        with open(output_file, encoding = 'utf-8') as f:
+            assert [json.loads(line) for line in f] == expected
+        assert n_lines == len(expected)
+
+# plain text is detected, and a file mixing the two formats is rejected
+def test_702(tmp_path):
+    plain_file  = tmp_path / 'plain.txt'
+    mixed_file  = tmp_path / 'mixed.txt'
+    output_file = str(tmp_path / 'scores.ndjson')
+    plain_file.write_text('I feel good.\nI feel bad.\n', encoding = 'utf-8')
+    mixed_file.write_text('__label__4\tI feel good.\nI feel bad.\n', encoding = 'utf-8')
+
+    assert batch_score(str(plain_file), output_file, model_file, workers = 1) == 2
+    with open(output_file, encoding = 'utf-8') as f:
+        assert [list(json.loads(line).keys()) for line in f] == [['score'], ['score']]
+
+    with pytest.raises(ValueError, match = 'line 2 is not in the __label__N<TAB>text format'):
+        batch_score(str(mixed_file), output_file, model_file, workers = 1)
+
+
+# a model that text_predict_batch does not score is rejected, in this process or in worker processes
+def test_703(tmp_path):
+    input_file  = str(tmp_path / 'input.txt')
+    output_file = str(tmp_path / 'scores.ndjson')
+    other_model = str(tmp_path / 'model_other')
+    with open(input_file, 'w', encoding = 'utf-8') as f:
+        f.write('I feel good.\nI feel bad.\n')
+    model = LogisticRegression()
+    save_model_file(other_model, model, type(model), 'sentiment-analysis', 'v1', 'train',
+                    logging.getLogger("test_logger"))
+
+    for workers in [1, 2]:
+        with pytest.raises(ValueError, match = 'cannot score text'):
+            batch_score(input_file, output_file, other_model, workers = workers)
@@ -0,0 +1,134 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+import asyncio
+import json
+import time
+
+from app                import app, model_set
+from asgi               import create_asgi_app
+from utilities.batching import MicroBatcher
+
+
+# concurrent submits are scored in batches of at most max_batch_size, each caller getting its own result
+def test_1101():
+    list_batch = []
+
+    def score_batch(list_sentence):
+        list_batch.append(list_sentence)
+        return [sentence.upper() for sentence in list_sentence]
+
+    async def main():
+        batcher = MicroBatcher(score_batch, max_batch_size = 4, max_wait_us = 50000)
+        list_result = await asyncio.gather(*[batcher.submit('s' + str(i)) for i in range(10)])
+        await batcher.stop()
+        return list_result
+
+    assert asyncio.run(main()) == ['S' + str(i) for i in range(10)]
+    assert [len(batch) for batch in list_batch] == [4, 4, 2]
+
+# an error while scoring a batch is raised to every caller of the batch
+def test_1102():
+    def score_batch(list_sentence):
+        raise ValueError('model failed')
+
+    async def main():
+        batcher = MicroBatcher(score_batch, max_batch_size = 4, max_wait_us = 1000)
+        try:
+            return await asyncio.gather(batcher.submit('a'), batcher.submit('b'), return_exceptions = True)
+        finally:
+            await batcher.stop()
+
+    assert [str(result) for result in asyncio.run(main())] == ['model failed', 'model failed']
+
+# the ASGI /curl responds as the Flask /curl, for scores and errors
+def test_1103():
+    application = create_asgi_app(model_set, max_batch_size = 8, max_wait_us = 1000)
+
+    async def call(body):
+        list_message = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        list_sent    = []
+
+        async def receive():
+            return list_message.pop(0)
+
+        async def send(message):
+            list_sent.append(message)
+
+        await application({'type': 'http', 'path': '/curl', 'method': 'POST',
+                           'headers': [(b'content-type', b'application/json')]}, receive, send)
+        return list_sent[0]['status'], list_sent[1]['body']
+
+    async def main(list_body):
+        try:
+            return await asyncio.gather(*[call(body) for body in list_body])
+        finally:
+            await application.batcher.stop()
+
+    list_body = [json.dumps(payload).encode('utf-8') for payload in
+                 [{"sentence": "I feel good."}, {"sentence": "I feel bad."}, {"sentence": "!!! ???"}, {"x": "y"}]]
+    with app.test_client() as client:
+        expected = [(response.status_code, response.data) for response in
+                    [client.post('/curl', data = body, content_type = 'application/json') for body in list_body]]
+
+    assert asyncio.run(main(list_body)) == expected
+
+
+# a body larger than max_payload_bytes is refused with a 413; a client that disconnects is sent nothing
+def test_1104():
+    application = create_asgi_app(model_set, max_batch_size = 8, max_wait_us = 1000, max_payload_bytes = 100)
+
+    async def call(list_message):
+        list_sent = []
+
+        async def receive():
+            return list_message.pop(0)
+
+        async def send(message):
+            list_sent.append(message)
+
+        await application({'type': 'http', 'path': '/curl', 'method': 'POST',
+                           'headers': [(b'content-type', b'application/json')]}, receive, send)
+        return list_sent
+
+    async def main():
+        try:
+            too_large    = await call([{'type': 'http.request', 'body': b'x' * 60, 'more_body': True},
+                                       {'type': 'http.request', 'body': b'x' * 60, 'more_body': False}])
+            disconnected = await call([{'type': 'http.request', 'body': b'{"sentence": ', 'more_body': True},
+                                       {'type': 'http.disconnect'}])
+            return too_large, disconnected
+        finally:
+            await application.batcher.stop()
+
+    too_large, disconnected = asyncio.run(main())
+    assert too_large[0]['status'] == 413
+    assert disconnected == []
+
+
+# a sentence submitted while a batch is scored waits at most max_wait_us from its submit, not from the end
+# of that batch
+def test_1105():
+    def score_batch(list_sentence):
+        time.sleep(0.4)
+        return list_sentence
+
+    async def timed_submit(batcher, sentence, delay):
+        await asyncio.sleep(delay)
+        start = time.perf_counter()
+        await batcher.submit(sentence)
+        return time.perf_counter() - start
+
+    async def main():
+        batcher = MicroBatcher(score_batch, max_batch_size = 100, max_wait_us = 300000)
+        try:
+            # 'b' arrives while the batch of 'a' is scored (from 0.3 s to 0.7 s)
+            return await asyncio.gather(timed_submit(batcher, 'a', 0), timed_submit(batcher, 'b', 0.35))
+        finally:
+            await batcher.stop()
+
+    _, seconds_b = asyncio.run(main())
+    # 0.35 s waiting for the batch of 'a' to be scored, then 0.4 s scored; not another 0.3 s on top
+    assert seconds_b < 0.35 + 0.4 + 0.15
@@ -0,0 +1,22 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+from benchmarks.suite import compare, metric
+
+
+# a change for the worse beyond the threshold is a regression, whichever way the metric is better
+def test_1301():
+    baseline = {'metrics': {'latency.vader.p50': metric(100.0, 'us'),
+                            'throughput.vader':  metric(1000.0, 'sentences/s', higher_is_better = True),
+                            'memory.worker_rss': metric(1000.0, 'KiB')}}
+    new      = {'metrics': {'latency.vader.p50': metric(130.0, 'us'),
+                            'throughput.vader':  metric(700.0, 'sentences/s', higher_is_better = True),
+                            'memory.worker_rss': metric(900.0, 'KiB'),
+                            'latency.new.p50':   metric(1.0, 'us')}}
+
+    list_row = compare(new, baseline, threshold = 0.2)
+
+    assert [(name, round(change, 2), regression) for name, _, _, change, regression in list_row] == \
+           [('latency.vader.p50', 0.3, True), ('throughput.vader', 0.3, True), ('memory.worker_rss', -0.1, False)]
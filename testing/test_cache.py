@@ -0,0 +1,60 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+import logging
+
+from utilities.cache      import ResultCache
+from utilities.model_file import load_model_file
+from utilities.text       import resolve_predict
+
+model = load_model_file('sentiment_model_pickle_default_sia', logging.getLogger("test_logger"))['model']
+
+predict, predict_batch = resolve_predict(model)
+
+
+# repeated sentences are served from the cache, with the same result
+def test_401():
+    result_cache = ResultCache(capacity = 10)
+
+    first  = result_cache.predict("I feel good.",    predict, 'v1')
+    second = result_cache.predict(" I feel  good. ", predict, 'v1')
+
+    assert first == second == model.polarity_scores("I feel good.")
+    assert (result_cache.hits, result_cache.misses) == (1, 1)
+
+# least recently used entries are evicted beyond the capacity
+def test_402():
+    result_cache = ResultCache(capacity = 2)
+
+    result_cache.predict("I feel good.",  predict, 'v1')
+    result_cache.predict("I feel bad.",   predict, 'v1')
+    result_cache.predict("I feel good.",  predict, 'v1')
+    result_cache.predict("I feel great.", predict, 'v1')   # evicts "I feel bad."
+    result_cache.predict("I feel good.",  predict, 'v1')
+
+    assert result_cache.evictions == 1
+    assert result_cache.stats()['size'] == 2
+    assert (result_cache.hits, result_cache.misses) == (2, 3)
+
+# loading a different model version drops all the entries
+def test_403():
+    result_cache = ResultCache(capacity = 10)
+
+    result_cache.predict("I feel good.", predict, 'v1')
+    result_cache.predict("I feel good.", predict, 'v2')
+
+    assert result_cache.invalidations == 1
+    assert result_cache.misses        == 2
+    assert result_cache.model_version == 'v2'
+
+# batch prediction only sends the sentences not in the cache to the model
+def test_404():
+    result_cache = ResultCache(capacity = 10)
+
+    result_cache.predict("I feel good.", predict, 'v1')
+    list_dict_score = result_cache.predict_batch(["I feel good.", "I feel bad."], predict_batch, 'v1')
+
+    assert list_dict_score == [model.polarity_scores("I feel good."), model.polarity_scores("I feel bad.")]
+    assert (result_cache.hits, result_cache.misses) == (1, 2)
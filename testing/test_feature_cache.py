@@ -0,0 +1,89 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+import multiprocessing
+import os
+
+import numpy  as np
+import pandas as pd
+
+from train                   import LogisticRegressor
+from utilities.feature_cache import FeatureCache
+from utilities.pipeline      import build_pipeline
+from utilities.training_data import read_sst
+
+
+def memory_mapped(array):
+    while array is not None and not isinstance(array, np.memmap):
+        array = getattr(array, 'base', None)
+    return array is not None
+
+
+def build_entry(args):
+    series, cache_dir = args
+    return FeatureCache(build_pipeline('count')[:-1], series, cache_dir).x_train.toarray()
+
+
+# features read back from the cache (memory-mapped) equal the ones vectorized from text
+def test_1601(tmp_path):
+    df_train = read_sst('sst_dev.txt')
+    series   = read_sst('sst_test.txt')['text']
+
+    features = build_pipeline('count')[:-1]
+    x_train  = features.fit_transform(df_train['text'])
+    x_test   = features.transform(series)
+
+    FeatureCache(build_pipeline('count')[:-1], df_train['text'], str(tmp_path)).transform(series)
+    feature_cache = FeatureCache(build_pipeline('count')[:-1], df_train['text'], str(tmp_path))
+    x_test_cache  = feature_cache.transform(series)
+
+    assert memory_mapped(feature_cache.x_train.data) and memory_mapped(x_test_cache.indices)
+    assert (feature_cache.x_train != x_train).nnz == 0
+    assert (x_test_cache != x_test).nnz == 0 and x_test_cache.shape == x_test.shape
+
+
+# a change to the training text or to the vectorizer settings misses the cache; to another set, too
+def test_1602(tmp_path):
+    series        = read_sst('sst_dev.txt')['text']
+    cache_dir     = str(tmp_path)
+    feature_cache = FeatureCache(build_pipeline('count')[:-1], series, cache_dir)
+
+    assert FeatureCache(build_pipeline('count')[:-1], series, cache_dir).directory == feature_cache.directory
+    assert FeatureCache(build_pipeline('hashing')[:-1], series, cache_dir).directory != feature_cache.directory
+    assert FeatureCache(build_pipeline('count')[:-1].set_params(vect__ngram_range = (1, 2)), series,
+                        cache_dir).directory != feature_cache.directory
+    assert FeatureCache(build_pipeline('count')[:-1], series.str.lower(), cache_dir).directory != \
+           feature_cache.directory
+    assert len(os.listdir(os.path.join(cache_dir, 'features'))) == 4
+
+    x_1 = feature_cache.transform(pd.Series(["a good film"]))
+    x_2 = feature_cache.transform(pd.Series(["a bad film"]))
+    assert (x_1 != x_2).nnz > 0
+
+
+# a model trained on cached features predicts as the one trained from text
+def test_1603(tmp_path):
+    df_train = read_sst('sst_dev.txt')
+    df_test  = read_sst('sst_test.txt')
+
+    regressor = LogisticRegressor()
+    regressor.fit(df_train)
+
+    for _ in range(2):   # cache filled, then read back
+        regressor_cache = LogisticRegressor()
+        regressor_cache.fit(df_train, cache_dir = str(tmp_path))
+        assert list(regressor_cache.predict_df(df_test)['pred']) == list(regressor.predict_df(df_test)['pred'])
+        assert list(regressor_cache.pipeline.predict(df_test['text'])) == list(regressor.predict_df(df_test)['pred'])
+
+
+# processes that build the same entry at once neither fail nor leave files aside; all get the same features
+def test_1604(tmp_path):
+    series = read_sst('sst_dev.txt')['text'][:300]
+    with multiprocessing.Pool(8) as pool:
+        list_x = pool.map(build_entry, [(series, str(tmp_path))] * 16, chunksize = 1)
+
+    assert all(np.array_equal(x, list_x[0]) for x in list_x)
+    directory = FeatureCache(build_pipeline('count')[:-1], series, str(tmp_path)).directory
+    assert sorted(os.listdir(directory)) == ['features.pkl', 'train']
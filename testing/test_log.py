@@ -0,0 +1,53 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+import json
+import logging
+import logging.handlers
+import queue
+
+from app           import app
+from utilities.log import JSONFormatter, LazyQueueHandler, RouteSampledLogger, parse_sample_rates
+
+
+def make_record(level = logging.INFO):
+    return logging.LogRecord('app_logger', level, 'app.py', 1, 'dict_request: %s', ({'sentence': 'x'},), None)
+
+
+def test_901():
+    assert parse_sample_rates('')                                == {}
+    assert parse_sample_rates('main.curl_scoring=0.01, *=0.5')   == {'main.curl_scoring': 0.01, '*': 0.5}
+
+# the records of a request are all kept or all dropped, with the rate of its route; warnings always kept
+def test_902():
+    logger  = logging.getLogger('test_902')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(logging.handlers.BufferingHandler(capacity = 100))
+    sampled_logger   = RouteSampledLogger(logger, {'main.curl_scoring': 0.0, '*': 1.0})
+
+    with app.test_request_context('/curl', method = 'POST'):
+        for i in range(3):
+            sampled_logger.info('dropped %s', i)
+        sampled_logger.warning('kept')
+    with app.test_request_context('/curl/batch', method = 'POST'):
+        sampled_logger.info('kept')
+    sampled_logger.info('kept')
+
+    records = logger.handlers[0].buffer
+    assert [record.getMessage() for record in records] == ['kept', 'kept', 'kept']
+    assert [record.route        for record in records] == ['main.curl_scoring', 'main.curl_batch_scoring', None]
+
+# the record is queued with its arguments, and formatted as one JSON object by the listener side
+def test_903():
+    queue_handler = LazyQueueHandler(queue.SimpleQueue())
+    queue_handler.handle(make_record())
+    record = queue_handler.queue.get_nowait()
+
+    assert record.msg == 'dict_request: %s'   # not formatted yet
+
+    dict_record = json.loads(JSONFormatter().format(record))
+    assert dict_record['message'] == "dict_request: {'sentence': 'x'}"
+    assert (dict_record['level'], dict_record['logger'], dict_record['route']) == ('INFO', 'app_logger', None)
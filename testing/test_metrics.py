@@ -0,0 +1,54 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+import math
+
+from app               import app
+from utilities.metrics import Histogram, LatencyMetrics
+from utilities.text    import Preprocessor
+
+
+# quantiles are interpolated within the bucket they fall in
+def test_801():
+    histogram = Histogram(bounds = [1.0, 2.0, 4.0])
+
+    assert math.isnan(histogram.quantile(0.5))
+    for value in [0.5] * 50 + [1.5] * 40 + [3.0] * 9 + [10.0]:
+        histogram.observe(value)
+
+    assert histogram.count == 100
+    assert histogram.quantile(0.5)  == 1.0
+    assert histogram.quantile(0.7)  == 1.5
+    assert histogram.quantile(0.95) == 2.0 + 2.0 * 5 / 9
+    assert histogram.quantile(1.0)  == 4.0   # in the +Inf bucket
+
+# every pre-processing stage is timed under its own name, with the same output as an untimed call
+def test_802():
+    metrics      = LatencyMetrics()
+    preprocessor = Preprocessor(f_rm_stop_words = False)
+    text         = "  <b>Café</b> 42 times, GOOD!  "
+
+    assert preprocessor.timed(text, metrics) == preprocessor(text)
+    assert sorted(metrics.histograms) == sorted(name for name, _ in preprocessor.stages)
+    assert all(histogram.count == 1 for histogram in metrics.histograms.values())
+
+    metrics.enabled = False
+    preprocessor.timed(text, metrics)
+    assert all(histogram.count == 1 for histogram in metrics.histograms.values())
+
+# /metrics exposes the stages of a /curl request, with their p50 / p95 / p99
+def test_803():
+    with app.test_client() as client:
+        client.post('http://localhost:98/curl', json = {"sentence": "test_803 is a fine test."})
+        response = client.get('http://localhost:98/metrics')
+
+    text = response.data.decode('utf-8')
+    assert response.status_code == 200
+    assert response.mimetype    == 'text/plain'
+    for stage in ['parse', 'validation', 'inference', 'serialization', 'total']:
+        assert 'sentiment_stage_seconds_bucket{stage="' + stage + '",le="+Inf"} ' in text
+        for quantile in ['0.5', '0.95', '0.99']:
+            assert 'sentiment_stage_quantile_seconds{stage="' + stage + '",quantile="' + quantile + '"} ' in text
+    assert 'sentiment_result_cache_misses_total ' in text
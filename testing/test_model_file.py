@@ -0,0 +1,74 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+import logging
+import os
+
+import pandas as pd
+
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+from sklearn.linear_model            import LogisticRegression
+from sklearn.pipeline                import Pipeline
+from utilities.mapped_model          import MappedLinearModel
+from utilities.model_file            import load_model_file, save_model_file
+from utilities.pipeline              import build_pipeline
+from utilities.text                  import text_predict_batch
+
+logger = logging.getLogger("test_logger")
+
+
+def read_sst(file_name):
+    return pd.read_csv(file_name, sep = '\t', header = None, names = ['truth', 'text'])
+
+
+def train_pipeline():
+    df = read_sst('sst_dev.txt')
+    return Pipeline([('vect',  CountVectorizer()),
+                     ('tfidf', TfidfTransformer()),
+                     ('clf',   LogisticRegression(solver = 'liblinear'))]).fit(df['text'], df['truth'])
+
+
+# the mapped format is picked by its header, and predicts like the pipeline it was saved from
+def test_501(tmp_path):
+    pipeline = train_pipeline()
+    filename = str(tmp_path / 'sentiment_model_mapped')
+    save_model_file(filename, pipeline, type(pipeline), 'sentiment-analysis', 'v1', 'train', logger,
+                    file_format = 'mapped')
+
+    model_files = load_model_file(filename, logger)
+    list_text   = list(read_sst('sst_test.txt')['text'])
+
+    assert type(model_files['model']) is MappedLinearModel
+    assert model_files['version'] == 'v1'
+    assert list(model_files['model'].predict(list_text)) == list(pipeline.predict(list_text))
+    assert list(model_files['model'].predict([])) == []
+
+# pickled model files keep loading
+def test_502(tmp_path):
+    pipeline = train_pipeline()
+    filename = str(tmp_path / 'sentiment_model_pickle')
+    save_model_file(filename, pipeline, type(pipeline), 'sentiment-analysis', 'v1', 'train', logger)
+
+    model_files = load_model_file(filename, logger)
+
+    assert type(model_files['model']) is Pipeline
+    assert len(os.listdir(str(tmp_path))) == 2   # with and without time
+
+# the hashing pipeline has no vocabulary, is served by text_predict, and predicts the same once mapped
+def test_503(tmp_path):
+    df       = read_sst('sst_dev.txt')
+    pipeline = build_pipeline('hashing', 2 ** 12).fit(df['text'], df['truth'])
+    filename = str(tmp_path / 'sentiment_model_mapped')
+    save_model_file(filename, pipeline, type(pipeline), 'sentiment-analysis', 'v1', 'train', logger,
+                    file_format = 'mapped')
+
+    model     = load_model_file(filename, logger)['model']
+    list_text = list(read_sst('sst_test.txt')['text'])
+
+    assert not hasattr(pipeline['vect'], 'vocabulary_')
+    assert text_predict_batch(list_text[:2], pipeline) == [{'score': str(score)}
+                                                           for score in pipeline.predict(list_text[:2])]
+    assert type(model) is MappedLinearModel
+    assert list(model.predict(list_text)) == list(pipeline.predict(list_text))
@@ -0,0 +1,115 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+import logging
+import os
+import time
+
+import pandas as pd
+
+from nltk.sentiment.vader     import SentimentIntensityAnalyzer
+from app                      import app, model_set
+from utilities.model_file     import save_model_file
+from utilities.model_registry import ModelRegistry, ModelSet, parse_models
+from utilities.pipeline       import build_pipeline
+
+logger = logging.getLogger("test_logger")
+
+
+def save_vader(filename, version):
+    model = SentimentIntensityAnalyzer()
+    save_model_file(filename, model, type(model), 'sentiment-analysis', version, 'train', logger)
+
+
+def wait_loaded(registry, timeout_s = 10):
+    deadline = time.time() + timeout_s
+    while registry.loading and time.time() < deadline:
+        time.sleep(0.01)
+
+
+# a background reload swaps the service; a request holding the previous one is unaffected,
+# and a file that fails to load leaves the current model served
+def test_1201(tmp_path):
+    filename_v1 = str(tmp_path / 'model_v1')
+    filename_v2 = str(tmp_path / 'model_v2')
+    save_vader(filename_v1, 'v1')
+    save_vader(filename_v2, 'v2')
+
+    registry = ModelRegistry(100, 1000, logger)
+    assert registry.load(filename_v1)
+    service_v1 = registry.service
+
+    assert registry.reload(filename_v2)
+    wait_loaded(registry)
+    assert registry.service.model_version == filename_v2 + '@v2'
+    assert service_v1.score("I feel good.") == registry.service.score("I feel good.")
+
+    with open(filename_v1, 'wb') as f:
+        f.write(b'not a model')
+    assert not registry.load(filename_v1)
+    assert registry.service.model_version == filename_v2 + '@v2'
+    assert [record['status'] for record in registry.history] == ['loaded', 'loaded', 'failed']
+    assert all(record['load_ms'] >= 0 for record in registry.history)
+
+# the watcher reloads the model file once it is replaced
+def test_1202(tmp_path):
+    filename = str(tmp_path / 'model')
+    save_vader(filename, 'v1')
+
+    registry = ModelRegistry(100, 1000, logger)
+    registry.load(filename)
+    registry.watch(0.02)
+
+    save_vader(filename, 'v2')
+    os.utime(filename, ns = (time.time_ns() + 10 ** 9, time.time_ns() + 10 ** 9))
+    deadline = time.time() + 10
+    while registry.service.model_version != filename + '@v2' and time.time() < deadline:
+        time.sleep(0.02)
+    assert registry.service.model_version == filename + '@v2'
+
+# the admin endpoints need the token, and only switch to the listed model files
+def test_1203():
+    with app.test_client() as client:
+        app.config['ADMIN_TOKEN'] = ''
+        assert client.get('/admin/model').status_code == 403
+
+        app.config['ADMIN_TOKEN'] = 'secret'
+        try:
+            assert client.get('/admin/model', headers = {'X-Admin-Token': 'wrong'}).status_code == 403
+
+            response = client.get('/admin/model', headers = {'X-Admin-Token': 'secret'})
+            assert response.status_code == 200
+            assert response.get_json()['models']['default']['history'][0]['status'] == 'loaded'
+
+            response = client.post('/admin/model/reload', headers = {'X-Admin-Token': 'secret'},
+                                   json = {'model_file': '/etc/passwd'})
+            assert response.status_code == 400
+        finally:
+            app.config['ADMIN_TOKEN'] = ''
+
+def test_1204():
+    assert parse_models('', 'model_file')          == {'default': 'model_file'}
+    assert parse_models('vader=a, lr=b', 'unused') == {'vader': 'a', 'lr': 'b'}
+
+# a request selects its model by the X-Model header or ?model=, and gets the default one otherwise
+def test_1205():
+    df          = pd.read_csv('sst_dev.txt', sep = '\t', header = None, names = ['truth', 'text'])
+    registry_lr = ModelRegistry(100, 1000, logger)
+    registry_lr.set_model(build_pipeline().fit(df['text'], df['truth']), 'lr@v1')
+    two_models  = ModelSet({'vader': model_set.default, 'lr': registry_lr}, 'vader')
+
+    app.extensions['model_set'] = two_models
+    try:
+        with app.test_client() as client:
+            def score(**kwargs):
+                return client.post('/curl', json = {"sentence": "I feel good."}, **kwargs).get_json()
+
+            assert 'compound' in score()['score']
+            assert 'score'    in score(headers = {'X-Model': 'lr'})['score']
+            assert 'score'    in score(query_string = {'model': 'lr'})['score']
+            assert score(headers = {'X-Model': 'nope'})['error_message'] == \
+                   "Unknown model: nope. Expecting one of ['vader', 'lr']."
+    finally:
+        app.extensions['model_set'] = model_set
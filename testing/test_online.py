@@ -0,0 +1,128 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from nltk.sentiment.vader     import SentimentIntensityAnalyzer
+from online_train             import learn_lines, read_lines
+from utilities.model_file     import load_model_file, save_model_file
+from utilities.model_registry import ModelRegistry
+from utilities.online         import OnlineLearner
+from utilities.text           import text_predict_batch
+from utilities.training_data  import parse_sst_line
+
+logger = logging.getLogger("test_logger")
+
+
+def read_labelled(file_name, limit):
+    with open(file_name, encoding = 'utf-8') as f:
+        return [parse_sst_line(line) for line in f][:limit]
+
+
+# sentences are learnt in mini-batches, and checkpointed to a model file served as the other models;
+# a learner started on the checkpoint carries on from it
+def test_1701(tmp_path):
+    model_file = str(tmp_path / 'model_online')
+    learner    = OnlineLearner(model_file, 100, 0, 0, logger)
+
+    for label, text in read_labelled('sst_train.txt', 250):
+        learner.learn(text, label)
+    assert learner.learnt == 200 and len(learner.pending) == 50
+    assert not os.path.exists(model_file)
+
+    learner.checkpoint()
+    model_files = load_model_file(model_file, logger)
+    assert learner.learnt == 250 and model_files['version'].endswith('-250')
+    assert model_files['train/pred'] == 'online'
+    assert os.listdir(str(tmp_path)) == ['model_online']
+
+    list_dict_score = text_predict_batch(["a great film", "a dull, awful film"], model_files['model'])
+    assert all(dict_score['score'] in ['1', '2', '3', '4', '5'] for dict_score in list_dict_score)
+
+    assert OnlineLearner(model_file, 100, 0, 0, logger).learnt == 250
+
+    with pytest.raises(ValueError):
+        learner.learn("a sentence", 6)
+
+    model = SentimentIntensityAnalyzer()
+    save_model_file(str(tmp_path / 'vader'), model, type(model), 'sentiment-analysis', 'v1', 'train', logger)
+    with pytest.raises(ValueError):
+        OnlineLearner(str(tmp_path / 'vader'), 100, 0, 0, logger)
+
+
+# a checkpoint is written every checkpoint_every sentences, and picked up by the service watching the file
+def test_1702(tmp_path):
+    model_file = str(tmp_path / 'model_online')
+    learner    = OnlineLearner(model_file, 50, 100, 0, logger)
+    list_row   = read_labelled('sst_train.txt', 300)
+    for label, text in list_row[:100]:
+        learner.learn(text, label)
+    assert load_model_file(model_file, logger)['version'].endswith('-100')
+
+    registry = ModelRegistry(100, 1000, logger)
+    registry.load(model_file)
+    registry.watch(0.02)
+    registry.service.score("a great film")
+
+    for label, text in list_row[100:]:
+        learner.learn(text, label)
+
+    deadline = time.time() + 10
+    while not registry.service.model_version.endswith('-300') and time.time() < deadline:
+        time.sleep(0.02)
+    assert registry.service.model_version.endswith('-300')
+    assert registry.service.score("a great film")['score'] in ['1', '2', '3', '4', '5']
+
+
+# a sentence received from a stream is checkpointed after checkpoint_interval, with no other sentence after it
+def test_1703(tmp_path):
+    model_file = str(tmp_path / 'model_online')
+    learner    = OnlineLearner(model_file, 256, 0, 0.2, logger)
+    fd_read, fd_write = os.pipe()
+
+    with open(fd_read, encoding = 'utf-8') as f_read:
+        thread = threading.Thread(target = learn_lines, args = (learner, read_lines(f_read, learner)), daemon = True)
+        thread.start()
+        f_write = open(fd_write, 'w', encoding = 'utf-8')
+        f_write.write('__label__5\ta great film\n')
+        f_write.flush()
+
+        deadline = time.time() + 10
+        while not os.path.exists(model_file) and time.time() < deadline:
+            time.sleep(0.02)
+        assert load_model_file(model_file, logger)['version'].endswith('-1')
+        assert thread.is_alive()
+
+        f_write.close()
+        thread.join(10)
+        assert not thread.is_alive()
+
+
+# a run with nothing to learn writes no model file: neither an unfitted model, nor an unchanged one
+def test_1704(tmp_path):
+    model_file = str(tmp_path / 'model_online')
+    empty_file = tmp_path / 'empty.txt'
+    empty_file.write_text('', encoding = 'utf-8')
+
+    command = [sys.executable, 'online_train.py', str(empty_file), '--output', model_file]
+    subprocess.run(command, check = True)
+    assert not os.path.exists(model_file)
+
+    learner = OnlineLearner(model_file, 100, 0, 0, logger)
+    for label, text in read_labelled('sst_train.txt', 10):
+        learner.learn(text, label)
+    assert learner.checkpoint()
+    stat = os.stat(model_file)
+
+    subprocess.run(command, check = True)
+    assert os.stat(model_file).st_mtime_ns == stat.st_mtime_ns
+    assert not learner.checkpoint()
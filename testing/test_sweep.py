@@ -0,0 +1,49 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+import pytest
+
+from sweep                   import FLAG_NAMES, clf_grid, flag_grid, run_sweep
+from train                   import LogisticRegressor
+from utilities.training_data import read_split
+
+
+# every combination of the flags varied, once; the other flags keep their setting (all off by default)
+def test_1501():
+    assert len(flag_grid()) == 128
+    assert len(set(flag_grid())) == 128
+
+    list_flags = flag_grid(['lower_case', 'rm_stop_words'])
+    assert len(list_flags) == 4
+    assert all(not any(flags[1:5]) and not flags[6] for flags in list_flags)
+
+    assert clf_grid([0.1, 1.0], ['l1', 'l2'])[1] == {'C': 0.1, 'penalty': 'l2'}
+
+    with pytest.raises(ValueError):
+        flag_grid(['lower_case', 'no_such_flag'])
+
+
+# the configurations run in a pool, sharing pre-processing & features, score as one full training each
+def test_1502(tmp_path):
+    list_flags      = flag_grid(['lower_case'])
+    list_clf_params = clf_grid([0.5, 2.0])
+    df_sweep        = run_sweep(list_flags, ['count'], list_clf_params,
+                                train_file = 'sst_dev.txt',
+                                dev_file   = 'sst_test.txt',
+                                cache_dir  = str(tmp_path),
+                                workers    = 2)
+
+    assert len(df_sweep) == 4
+    assert list(df_sweep['macro_f1']) == sorted(df_sweep['macro_f1'], reverse = True)
+
+    row       = df_sweep[df_sweep['lower_case'] & (df_sweep['C'] == 2.0)].iloc[0]
+    flags     = tuple(bool(row[name]) for name in FLAG_NAMES)
+    regressor = LogisticRegressor()
+    regressor.pipeline.set_params(clf__C = 2.0)
+    regressor.fit(read_split('sst_dev.txt', flags, workers = 1))
+    dict_performance = regressor.performance(regressor.predict_df(read_split('sst_test.txt', flags, workers = 1)))
+
+    assert row['accuracy'] == pytest.approx(dict_performance['accuracy'])
+    assert row['macro_f1'] == pytest.approx(dict_performance['macro_f1'])
@@ -0,0 +1,60 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+import itertools
+import os
+
+import pandas as pd
+import pytest
+
+from utilities.text import text_preprocessing, Preprocessor
+
+
+sentences = ["I'D l@&$%%^ov*)e t+++o <p>haVe<h1> thRee cUPs   of Lat81405878tè<br /><br />frOM yo74593ur caffè. ",
+             "Tom &amp; Jerry 's 2nd film is n't bad , is it ?",
+             "   ",
+             " \n ",
+             "",
+             "Été à la plage : 10/10"]
+
+
+# Preprocessor gives the same output as text_preprocessing, for every flag combination
+def test_301():
+    for flags in itertools.product([True, False], repeat = 7):
+        preprocessor = Preprocessor(*flags)
+        for sentence in sentences:
+            assert preprocessor(sentence) == text_preprocessing(sentence, *flags)
+
+# only the enabled steps are run, in the order of text_preprocessing
+def test_302():
+    preprocessor = Preprocessor(f_lower_case         = True,
+                                f_rm_num             = False,
+                                f_rm_html_tags       = True,
+                                f_rm_whitespaces     = False,
+                                f_rm_punctuation     = True,
+                                f_rm_stop_words      = False,
+                                f_conv_accented_char = True)
+
+    assert [name for name, _ in preprocessor.stages] == ['lowercase', 'html', 'punctuation', 'unidecode']
+
+# Preprocessor.transform (column-wise) gives the same output as text_preprocessing row by row
+def test_303():
+    series = pd.Series(sentences, index = range(10, 10 + len(sentences)))
+    for flags in itertools.product([True, False], repeat = 7):
+        transformed = Preprocessor(*flags).transform(series)
+        assert list(transformed.index) == list(series.index)
+        assert list(transformed) == [text_preprocessing(sentence, *flags) for sentence in sentences]
+
+# on a sample of sst_dev.txt (one sentence in 5), Preprocessor & Preprocessor.transform give the same output
+# as text_preprocessing, for every flag combination
+@pytest.mark.skipif(not os.path.exists('sst_dev.txt'), reason = 'sst_dev.txt not found')
+@pytest.mark.parametrize('flags', list(itertools.product([True, False], repeat = 7)))
+def test_304(flags):
+    series       = pd.read_csv('sst_dev.txt', sep = '\t', header = None, names = ['truth', 'text'])['text'][::5]
+    preprocessor = Preprocessor(*flags)
+    expected     = [text_preprocessing(sentence, *flags) for sentence in series]
+
+    assert [preprocessor(sentence) for sentence in series] == expected
+    assert list(preprocessor.transform(series)) == expected
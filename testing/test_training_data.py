@@ -0,0 +1,82 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+import multiprocessing
+import os
+
+import pandas as pd
+
+import train
+import utilities.training_data as training_data
+
+from utilities.model_file    import load_model_file
+from utilities.text          import Preprocessor
+from utilities.training_data import cache_key, preprocess_parallel, read_split
+
+all_flags = (True, True, True, True, True, True, True)
+
+
+def read_cached(cache_dir):
+    return read_split('sst_dev.txt', all_flags, cache_dir = cache_dir, workers = 1)
+
+
+# pre-processing split across processes returns what a single Preprocessor.transform does, in order
+def test_1401(monkeypatch):
+    series = pd.read_csv('sst_dev.txt', sep = '\t', header = None, names = ['truth', 'text'])['text']
+    monkeypatch.setattr(training_data, 'MIN_PARALLEL_ROWS', 0)
+
+    assert preprocess_parallel(series, all_flags, workers = 3).equals(Preprocessor(*all_flags).transform(series))
+
+
+# a split is cached under its file content, flags & column names: read back as it was written, and pre-processed
+# again once the file or a flag changes
+def test_1402(tmp_path):
+    file_name = str(tmp_path / 'split.txt')
+    cache_dir = str(tmp_path / 'cache')
+    with open(file_name, 'w') as f:
+        f.write("__label__1\tThis is <b>NOT</b> good!\n__label__5\tA great 2nd film.\n")
+
+    df = read_split(file_name, all_flags, cache_dir = cache_dir, workers = 1)
+    assert list(df['truth']) == [1, 5]
+    assert os.listdir(cache_dir) == [cache_key(file_name, all_flags) + '.pkl']
+
+    pd.testing.assert_frame_equal(read_split(file_name, all_flags, cache_dir = cache_dir), df)
+
+    no_flags = (False,) * 7
+    assert cache_key(file_name, no_flags) != cache_key(file_name, all_flags)
+    assert read_split(file_name, no_flags, cache_dir = cache_dir)['text'][0] == "This is <b>NOT</b> good!"
+
+    col_names = ['truth', 'text', 'source']
+    assert cache_key(file_name, all_flags, col_names) != cache_key(file_name, all_flags)
+    assert list(read_split(file_name, all_flags, col_names, cache_dir = cache_dir).columns) == col_names
+
+    key = cache_key(file_name, all_flags)
+    with open(file_name, 'a') as f:
+        f.write("__label__3\tFair enough.\n")
+    assert cache_key(file_name, all_flags) != key
+    assert len(read_split(file_name, all_flags, cache_dir = cache_dir)) == 3
+
+
+# training runs from the CLI, not at import: main writes the model file
+def test_1403(tmp_path):
+    output = str(tmp_path / 'model')
+    train.main(['--train',     'sst_dev.txt',
+                '--output',    output,
+                '--cache-dir', str(tmp_path / 'cache'),
+                '--workers',   '1'])
+
+    model = load_model_file(output, train.training_logger)['model']
+    assert set(model.predict(["a great film", "a dull, awful film"])) <= {1, 2, 3, 4, 5}
+
+
+# runs caching the same split at once all read it whole, and leave a single cache file behind
+def test_1404(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    with multiprocessing.Pool(8) as pool:
+        list_df = pool.map(read_cached, [cache_dir] * 16, chunksize = 1)
+
+    assert all(df.equals(list_df[0]) for df in list_df)
+    assert os.listdir(cache_dir) == [cache_key('sst_dev.txt', all_flags) + '.pkl']
+    pd.testing.assert_frame_equal(read_cached(cache_dir), list_df[0])
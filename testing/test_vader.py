@@ -0,0 +1,35 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+import logging
+
+from utilities.model_file import load_model_file
+from utilities.vader      import CompiledVader
+
+model = load_model_file('sentiment_model_pickle_default_sia', logging.getLogger("test_logger"))['model']
+
+
+# CompiledVader gives exactly the scores of polarity_scores, on every sentence of sst_test.txt
+def test_601():
+    compiled_vader = CompiledVader(model)
+
+    with open('sst_test.txt', encoding = 'utf-8') as f:
+        for line in f:
+            text = line.rstrip('\n').split('\t', 1)[1]
+            assert compiled_vader.polarity_scores(text) == model.polarity_scores(text)
+
+# the rules polarity_scores gets from its nltk version: negation, boosters, idioms, 'but', caps, punctuation
+def test_602():
+    compiled_vader = CompiledVader(model)
+    sentences      = ["The plot is NOT good , but the cast is EXTREMELY good !!!",
+                      "It is kind of the bomb , yeah right ???",
+                      "never so bad , at least not the least bit boring",
+                      "good good bad but good",
+                      "",
+                      "!!"]
+
+    assert compiled_vader.check(model)
+    for text in sentences:
+        assert compiled_vader.polarity_scores(text) == model.polarity_scores(text)
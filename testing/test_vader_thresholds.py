@@ -0,0 +1,69 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+import logging
+
+import numpy as np
+import pytest
+
+from nltk.sentiment.vader       import SentimentIntensityAnalyzer
+from sklearn.metrics            import accuracy_score, f1_score
+from train                      import VaderSentimentAnalyser
+from utilities.model_file       import save_model_file
+from utilities.model_registry   import ModelRegistry
+from utilities.training_data    import read_sst
+from utilities.vader_thresholds import DEFAULT_THRESHOLDS, calibrate_thresholds, classification_scores, \
+                                       classify, compound_scores
+
+logger = logging.getLogger("test_logger")
+
+
+# numpy accuracy & macro F1 score equal sklearn's, labels missing from either side included;
+# a class depends on the compound score only
+def test_1801():
+    truth = np.random.RandomState(0).randint(1, 6, 1000)
+    for pred in [np.random.RandomState(1).randint(1, 6, 1000), np.random.RandomState(2).randint(2, 4, 1000)]:
+        dict_scores = classification_scores(truth, pred)
+        assert dict_scores['accuracy'] == pytest.approx(accuracy_score(truth, pred))
+        assert dict_scores['macro_f1'] == pytest.approx(f1_score(truth, pred, average = 'macro'))
+
+    assert list(classify([-1.0, -0.6, -0.59, 0.0, 0.2, 0.99], DEFAULT_THRESHOLDS)) == [1, 2, 2, 3, 4, 5]
+    assert classify([0.3, -0.9], DEFAULT_THRESHOLDS)[0] == classify([0.3, 0.31, 0.32], DEFAULT_THRESHOLDS)[0]
+
+
+# scoring split across processes returns the scores of a single one; calibrated thresholds increase,
+# and do at least as well as the default ones on the set they are calibrated on
+def test_1802():
+    model    = SentimentIntensityAnalyzer()
+    df_train = read_sst('sst_dev.txt')
+    scores   = compound_scores(list(df_train['text']), model, workers = 1)
+    assert np.array_equal(compound_scores(list(df_train['text']), model, workers = 2, chunk_size = 300), scores)
+
+    thresholds = calibrate_thresholds(scores, df_train['truth'])
+    assert len(thresholds) == 4 and thresholds == sorted(thresholds)
+    assert classification_scores(df_train['truth'], classify(scores, thresholds))['macro_f1'] >= \
+           classification_scores(df_train['truth'], classify(scores, DEFAULT_THRESHOLDS))['macro_f1']
+
+    df_test = VaderSentimentAnalyser(thresholds = thresholds).predict_file('sst_test.txt')
+    assert set(df_test['pred']) <= {1, 2, 3, 4, 5}
+
+
+# the thresholds of a model file add the class to the VADER scores served, as 'label'
+def test_1803(tmp_path):
+    model = SentimentIntensityAnalyzer()
+    save_model_file(str(tmp_path / 'vader'), model, type(model), 'sentiment-analysis', 'v1', 'train', logger,
+                    vader_thresholds = DEFAULT_THRESHOLDS)
+    save_model_file(str(tmp_path / 'vader_plain'), model, type(model), 'sentiment-analysis', 'v1', 'train', logger)
+
+    registry = ModelRegistry(100, 1000, logger)
+    registry.load(str(tmp_path / 'vader'))
+    dict_score = registry.service.score("The movie is great!")
+    assert dict_score['label'] == str(classify([dict_score['compound']], DEFAULT_THRESHOLDS)[0])
+    assert [dict_score['label'] for dict_score in registry.service.score_sentences(["Awful.", "Fine."])] == \
+           [str(label) for label in classify([model.polarity_scores("Awful.")['compound'],
+                                              model.polarity_scores("Fine.")['compound']], DEFAULT_THRESHOLDS)]
+
+    registry.load(str(tmp_path / 'vader_plain'))
+    assert 'label' not in registry.service.score("The movie is great!")
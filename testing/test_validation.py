@@ -0,0 +1,48 @@
+'''
+Run test case in PyCharm Terminal:
+$ pytest -vv --disable-warnings
+'''
+
+import io
+
+import pytest
+
+from app                  import app
+from utilities.validation import InvalidRequest, check_request, read_json_body
+
+
+# a body sent without Content-Length (chunked) is read up to the limit only
+def test_1001():
+    class CountingStream(io.BytesIO):
+        n_read = 0
+        def read(self, size = -1):
+            chunk        = super().read(size)
+            self.n_read += len(chunk)
+            return chunk
+
+    stream  = CountingStream(b'{"sentence": "' + b'a' * 1000000 + b'"}')
+    environ = {'wsgi.input': stream, 'wsgi.input_terminated': True}
+    with app.test_request_context('/curl', method = 'POST', content_type = 'application/json',
+                                  environ_overrides = environ) as context:
+        assert context.request.content_length is None
+        with pytest.raises(InvalidRequest) as e:
+            read_json_body(context.request, 1000)
+
+    assert e.value.status_code == 413
+    assert stream.n_read       == 1001
+
+    stream  = CountingStream(b'{"sentence": "I feel good."}')
+    environ = {'wsgi.input': stream, 'wsgi.input_terminated': True}
+    with app.test_request_context('/curl', method = 'POST', content_type = 'application/json',
+                                  environ_overrides = environ) as context:
+        assert read_json_body(context.request, 1000) == {"sentence": "I feel good."}
+
+# lists of values are compared without hashing them (a set() would fail on dicts)
+def test_1002():
+    assert check_request({"sentence": [{"a": 1}, {"a": 1}]}, 100) == \
+           "Failed to decode JSON object: Repeated key/value pairs in JSON. Expecting only one, with key of 'sentence'."
+    assert check_request({"sentence": [{"a": 1}, {"a": 2}]}, 100) == \
+           "Failed to decode JSON object: More than one value for one key in JSON. " \
+           "Expecting only one, with key of 'sentence'."
+    assert check_request({"sentence": "1234 " * 100}, 100) == "Sentence too long. Expecting at most 100 characters."
+    assert check_request({"sentence": "1234 a"}, 100)      is None
@@ -3,25 +3,35 @@ A training set called "sst_train.txt" needs to be provided to train a model.
 Otherwise, the pre-built SentimentIntensityAnalyzer model will be output to
 be loaded and run by app.py for production.
 
+in project dir, run:
+$ python train.py
+$ python train.py --vectorizer hashing --format mapped --workers 4
+$ python train.py --help
+
 class Base, class VaderSentimentAnalyser & class LogisticRegressor
 are resourced and modified from https://gist.github.com/prrao87
 """
 
+import argparse
 import pytreebank
 import sys
 import os
 import logging
+import numpy  as np
 import pandas as pd
 
 
-from time                            import localtime, strftime
+from time                            import localtime, perf_counter, strftime
 from nltk.sentiment.vader            import SentimentIntensityAnalyzer
-from sklearn.metrics                 import accuracy_score, f1_score
-from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
-from sklearn.linear_model            import LogisticRegression
-from sklearn.pipeline                import Pipeline
-from utilities.text_preprocessing    import text_preprocessing
-from utilities.save_model_files      import save_model_files
+from utilities.pipeline              import VECTORIZERS, build_pipeline
+from utilities.model_file            import save_model_file
+from utilities.mapped_model          import can_map
+from utilities.training_data         import read_split
+from utilities.feature_cache         import FeatureCache
+from utilities.vader_thresholds      import DEFAULT_THRESHOLDS, calibrate_thresholds, classification_scores, \
+                                            classify, compound_scores
+from utilities.preprocessing_config  import f_lower_case, f_rm_num, f_rm_html_tags, f_rm_whitespaces, \
+                                            f_rm_punctuation, f_rm_stop_words, f_conv_accented_char
 
 # Logging setting
 logging.basicConfig(level  = logging.INFO,
@@ -76,43 +86,37 @@ class Base:
                   rm_punctuation:     bool = False,
                   rm_stop_words:      bool = False,
                   conv_accented_char: bool = False,
-                  col_names = ['truth', 'text']) -> pd.DataFrame:
+                  col_names                = ['truth', 'text'],
+                  cache_dir:          str  = None,
+                  workers:            int  = 1) -> pd.DataFrame:
         """
         to read dataset, and pre-process the text in it (optional).
+        col_names, cache_dir & workers: see utilities/training_data.py
         """
+        flags = (lower_case, rm_num, rm_html_tags, rm_whitespaces, rm_punctuation, rm_stop_words, conv_accented_char)
 
-        df = pd.read_csv(file_name,
-                         sep    = '\t',
-                         header = None,
-                         names  = col_names)
-
-        # categorise the truth labels
-        df['truth'] = df['truth'].str.replace('__label__', '')
-        df['truth'] = df['truth'].astype(int).astype('category')
-
-        # pre-process the text data
-        df['text'] = df['text'].apply(
-            lambda x: text_preprocessing(x, lower_case,
-                                            rm_num,
-                                            rm_html_tags,
-                                            rm_whitespaces,
-                                            rm_punctuation,
-                                            rm_stop_words,
-                                            conv_accented_char))
+        return read_split(file_name, flags,
+                          col_names = col_names,
+                          cache_dir = cache_dir,
+                          workers   = workers,
+                          logger    = training_logger)
 
-        return df
-
-    def print_performance(self, df: pd.DataFrame) -> None:
+    def performance(self, df: pd.DataFrame) -> dict:
         """
-        to calculate accuracy and F1 score
+        to calculate accuracy and F1 score: {'accuracy': ..., 'macro_f1': ...}
+        (vectorized with numpy, see utilities/vader_thresholds.py; the same as sklearn accuracy_score & f1_score)
         """
-        acc = accuracy_score(df['truth'], df['pred'])
+        return classification_scores(df['truth'], df['pred'])
 
-        f1  = f1_score(df['truth'],
-                       df['pred'],
-                       average = 'macro')
+    def print_performance(self, df: pd.DataFrame) -> dict:
+        """
+        to calculate, print & return accuracy and F1 score (see performance)
+        """
+        dict_performance = self.performance(df)
+        print("Accuracy:       {}\nMacro F1 score: {}".format(dict_performance['accuracy'],
+                                                            dict_performance['macro_f1']))
 
-        print("Accuracy:       {}\nMacro F1 score: {}".format(acc, f1))
+        return dict_performance
 
 
 class VaderSentimentAnalyser(Base):
@@ -121,9 +125,12 @@ class VaderSentimentAnalyser(Base):
         predicts sentiment scores (1-5) using Vader Sentiment Intensity Analyzer.
     """
 
-    def __init__(self, model_file: str = None) -> None:
+    def __init__(self, model_file: str = None, thresholds: list = None, workers: int = 1) -> None:
         super().__init__()
-        self.vader_sia = SentimentIntensityAnalyzer()
+        self.vader_sia  = SentimentIntensityAnalyzer()
+        # compound score thresholds between the 5 classes (see utilities/vader_thresholds.py)
+        self.thresholds = DEFAULT_THRESHOLDS if thresholds is None else thresholds
+        self.workers    = workers
 
     def score(self, text: str) -> float:
         """
@@ -132,20 +139,35 @@ class VaderSentimentAnalyser(Base):
         """
         return self.vader_sia.polarity_scores(text)['compound']
 
+    def score_batch(self, list_text: list) -> np.ndarray:
+        """
+        to score a list of texts in one go, split across self.workers processes: the compound scores
+        """
+        return compound_scores(list_text, self.vader_sia, self.workers)
+
+    def calibrate(self, df_train: pd.DataFrame) -> list:
+        """
+        to calibrate the thresholds on a training set already read & pre-processed (see read_data)
+        """
+        self.thresholds = calibrate_thresholds(self.score_batch(list(df_train['text'])), df_train['truth'])
+        training_logger.info('VADER thresholds calibrated: ' + str(self.thresholds))
+        return self.thresholds
+
+    def predict_df(self, df_test: pd.DataFrame) -> pd.DataFrame:
+        """
+        to predict class labels of a test set already read & pre-processed (see read_data):
+        the class of every compound score, by the fixed thresholds (the same for a sentence in any batch)
+        """
+        df_test         = df_test.copy()
+        df_test['pred'] = classify(self.score_batch(list(df_test['text'])), self.thresholds)
+
+        return df_test
+
     def predict_file(self, file: str) -> pd.DataFrame:
         """
         to predict class labels for instances in a file, usually the test set
         """
-        df          = self.read_data(file)
-        df['score'] = df['text'].apply(self.score)
-        # convert float score to category based on binning
-        print(df['pred'])
-        df['pred']  = pd.cut(df['score'],
-                             bins   = 5,
-                             labels = [1, 2, 3, 4, 5])
-        df = df.drop('score', axis = 1)
-
-        return df
+        return self.predict_df(self.read_data(file))
 
 
 class LogisticRegressor(Base):
@@ -153,33 +175,42 @@ class LogisticRegressor(Base):
     LogisticRegressor class
         predicts sentiment scores (1-5) using a sklearn Logistic Regression pipeline.
     """
-    def __init__(self, model_file: str=None) -> None:
+    def __init__(self, model_file: str=None, vectorizer: str = 'count') -> None:
         """
         builds a pipeline to:
-        1.
-        2.
-        3.
+        1. count the tokens of a text ('count': vocabulary; 'hashing': hashed columns, no vocabulary)
+        2. weight the counts by tf-idf
+        3. classify with a Logistic Regression
+        (see utilities/pipeline.py)
         """
         super().__init__()
         #self.regressor = LogisticRegression()
-        self.regressor = None
-        self.pipeline  = Pipeline(
-            [
-                ('vect',  CountVectorizer()),
-                ('tfidf', TfidfTransformer()),
-                ('clf',   LogisticRegression(solver      = 'liblinear',
-                                             multi_class = 'auto')),
-            ]
-        )
+        self.regressor     = None
+        self.pipeline      = build_pipeline(vectorizer)
+        self.feature_cache = None
 
     def train(self, train_file: str) -> pd.DataFrame:
         """
         to train a regressor using training set
         """
-        df_train       = self.read_data(train_file)
-        self.regressor = self.pipeline.fit(df_train['text'], df_train['truth'])['clf']
+        self.fit(self.read_data(train_file))
         #return self.regressor
 
+    def fit(self, df_train: pd.DataFrame, cache_dir: str = None) -> None:
+        """
+        to train a regressor on a training set already read & pre-processed (see read_data)
+        with cache_dir, the vect & tfidf steps and the features are read from the feature cache if they were
+        computed before (see utilities/feature_cache.py): only the classifier is trained
+        """
+        if cache_dir is None:
+            self.feature_cache = None
+            self.regressor     = self.pipeline.fit(df_train['text'], df_train['truth'])['clf']
+            return
+
+        self.feature_cache       = FeatureCache(self.pipeline[:-1], df_train['text'], cache_dir, training_logger)
+        self.pipeline.steps[:-1] = self.feature_cache.features.steps
+        self.regressor           = self.pipeline['clf'].fit(self.feature_cache.x_train, df_train['truth'])
+
     def predict(self, text: str) -> int:
         return self.pipeline.predict([text])[0]
 
@@ -188,50 +219,91 @@ class LogisticRegressor(Base):
         """
         to predict class labels in test set
         """
-        df_test         = self.read_data(test_file)
-        df_test['pred'] = self.pipeline.predict(df_test['text'])
+        return self.predict_df(self.read_data(test_file))
+
+    def predict_df(self, df_test: pd.DataFrame) -> pd.DataFrame:
+        """
+        to predict class labels of a test set already read & pre-processed (see read_data)
+        """
+        df_test         = df_test.copy()
+        if self.feature_cache is None:
+            df_test['pred'] = self.pipeline.predict(df_test['text'])
+        else:
+            df_test['pred'] = self.regressor.predict(self.feature_cache.transform(df_test['text']))
 
         return df_test
 
 
-# initialize the model
-model = None
+def train_model(train_file: str = 'sst_train.txt',
+                test_file:  str = None,
+                model_type: str = 'lr',
+                vectorizer: str = 'count',
+                cache_dir:  str = '.preprocessing_cache',
+                workers:    int = os.cpu_count()):
 
-# training set in .txt format
-training_text_file = 'sst_train.txt'
+    """
+    Train the model to be served by app.py
+
+      train_file  str  training set in .txt format (__label__N<TAB>text); if it does not exist, the pre-built
+                       SentimentIntensityAnalyzer model is returned instead
+      test_file   str  set the model is evaluated on; by default, the training set
+      model_type  str  'lr'    - Logistic Regression pipeline
+                       'vader' - SentimentIntensityAnalyzer, with the thresholds between the 5 classes
+                                 calibrated on the training set (see utilities/vader_thresholds.py)
+      vectorizer  str  of the Logistic Regression pipeline: 'count' (vocabulary dict in the model),
+                       or 'hashing' (fixed-width feature hashing: no vocabulary, the model holds arrays only)
+      cache_dir   str  directory of the pre-processed sets & their features (see utilities/training_data.py &
+                       utilities/feature_cache.py); None does not cache
+      workers     int  processes the text pre-processing (and the VADER scoring) is split across
+
+    Every set is read & pre-processed once, with the setting of utilities/preprocessing_config.py
+    (the one the model is served with).
+
+    return (model, vader_thresholds): vader_thresholds is None but for a calibrated VADER model
+    """
 
-# Text pre-processing setting
-f_lower_case         = False
-f_rm_num             = False
-f_rm_html_tags       = False
-f_rm_whitespaces     = False
-f_rm_punctuation     = False
-f_rm_stop_words      = False
-f_conv_accented_char = False
+    if not os.path.exists(train_file):
+        """
+        load Vader sentiment model is no training text file provided
+        """
+        model = SentimentIntensityAnalyzer()
+        training_logger.info('model: ' + str(model))
+        return model, None
+
+    # Text pre-processing setting: see utilities/preprocessing_config.py
+    dict_setting = dict(lower_case         = f_lower_case,
+                        rm_num             = f_rm_num,
+                        rm_html_tags       = f_rm_html_tags,
+                        rm_whitespaces     = f_rm_whitespaces,
+                        rm_punctuation     = f_rm_punctuation,
+                        rm_stop_words      = f_rm_stop_words,
+                        conv_accented_char = f_conv_accented_char,
+                        cache_dir          = cache_dir,
+                        workers            = workers)
+
+    # read & pre-process train data
+    # training set will have 2 cols: text & truth after the pre-processing
+    df_train = Base().read_data(train_file, **dict_setting)
+    training_logger.info('training set loaded & pre-processed.')
+    print(df_train.head())
 
-if os.path.exists(training_text_file):
+    if test_file is None or test_file == train_file:
+        df_test = df_train
+    else:
+        df_test = Base().read_data(test_file, **dict_setting)
 
-    # read train data
-    df_train = pd.read_csv(training_text_file,
-                           sep    = '\t',
-                           header = None,
-                           names  = ['truth', 'text'])
-    training_logger.info('training set loaded.')
+    if model_type == 'vader':
+        # calibrate the VADER thresholds; after prediction, test set will have with 3 cols: text, truth, pred
+        vader_analyser = VaderSentimentAnalyser(workers = workers)
+        vader_analyser.calibrate(df_train)
+        df_test = vader_analyser.predict_df(df_test)
 
-    # pre-processing
-    # training set will have 2 cols: text & truth after the pre-processing
-    df_train['truth'] = df_train['truth'].str.replace('__label__', '')
-    df_train['truth'] = df_train['truth'].astype(int).astype('category')
-    df_train['text']  = df_train['text'].apply(lambda x: text_preprocessing(x,
-                                                                            f_lower_case,
-                                                                            f_rm_num,
-                                                                            f_rm_html_tags,
-                                                                            f_rm_whitespaces,
-                                                                            f_rm_punctuation,
-                                                                            f_rm_stop_words,
-                                                                            f_conv_accented_char))
-    training_logger.info('training set pre-processing done')
-    print(df_train.head())
+        print("VADER model performance, thresholds " + str(vader_analyser.thresholds) + ":")
+        vader_analyser.print_performance(df_test)
+
+        return vader_analyser.vader_sia, vader_analyser.thresholds
+
+    logistic_regressor = LogisticRegressor(Base, vectorizer = vectorizer)
 
     #print("@test VaderSentimentAnalyser")
     #print(VaderSentimentAnalyser(Base).score("This is the best idea I've heard in a long time!"))
@@ -239,12 +311,11 @@ if os.path.exists(training_text_file):
     #print("@test VaderSentimentAnalyser")
 
     # train a Logistic Regression model
-    logistic_regressor = LogisticRegressor(Base)
-    logistic_regressor.train(training_text_file)
+    logistic_regressor.fit(df_train, cache_dir = cache_dir)
     training_logger.info('logistic_regressor trained')
 
     # predict on test set; after prediction, test set will have with 3 cols: text, truth, pred
-    df_test = logistic_regressor.predict_file(training_text_file)
+    df_test = logistic_regressor.predict_df(df_test)
     print(df_test)
     training_logger.info('prediction done by logistic_regressor')
 
@@ -253,23 +324,53 @@ if os.path.exists(training_text_file):
     logistic_regressor.print_performance(df_test)
 
     # to save the pipeline as model
-    model = logistic_regressor.pipeline
-
-else:
-    """
-    load Vader sentiment model is no training text file provided
-    """
-    model = SentimentIntensityAnalyzer()
-    training_logger.info('model: ' + str(model))
-
-
-# save model files to disk for app.py to load
-save_model_files('sentiment_model_pickle',                     # filename
-                 model,                                        # model
-                 type(model),                                  # model_type
-                 'sentiment-analysis',                         # model_name
-                 str(strftime('%Y%m%d-%H%M%S', localtime())),  # model_version
-                 'train',                                      # train_pred
-                 training_logger)                              # logger, not for saving
-
-
+    return logistic_regressor.pipeline, None
+
+
+def main(argv = None):
+
+    parser = argparse.ArgumentParser(description = 'Train the sentiment model served by app.py.')
+    parser.add_argument('--train',      default = 'sst_train.txt', dest = 'train_file',
+                        help = 'training set (__label__N<TAB>text); VADER is output if it does not exist')
+    parser.add_argument('--test',       default = None, dest = 'test_file',
+                        help = 'set the model is evaluated on (default: the training set)')
+    parser.add_argument('--model',      default = 'lr', choices = ['lr', 'vader'], dest = 'model_type',
+                        help = "'lr': Logistic Regression pipeline; 'vader': VADER, with calibrated thresholds")
+    parser.add_argument('--vectorizer', default = 'count', choices = VECTORIZERS,
+                        help = 'vectorizer of the Logistic Regression pipeline')
+    parser.add_argument('--format',     default = 'pickle', choices = ['pickle', 'mapped'], dest = 'file_format',
+                        help = "model file format; 'mapped' applies to the Logistic Regression pipeline only")
+    parser.add_argument('--output',     default = 'sentiment_model_pickle', help = 'model file to write')
+    parser.add_argument('--cache-dir',  default = '.preprocessing_cache',
+                        help = 'directory of the pre-processed sets & their features')
+    parser.add_argument('--no-cache',   action = 'store_true', help = 'pre-process & vectorize the sets again, '
+                                                                      'cache nothing')
+    parser.add_argument('--workers',    default = os.cpu_count(), type = int,
+                        help = 'processes the text pre-processing is split across')
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    model, vader_thresholds = train_model(args.train_file,
+                                          test_file  = args.test_file,
+                                          model_type = args.model_type,
+                                          vectorizer = args.vectorizer,
+                                          cache_dir  = None if args.no_cache else args.cache_dir,
+                                          workers    = args.workers)
+
+    # save model files to disk for app.py to load
+    # model file format: 'pickle', or 'mapped' (memory-mapped arrays, see utilities/mapped_model.py);
+    # other models than the Logistic Regression pipeline are always pickled
+    save_model_file(args.output,                                   # filename
+                    model,                                         # model
+                    type(model),                                   # model_type
+                    'sentiment-analysis',                          # model_name
+                    str(strftime('%Y%m%d-%H%M%S', localtime())),   # model_version
+                    'train',                                       # train_pred
+                    training_logger,                               # logger, not for saving
+                    file_format      = args.file_format if can_map(model) else 'pickle',
+                    vader_thresholds = vader_thresholds)
+    training_logger.info('training done in {:.2f} s'.format(perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
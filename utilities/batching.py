@@ -0,0 +1,118 @@
+"""
+A micro-batching dispatcher for asyncio: concurrent single-sentence calls are scored together, in batches
+"""
+
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MicroBatcher:
+
+    """
+    Collect the sentences submitted by concurrent coroutines into batches, and score each batch with one call
+
+      score_batch     callable  list of sentences -> list of results, in the same order
+                                (e.g. ScoringService.score_sentences: one Pipeline.predict or VADER loop)
+      max_batch_size  int       largest batch
+      max_wait_us     int       longest time, in microseconds, a sentence waits for others before its batch is scored
+
+    A batch is scored as soon as it is full, or max_wait_us after its first (oldest) sentence arrived. Scoring
+    runs in a worker thread, one batch at a time, so that the event loop keeps reading requests meanwhile: the
+    sentences that arrive during a batch make up the next one, scored at once if the oldest of them already
+    waited max_wait_us.
+
+    batcher = MicroBatcher(service.score_sentences, max_batch_size = 64, max_wait_us = 2000)
+    result  = await batcher.submit(sentence)
+    """
+
+    def __init__(self, score_batch, max_batch_size, max_wait_us):
+        self.score_batch    = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait       = max_wait_us / 1e6
+        self.pending        = []     # (sentence, future, time submitted), oldest first
+        self.executor       = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = 'micro-batch')
+        self.task           = None
+        self.has_pending    = None   # events of the running loop, created by start()
+        self.is_full        = None
+
+        # counters
+        self.batches        = 0
+        self.sentences      = 0
+
+    def __repr__(self):
+        return 'MicroBatcher(max_batch_size=' + str(self.max_batch_size) + \
+               ', max_wait_us=' + str(int(self.max_wait * 1e6)) + ')'
+
+    def start(self):
+        """
+        to start the dispatcher in the running event loop (done by the first submit, if not before)
+        """
+        if self.task is None:
+            self.has_pending = asyncio.Event()
+            self.is_full     = asyncio.Event()
+            self.task        = asyncio.get_event_loop().create_task(self.dispatch())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        self.executor.shutdown(wait = True)
+
+    async def submit(self, sentence):
+        """
+        the result of sentence, scored in a batch with the sentences submitted around the same time
+        """
+        self.start()
+        loop   = asyncio.get_event_loop()
+        future = loop.create_future()
+        self.pending.append((sentence, future, loop.time()))
+        self.has_pending.set()
+        if len(self.pending) >= self.max_batch_size:
+            self.is_full.set()
+        return await future
+
+    async def dispatch(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            await self.has_pending.wait()
+
+            # wait for a full batch, until the oldest sentence has waited max_wait (counted from its submit:
+            # the sentences submitted while the previous batch was scored may have waited that long already)
+            timeout = self.pending[0][2] + self.max_wait - loop.time()
+            if len(self.pending) < self.max_batch_size and timeout > 0:
+                try:
+                    await asyncio.wait_for(self.is_full.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch        = self.pending[:self.max_batch_size]
+            self.pending = self.pending[self.max_batch_size:]
+            if len(self.pending) == 0:
+                self.has_pending.clear()
+            if len(self.pending) < self.max_batch_size:
+                self.is_full.clear()
+
+            # callers that went away (e.g. client disconnected) are not scored
+            batch = [(sentence, future) for sentence, future, _ in batch if not future.done()]
+            if len(batch) == 0:
+                continue
+
+            try:
+                list_result = await loop.run_in_executor(self.executor, self.score_batch,
+                                                         [sentence for sentence, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches   += 1
+            self.sentences += len(batch)
+            for (_, future), result in zip(batch, list_result):
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,114 @@
+"""
+A bounded LRU cache in front of text_predict, for repeated sentences
+"""
+
+import threading
+
+from collections    import OrderedDict
+
+
+def normalize(text):
+    """
+    the cache key of a sentence: runs of whitespace collapsed into one space.
+    Both models split their input on whitespace, so this does not change the score.
+    """
+    return " ".join(text.split())
+
+
+class ResultCache:
+
+    """
+    Size-bounded LRU cache of prediction results, keyed by (model version, normalized sentence)
+
+      capacity  int  maximum number of results kept; 0 disables the cache
+
+    The cache holds the results of one model version at a time: when it is asked to predict with
+    a different model version (i.e. a different model file was loaded), all the entries are dropped.
+    Safe to share between threads.
+    """
+
+    def __init__(self, capacity):
+        self.capacity      = capacity
+        self.model_version = None
+        self.entries       = OrderedDict()
+        self.lock          = threading.Lock()
+
+        # counters
+        self.hits          = 0
+        self.misses        = 0
+        self.evictions     = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self.lock:
+            if key[0] != self.model_version:
+                self.invalidate(key[0])
+            dict_score = self.entries.get(key)
+            if dict_score is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return dict_score
+
+    def put(self, key, dict_score):
+        if self.capacity <= 0:
+            return
+        with self.lock:
+            # the model was swapped while this result was computed
+            if key[0] != self.model_version:
+                return
+            self.entries[key] = dict_score
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last = False)
+                self.evictions += 1
+
+    def invalidate(self, model_version):
+        """
+        to drop every entry, and accept the results of model_version from now on (lock held by caller)
+        """
+        if len(self.entries) > 0:
+            self.invalidations += 1
+        self.entries.clear()
+        self.model_version = model_version
+
+    def predict(self, text, predict, model_version):
+        """
+        predict(text), with the result looked up in / added to the cache
+        (predict: the text_predict of the model of model_version, see resolve_predict in utilities/text.py)
+        """
+        key        = (model_version, normalize(text))
+        dict_score = self.get(key)
+        if dict_score is None:
+            dict_score = predict(text)
+            self.put(key, dict_score)
+        return dict(dict_score)
+
+    def predict_batch(self, list_text, predict_batch, model_version):
+        """
+        predict_batch(list_text), with only the sentences not in the cache sent to the model
+        """
+        list_key        = [(model_version, normalize(text)) for text in list_text]
+        list_dict_score = [self.get(key) for key in list_key]
+
+        list_miss = [index for index, dict_score in enumerate(list_dict_score) if dict_score is None]
+        if len(list_miss) > 0:
+            list_new = predict_batch([list_text[index] for index in list_miss])
+            for index, dict_score in zip(list_miss, list_new):
+                list_dict_score[index] = dict_score
+                self.put(list_key[index], dict_score)
+
+        return [dict(dict_score) for dict_score in list_dict_score]
+
+    def stats(self):
+        return {'capacity':      self.capacity,
+                'size':          len(self.entries),
+                'model_version': self.model_version,
+                'hits':          self.hits,
+                'misses':        self.misses,
+                'evictions':     self.evictions,
+                'invalidations': self.invalidations}
@@ -0,0 +1,144 @@
+"""
+A function used for caching the tf-idf features (CSR matrices) of the vect & tfidf steps of the pipeline on disk,
+so that classifier experiments (train.py, sweep.py) skip the text vectorization of the sets seen before
+
+Every matrix is stored as the three arrays of the CSR format (data, indices, indptr) in .npy files, read back
+memory-mapped. The fitted steps are keyed by their parameters and the text they are fitted on; the matrix of
+a set, by the fitted steps and the text of the set: a change to the data, the pre-processing or the vectorizer
+settings misses the cache.
+"""
+
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+import sklearn
+
+from scipy.sparse import csr_matrix
+
+
+# part of every cache key: to be changed whenever the format of the cache changes
+FEATURE_CACHE_VERSION = 1
+
+CSR_ARRAYS            = ['data', 'indices', 'indptr']
+
+
+def text_hash(series):
+    """
+    the sha256 hex digest of a column of text, in order
+    """
+    digest = hashlib.sha256()
+    for text in series:
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def features_key(features, series_train):
+    """
+    the cache key of features (unfitted vect & tfidf steps) fitted on series_train: parameters, text & versions
+    """
+    params = sorted((name, value) for name, value in features.get_params().items()
+                    if name != 'steps' and not hasattr(value, 'get_params'))
+    text   = '|'.join([repr(params), text_hash(series_train), sklearn.__version__, str(FEATURE_CACHE_VERSION)])
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def save_csr(directory, matrix):
+    """
+    to store a CSR matrix in directory, as data.npy, indices.npy, indptr.npy & shape.npy;
+    written aside then renamed, so that a matrix is either complete or absent
+    """
+    matrix  = csr_matrix(matrix)
+    tmp_dir = tempfile.mkdtemp(dir = os.path.dirname(directory), prefix = '.tmp-')
+    for name in CSR_ARRAYS:
+        np.save(os.path.join(tmp_dir, name + '.npy'), getattr(matrix, name))
+    np.save(os.path.join(tmp_dir, 'shape.npy'), np.array(matrix.shape, dtype = np.int64))
+    try:
+        os.replace(tmp_dir, directory)
+    except OSError:
+        # stored meanwhile by another process
+        shutil.rmtree(tmp_dir, ignore_errors = True)
+
+
+def load_csr(directory):
+    """
+    the CSR matrix stored by save_csr, on memory-mapped arrays
+    """
+    data, indices, indptr = (np.load(os.path.join(directory, name + '.npy'), mmap_mode = 'r') for name in CSR_ARRAYS)
+    shape = tuple(int(size) for size in np.load(os.path.join(directory, 'shape.npy')))
+    return csr_matrix((data, indices, indptr), shape = shape, copy = False)
+
+
+class FeatureCache:
+
+    """
+    The vect & tfidf steps fitted on a training set, and the feature matrices of the sets they transform,
+    cached on disk
+
+      features      Pipeline  unfitted vect & tfidf steps (e.g. build_pipeline(vectorizer)[:-1])
+      series_train  Series    pre-processed text of the training set
+      cache_dir     str       directory of the cache (the matrices are under cache_dir/features)
+      logger        logger    where the cache hits & misses are logged (optional)
+
+    The steps are fitted (or read back) at construction:
+
+      cache   = FeatureCache(build_pipeline('count')[:-1], df_train['text'], '.preprocessing_cache')
+      cache.features                        fitted vect & tfidf steps
+      cache.x_train                         features of the training set
+      cache.transform(df_dev['text'])       features of another set
+    """
+
+    def __init__(self, features, series_train, cache_dir, logger = None):
+        self.logger    = logger
+        self.directory = os.path.join(cache_dir, 'features', features_key(features, series_train))
+        features_file  = os.path.join(self.directory, 'features.pkl')
+        train_dir      = os.path.join(self.directory, 'train')
+
+        if os.path.exists(features_file) and os.path.exists(train_dir):
+            with open(features_file, 'rb') as f:
+                self.features = pickle.load(f)
+            self.x_train = load_csr(train_dir)
+            self.log('features of the training set read from cache: ' + train_dir)
+            return
+
+        os.makedirs(self.directory, exist_ok = True)
+        self.features = features
+        self.x_train  = features.fit_transform(series_train)
+        # written aside under a name of its own: processes that build the same entry at once (e.g. the workers of
+        # sweep.py, on flags that give the same text) do not rename each other's file; the last one renamed
+        # replaces the others: the same steps, fitted on the same text
+        fd, tmp_file = tempfile.mkstemp(dir = self.directory, prefix = '.tmp-', suffix = '.pkl')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(features, f, protocol = pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, features_file)
+        except BaseException:
+            os.remove(tmp_file)
+            raise
+        save_csr(train_dir, self.x_train)
+        self.log('features of the training set cached: ' + train_dir)
+
+    def __repr__(self):
+        return 'FeatureCache(' + self.directory + ')'
+
+    def log(self, message):
+        if self.logger is not None:
+            self.logger.info(message)
+
+    def transform(self, series):
+        """
+        the features of a set of pre-processed text, from the cache if it was transformed before
+        """
+        directory = os.path.join(self.directory, text_hash(series))
+        if os.path.exists(directory):
+            self.log('features read from cache: ' + directory)
+            return load_csr(directory)
+
+        matrix = self.features.transform(series)
+        save_csr(directory, matrix)
+        self.log('features cached: ' + directory)
+        return matrix
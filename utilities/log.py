@@ -0,0 +1,152 @@
+"""
+A function used for setting up the logging of the web service: plain & synchronous, or structured,
+sampled & non-blocking
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+
+from flask import has_request_context, request
+
+
+# format of the plain mode, and of the location fields of the structured mode
+LOG_FORMAT = "%(asctime)s  %(levelname)8s  %(filename)12s  %(funcName)12s  %(lineno)4d  %(message)s"
+
+
+def parse_sample_rates(str_rates):
+    """
+    "main.curl_scoring=0.01,*=0.5"  ->  {'main.curl_scoring': 0.01, '*': 0.5}
+    (route: Flask endpoint name; '*': every other route and the records logged outside a request)
+    """
+    dict_rate = {}
+    for item in filter(None, (item.strip() for item in str_rates.split(','))):
+        route, _, rate = item.partition('=')
+        dict_rate[route.strip()] = float(rate)
+    return dict_rate
+
+
+class RouteSampledLogger(logging.LoggerAdapter):
+
+    """
+    Logger that keeps the INFO & DEBUG records of a request with the sample rate of its route (Flask endpoint).
+    The choice is made once per request, so that a request has either all or none of its records, and before
+    the record is built: a dropped record costs a look-up, not a LogRecord. WARNING and above are always kept.
+    The route is added to the records as record.route (None outside a request).
+
+      logger     logging.Logger
+      dict_rate  dict  see parse_sample_rates
+    """
+
+    def __init__(self, logger, dict_rate):
+        super().__init__(logger, {})
+        self.dict_rate    = dict_rate
+        self.default_rate = dict_rate.get('*', 1.0)
+
+    def sample(self, route):
+        rate = self.dict_rate.get(route, self.default_rate)
+        return rate >= 1.0 or random.random() < rate
+
+    def isEnabledFor(self, level):
+        if not self.logger.isEnabledFor(level):
+            return False
+        if level >= logging.WARNING:
+            return True
+        if not has_request_context():
+            return self.sample(None)
+
+        environ = request.environ
+        keep    = environ.get('log.sampled')
+        if keep is None:
+            keep = environ['log.sampled'] = self.sample(request.endpoint)
+        return keep
+
+    def process(self, msg, kwargs):
+        kwargs['extra'] = {'route': request.endpoint if has_request_context() else None}
+        return msg, kwargs
+
+
+class JSONFormatter(logging.Formatter):
+
+    """
+    One JSON object per record: time, level, logger, route, location & message
+    """
+
+    def format(self, record):
+        dict_record = {'time':     self.formatTime(record),
+                       'level':    record.levelname,
+                       'logger':   record.name,
+                       'route':    getattr(record, 'route', None),
+                       'file':     record.filename,
+                       'function': record.funcName,
+                       'line':     record.lineno,
+                       'message':  record.getMessage()}
+        if record.exc_info:
+            dict_record['exception'] = self.formatException(record.exc_info)
+        return json.dumps(dict_record, default = str)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+
+    """
+    QueueHandler that enqueues the record as it is: the message is formatted by the listener thread,
+    not by the request thread. The arguments of a log call must not be modified after the call.
+    """
+
+    def prepare(self, record):
+        if record.exc_info:
+            # tracebacks cannot be pickled nor kept: formatted now
+            return super().prepare(record)
+        return record
+
+
+def configure_logging(mode = 'plain', str_sample_rates = ''):
+
+    """
+    Set up the root logger
+
+      mode              str  'plain'      - text lines (LOG_FORMAT) written to stderr, in the logging call
+                             'structured' - JSON lines, put on a queue and written to stderr
+                                            by a background thread
+      str_sample_rates  str  per-route sample rates for app_logger, see parse_sample_rates;
+                             '' keeps every record
+
+    return app_logger, as a RouteSampledLogger if sample rates are given
+    """
+
+    app_logger = logging.getLogger("app_logger")
+    dict_rate  = parse_sample_rates(str_sample_rates)
+    if dict_rate:
+        app_logger = RouteSampledLogger(app_logger, dict_rate)
+
+    if mode == 'plain':
+        logging.basicConfig(level = logging.INFO, format = LOG_FORMAT)
+        return app_logger
+    elif mode != 'structured':
+        raise ValueError("LOG_MODE is expected to be 'plain' or 'structured', got: " + str(mode))
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JSONFormatter())
+    queue_handler  = LazyQueueHandler(queue.SimpleQueue())
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.handlers[:] = [queue_handler]
+
+    def start_listener():
+        # a fresh queue & thread: the thread of a parent process does not exist in a forked child
+        queue_handler.queue = queue.SimpleQueue()
+        listener            = logging.handlers.QueueListener(queue_handler.queue, stream_handler)
+        listener.start()
+        atexit.register(listener.stop)
+
+    start_listener()
+    # gunicorn workers are forked from the master after the app is imported (preload_app)
+    os.register_at_fork(after_in_child = start_listener)
+
+    return app_logger
@@ -0,0 +1,287 @@
+"""
+A model file format with memory-mapped weights, for Pipeline(CountVectorizer, TfidfTransformer, LogisticRegression)
+and Pipeline(HashingVectorizer, TfidfTransformer, LogisticRegression)
+
+A pickled pipeline is unpickled into private memory by every worker, vocabulary dict included.
+This format stores the vocabulary, the idf vector and the coefficients as raw arrays instead,
+which are memory-mapped when loaded: N workers share one physical copy of the file pages,
+and loading only reads the header.
+
+File layout:
+  MAGIC          8 bytes
+  header size    8 bytes, little-endian unsigned
+  header         JSON: model file info, vectorizer & tf-idf settings, classes, and
+                       the dtype, shape & offset of every array
+  arrays         raw, each starting on a 64-byte boundary
+                   terms        vocabulary, sorted, fixed-width bytes (utf-8)      - CountVectorizer only
+                   term_index   column of each term in terms                      - CountVectorizer only
+                   idf          idf vector (if the tf-idf step uses idf)
+                   coef         coefficient matrix, n_classes x n_features
+                   intercept    intercept vector
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfTransformer
+from sklearn.linear_model            import LogisticRegression
+from sklearn.pipeline                import Pipeline
+
+
+MAGIC     = b'SAMODEL1'
+ALIGNMENT = 64
+
+# CountVectorizer settings that change how a text is turned into tokens, saved in the header
+VECTORIZER_PARAMS = ['analyzer', 'binary', 'lowercase', 'ngram_range', 'stop_words', 'strip_accents', 'token_pattern']
+
+# and the HashingVectorizer settings that change the columns & values of a text
+HASHING_PARAMS    = VECTORIZER_PARAMS + ['n_features', 'alternate_sign', 'norm']
+
+
+class MappedLinearModel:
+
+    """
+    Predicts like the Pipeline it was saved from, with the arrays memory-mapped from the model file
+
+      predict(list_text)  ->  numpy array of class labels, as Pipeline.predict
+    """
+
+    def __init__(self, header, arrays):
+        self.header     = header
+        self.classes    = np.array(header['classes'])
+        self.tfidf      = header['tfidf']
+        self.idf        = arrays.get('idf')
+        self.coef       = arrays['coef']
+        self.intercept  = arrays['intercept']
+
+        # files written before HashingVectorizer was supported have no vectorizer_type
+        if header.get('vectorizer_type', 'count') == 'hashing':
+            # stateless: nothing but its settings is saved
+            self.hasher     = HashingVectorizer(**header['vectorizer'])
+        else:
+            self.hasher     = None
+            self.terms      = arrays['terms']
+            self.term_index = arrays['term_index']
+            self.analyzer   = CountVectorizer(**header['vectorizer']).build_analyzer()
+
+    def __repr__(self):
+        return 'MappedLinearModel(n_features=' + str(self.coef.shape[1]) + \
+               ', classes=' + str(list(self.classes)) + ')'
+
+    def transform(self, list_text):
+        """
+        the non-zero entries of the tf-idf matrix of list_text, as vect + tfidf of the original Pipeline
+        would give: (rows, columns, values), sorted by row then column
+        """
+        if self.hasher is None:
+            rows, columns, values = self.count(list_text)
+        else:
+            rows, columns, values = self.hash(list_text)
+
+        if self.tfidf['sublinear_tf']:
+            np.log(values, values)
+            values += 1.0
+        if self.idf is not None:
+            values *= self.idf[columns]
+        if self.tfidf['norm'] is not None:
+            if self.tfidf['norm'] == 'l2':
+                norms = np.sqrt(np.bincount(rows, weights = values * values, minlength = len(list_text)))
+            else:
+                norms = np.bincount(rows, weights = np.abs(values), minlength = len(list_text))
+            norms[norms == 0.0] = 1.0
+            values /= norms[rows]
+
+        return rows, columns, values
+
+    def count(self, list_text):
+        """
+        the non-zero entries of the CountVectorizer matrix of list_text, looked up in the mapped vocabulary
+        """
+        list_tokens = [self.analyzer(text) for text in list_text]
+        rows        = np.repeat(np.arange(len(list_tokens)), [len(tokens) for tokens in list_tokens])
+        tokens      = [token.encode('utf-8') for tokens in list_tokens for token in tokens]
+
+        # vocabulary look-up: binary search in the sorted terms
+        # (tokens longer than the longest term cannot be in the vocabulary, and would be truncated)
+        n_features = self.coef.shape[1]
+        if len(tokens) == 0 or len(self.terms) == 0:
+            return rows[:0], rows[:0], np.empty(0, dtype = np.float64)
+        width = self.terms.dtype.itemsize
+        fits  = np.fromiter((len(token) <= width for token in tokens), dtype = bool, count = len(tokens))
+        keys  = np.array(tokens, dtype = self.terms.dtype)
+        pos   = np.searchsorted(self.terms, keys)
+        pos[pos == len(self.terms)] = 0
+        found = fits & (self.terms[pos] == keys)
+
+        # counts per (sentence, term)
+        cells, counts = np.unique(rows[found] * n_features + self.term_index[pos[found]], return_counts = True)
+        rows, columns = np.divmod(cells, n_features)
+        values        = counts.astype(np.float64)
+
+        if self.header['vectorizer']['binary']:
+            values[:] = 1.0
+
+        return rows, columns, values
+
+    def hash(self, list_text):
+        """
+        the non-zero entries of the HashingVectorizer matrix of list_text (no vocabulary to look up)
+        """
+        matrix = self.hasher.transform(list_text)
+        matrix.sort_indices()
+        rows   = np.repeat(np.arange(len(list_text)), np.diff(matrix.indptr))
+        return rows, matrix.indices.astype(np.int64), matrix.data.astype(np.float64)
+
+    def decision_function(self, list_text):
+        rows, columns, values = self.transform(list_text)
+
+        # sum of value x coefficient over the non-zero entries of each row, in column order
+        scores = np.zeros((len(list_text), self.coef.shape[0]))
+        if len(values) > 0:
+            contributions     = self.coef[:, columns].T * values[:, None]
+            starts            = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            scores[rows[starts]] = np.add.reduceat(contributions, starts, axis = 0)
+
+        return scores + self.intercept
+
+    def predict(self, list_text):
+        if len(list_text) == 0:
+            return self.classes[:0]
+        scores = self.decision_function(list_text)
+        if scores.shape[1] == 1:
+            return self.classes[(scores[:, 0] > 0).astype(int)]
+        return self.classes[scores.argmax(axis = 1)]
+
+
+def can_map(model):
+    """
+    whether model can be saved in this format
+    """
+    if type(model) is not Pipeline or len(model.steps) != 3:
+        return False
+    vect, tfidf, clf = [step for _, step in model.steps]
+    return type(vect)  in (CountVectorizer, HashingVectorizer) and \
+           type(tfidf) is TfidfTransformer                       and \
+           type(clf)   is LogisticRegression                     and \
+           vect.tokenizer is None and vect.preprocessor is None and isinstance(vect.analyzer, str)
+
+
+def save_mapped_model_file(filename, model, model_name, model_version, train_pred):
+
+    """
+    Write model, a Pipeline(CountVectorizer or HashingVectorizer, TfidfTransformer, LogisticRegression),
+    in the mapped format
+
+    The file is written next to filename and renamed over it, so that processes which have the previous
+    file mapped keep reading the previous (unlinked) file, and never see a partly written one.
+    """
+
+    if not can_map(model):
+        raise ValueError('Only Pipeline(CountVectorizer or HashingVectorizer, TfidfTransformer, LogisticRegression) '
+                         'can be saved in the mapped format, got: ' + str(model))
+
+    vect, tfidf, clf = [step for _, step in model.steps]
+
+    arrays = {}
+    if type(vect) is CountVectorizer:
+        # vocabulary, sorted by term for the binary search
+        list_term            = sorted(vect.vocabulary_)
+        arrays['terms']      = np.array([term.encode('utf-8') for term in list_term])
+        arrays['term_index'] = np.array([vect.vocabulary_[term] for term in list_term], dtype = np.int64)
+        vectorizer_type      = 'count'
+        list_param           = VECTORIZER_PARAMS
+    else:
+        vectorizer_type      = 'hashing'
+        list_param           = HASHING_PARAMS
+
+    arrays['coef']      = np.ascontiguousarray(clf.coef_,      dtype = np.float64)
+    arrays['intercept'] = np.ascontiguousarray(clf.intercept_, dtype = np.float64)
+    if tfidf.use_idf:
+        arrays['idf'] = np.ascontiguousarray(tfidf.idf_, dtype = np.float64)
+
+    dict_vectorizer = {param: getattr(vect, param) for param in list_param}
+    # a custom stop word list may be any collection; JSON needs a list
+    if dict_vectorizer['stop_words'] is not None and not isinstance(dict_vectorizer['stop_words'], str):
+        dict_vectorizer['stop_words'] = sorted(dict_vectorizer['stop_words'])
+
+    header = {'model_type':      'MappedLinearModel',
+              'model_name':      model_name,
+              'version':         model_version,
+              'train/pred':      train_pred,
+              'vectorizer_type': vectorizer_type,
+              'vectorizer':      dict_vectorizer,
+              'tfidf':           {'norm':         tfidf.norm,
+                                  'use_idf':      tfidf.use_idf,
+                                  'sublinear_tf': tfidf.sublinear_tf},
+              'classes':         clf.classes_.tolist(),
+              'arrays':          {}}
+
+    # offsets are relative to the end of the header, which is padded to the alignment
+    offset = 0
+    for name, array in arrays.items():
+        header['arrays'][name] = {'dtype':  array.dtype.str,
+                                  'shape':  list(array.shape),
+                                  'offset': offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    bytes_header = json.dumps(header).encode('utf-8')
+    size_prefix  = len(MAGIC) + 8
+    padding      = -(size_prefix + len(bytes_header)) % ALIGNMENT
+
+    filename_tmp = filename + '.tmp'
+    with open(filename_tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(bytes_header) + padding))
+        f.write(bytes_header + b' ' * padding)
+        for name, array in arrays.items():
+            f.write(array.tobytes())
+            f.write(b'\0' * (-array.nbytes % ALIGNMENT))
+    os.replace(filename_tmp, filename)
+
+
+def is_mapped_model_file(filename):
+    with open(filename, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def load_mapped_model_file(filename):
+
+    """
+    Map a model file written by save_mapped_model_file
+
+    return the same dict as a pickled model file:
+      {'model': MappedLinearModel, 'model_type', 'model_name', 'version', 'train/pred'}
+    """
+
+    with open(filename, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(str(filename) + ' is not a mapped model file')
+        size_header = struct.unpack('<Q', f.read(8))[0]
+        header      = json.loads(f.read(size_header).decode('utf-8'))
+
+    # JSON has no tuple
+    header['vectorizer']['ngram_range'] = tuple(header['vectorizer']['ngram_range'])
+
+    start  = len(MAGIC) + 8 + size_header
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        shape = tuple(spec['shape'])
+        if np.prod(shape) == 0:
+            arrays[name] = np.empty(shape, dtype = np.dtype(spec['dtype']))
+        else:
+            arrays[name] = np.memmap(filename,
+                                     dtype  = np.dtype(spec['dtype']),
+                                     mode   = 'r',
+                                     offset = start + spec['offset'],
+                                     shape  = shape)
+
+    model = MappedLinearModel(header, arrays)
+
+    return {'model':      model,
+            'model_type': type(model),
+            'model_name': header['model_name'],
+            'version':    header['version'],
+            'train/pred': header['train/pred']}
@@ -0,0 +1,126 @@
+"""
+Latency histograms of the request hot path, and their Prometheus text exposition for /metrics
+"""
+
+import bisect
+import threading
+
+
+# upper bounds of the histogram buckets, in seconds: 1 us to ~16 s, doubling
+BUCKET_BOUNDS = [1e-6 * 2 ** i for i in range(25)]
+
+# quantiles exposed for every stage
+QUANTILES     = [0.5, 0.95, 0.99]
+
+
+class Histogram:
+
+    """
+    Count of observations per bucket of BUCKET_BOUNDS, plus their sum; safe to share between threads
+    """
+
+    def __init__(self, bounds = BUCKET_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # the last bucket is +Inf
+        self.sum    = 0.0
+        self.count  = 0
+        self.lock   = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum       += value
+            self.count     += 1
+
+    def quantile(self, q):
+        """
+        estimate of the q-quantile, interpolated linearly within its bucket (as PromQL histogram_quantile)
+        """
+        with self.lock:
+            counts, count = list(self.counts), self.count
+        if count == 0:
+            return float('nan')
+
+        rank       = q * count
+        cumulative = 0
+        for i, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count > 0:
+                if i == len(self.bounds):
+                    # in the +Inf bucket: the highest finite bound is the best estimate
+                    return self.bounds[-1]
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.bounds[-1]
+
+
+class LatencyMetrics:
+
+    """
+    One Histogram per stage of the request hot path, created on its first observation
+
+      enabled  bool  False makes observe() a no-op
+
+    Stages observed by app.py & utilities/text.py:
+      parse, validation, lowercase, num, html, whitespace, punctuation, stopwords, unidecode,
+      inference, serialization, total
+
+    Timings are per process: under gunicorn, every worker keeps (and exposes) its own.
+    """
+
+    def __init__(self, enabled = True):
+        self.enabled    = enabled
+        self.histograms = {}
+        self.lock       = threading.Lock()
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(stage, Histogram())
+        histogram.observe(seconds)
+
+    def quantiles(self, stage):
+        histogram = self.histograms[stage]
+        return {q: histogram.quantile(q) for q in QUANTILES}
+
+    def exposition(self, dict_counter = None):
+        """
+        the histograms (and their p50 / p95 / p99), plus the counters of dict_counter,
+        in the Prometheus text format
+        """
+        list_line = ['# HELP sentiment_stage_seconds Latency of each stage of a scoring request.',
+                     '# TYPE sentiment_stage_seconds histogram']
+        list_quantile_line = ['# HELP sentiment_stage_quantile_seconds Latency quantiles of each stage, '
+                              'estimated from sentiment_stage_seconds.',
+                              '# TYPE sentiment_stage_quantile_seconds gauge']
+
+        for stage, histogram in sorted(self.histograms.items()):
+            with histogram.lock:
+                counts, total, count = list(histogram.counts), histogram.sum, histogram.count
+
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.bounds + ['+Inf'], counts):
+                cumulative += bucket_count
+                le          = bound if bound == '+Inf' else repr(bound)
+                list_line.append('sentiment_stage_seconds_bucket{stage="%s",le="%s"} %d' % (stage, le, cumulative))
+            list_line.append('sentiment_stage_seconds_sum{stage="%s"} %r' % (stage, total))
+            list_line.append('sentiment_stage_seconds_count{stage="%s"} %d' % (stage, count))
+
+            for q, value in self.quantiles(stage).items():
+                list_quantile_line.append('sentiment_stage_quantile_seconds{stage="%s",quantile="%s"} %r'
+                                          % (stage, q, value))
+
+        list_line += list_quantile_line
+        for name, value in sorted((dict_counter or {}).items()):
+            list_line.append('# TYPE %s counter' % name)
+            list_line.append('%s %d' % (name, value))
+
+        return "\n".join(list_line) + "\n"
+
+
+# shared by every request of the process
+latency_metrics = LatencyMetrics()
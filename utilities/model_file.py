@@ -2,15 +2,22 @@
 A function used for loading model files (model, mappings, dictionaries, 1-hot encoders, version)
 """
 
+import os
 import pickle
-from time import localtime, strftime
+from time                   import localtime, strftime
+from utilities.mapped_model import is_mapped_model_file, load_mapped_model_file, save_mapped_model_file
 
 
 
 def load_model_file(filename, logger):
 
-    model_files = pickle.load(open(filename, 'rb'))
-    logger.info('pickle loaded, file name: ' + str(filename))
+    # the file header tells the format: mapped (see utilities/mapped_model.py) or pickle
+    if is_mapped_model_file(filename):
+        model_files = load_mapped_model_file(filename)
+        logger.info('mapped model file loaded, file name: ' + str(filename))
+    else:
+        model_files = pickle.load(open(filename, 'rb'))
+        logger.info('pickle loaded, file name: ' + str(filename))
 
     return model_files
 
@@ -20,7 +27,8 @@ def load_model_file(filename, logger):
 A function used for saving model files (model, mappings, dictionaries, 1-hot encoders, version)
 used for pre-processing or transformation
 """
-def save_model_file(filename, model, model_type, model_name, model_version, train_pred, logger):
+def save_model_file(filename, model, model_type, model_name, model_version, train_pred, logger,
+                    file_format = 'pickle', timed_copy = True, vader_thresholds = None):
 
     """
     save debugging info
@@ -30,8 +38,17 @@ def save_model_file(filename, model, model_type, model_name, model_version, trai
       model_type     class  type(model)
       model_name     str    user-defined model name
       model_version  str    model trained/used local time
-      train_pred     str    "train" - saved after training
-                            "pred"  - saved when predicting
+      train_pred     str    "train"  - saved after training
+                            "pred"   - saved when predicting
+                            "online" - checkpoint of an online update (see utilities/online.py)
+      file_format    str    "pickle" - the whole dict pickled
+                            "mapped" - raw arrays, memory-mapped when loaded (see utilities/mapped_model.py);
+                                       only for a Pipeline(CountVectorizer or HashingVectorizer,
+                                                           TfidfTransformer, LogisticRegression)
+      timed_copy     bool   whether to save a copy named after the current time too
+                            (False for frequent checkpoints, that would pile up)
+      vader_thresholds list of a VADER model: the 4 compound score thresholds between the 5 classes
+                            (see utilities/vader_thresholds.py); the service adds the class as 'label'
     """
 
     # model file preparing
@@ -40,13 +57,24 @@ def save_model_file(filename, model, model_type, model_name, model_version, trai
                    'model_name': model_name,
                    'version':    model_version,
                    'train/pred': train_pred}
+    if vader_thresholds is not None:
+        model_files['vader_thresholds'] = list(vader_thresholds)
     logger.info('model files saving:       ' + str(model_files))
 
     # save 2 model files; one with time, one without
     current_time       = strftime('%Y-%m-%d_%H-%M-%S', localtime())
     filename_with_time = filename + "_@" + str(current_time)
-    pickle.dump(model_files, open(filename_with_time, 'wb'))
-    logger.info('pickle dumped, file name: ' + str(filename_with_time))
+    list_filename      = [filename_with_time, filename] if timed_copy else [filename]
 
-    pickle.dump(model_files, open(filename, 'wb'))
-    logger.info('pickle dumped, file name: ' + str(filename))
+    if file_format == 'mapped':
+        for name in list_filename:
+            save_mapped_model_file(name, model, model_name, model_version, train_pred)
+            logger.info('mapped model file saved, file name: ' + str(name))
+        return
+    for name in list_filename:
+        # written next to the file and renamed over it: a running app that watches the file (see
+        # utilities/model_registry.py) never reads a partly written one
+        with open(name + '.tmp', 'wb') as f:
+            pickle.dump(model_files, f)
+        os.replace(name + '.tmp', name)
+        logger.info('pickle dumped, file name: ' + str(name))
@@ -0,0 +1,244 @@
+"""
+A function used for serving the current model(s), and loading the next one without restarting the workers
+"""
+
+import os
+import threading
+
+from collections          import deque
+from time                 import localtime, perf_counter, sleep, strftime
+
+from flask                import current_app, request
+from utilities.cache      import ResultCache
+from utilities.model_file import load_model_file
+from utilities.scoring    import ScoringService
+from utilities.validation import InvalidRequest
+
+
+# scored once by a model before it is swapped in, so that what it builds lazily (e.g. the compiled
+# VADER lexicon) is not built by the first request
+WARM_UP_SENTENCE = "The model is warming up, and it is good."
+
+# number of loads kept in the history
+HISTORY_SIZE     = 50
+
+
+def file_stat(filename):
+    """
+    what tells a model file was replaced: (modification time, size, inode), or None if it does not exist
+    """
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class ModelRegistry:
+
+    """
+    The ScoringService of the model being served, and the loading of the next model in the background
+
+      cache_capacity       int     size of the result cache, shared by the successive models; 0 disables it
+      max_sentence_length  int     longest sentence accepted, in characters
+      logger               logger  where the loads are logged
+
+    registry.service is swapped in one assignment once a new model is loaded and warmed up: a request that
+    read it before the swap finishes with the previous model, the next requests get the new one.
+
+      registry.load(filename)    load a model file now                  (at start-up)
+      registry.reload(filename)  load a model file in a background thread (admin endpoint)
+      registry.watch(seconds)    reload the model file whenever it is replaced on disk
+      registry.history           every load: file, version, status & load time
+    """
+
+    def __init__(self, cache_capacity, max_sentence_length, logger):
+        self.result_cache        = ResultCache(cache_capacity)
+        self.max_sentence_length = max_sentence_length
+        self.logger              = logger
+        self.service             = None
+        self.filename            = None
+        self.seen_stat           = None   # file_stat of the last file loaded (or tried) from self.filename
+        self.history             = deque(maxlen = HISTORY_SIZE)
+        self.lock                = threading.Lock()
+        self.loading             = False
+        self.watch_interval      = 0
+
+    def __repr__(self):
+        return 'ModelRegistry(' + str(self.service) + ')'
+
+    def set_model(self, model, model_version, vader_thresholds = None):
+        """
+        to warm up model, then serve it in place of the current one
+        vader_thresholds: of a VADER model file, see ScoringService
+        """
+        service = ScoringService(model, model_version, self.result_cache.capacity, self.max_sentence_length,
+                                 result_cache     = self.result_cache,
+                                 vader_thresholds = vader_thresholds)
+        service.predict_batch([WARM_UP_SENTENCE])
+        self.service = service
+
+    def load(self, filename):
+
+        """
+        Load a model file, and serve its model in place of the current one
+
+        A file that cannot be loaded is logged and recorded in the history; the current model keeps being served.
+
+        return True if the model of filename is now served
+        """
+
+        stat   = file_stat(filename)
+        start  = perf_counter()
+        record = {'filename': str(filename),
+                  'time':     strftime('%Y-%m-%d %H:%M:%S', localtime())}
+        try:
+            model_files = load_model_file(filename, self.logger)
+            # identifies the loaded model in the result cache
+            version     = str(filename) + '@' + str(model_files['version'])
+            self.set_model(model_files['model'], version, model_files.get('vader_thresholds'))
+        except Exception as e:
+            if filename == self.filename:
+                # not tried again by the watcher until the file is replaced again
+                self.seen_stat = stat
+            record.update(status = 'failed', error = repr(e), load_ms = round((perf_counter() - start) * 1e3, 2))
+            self.history.append(record)
+            self.logger.error('model load failed: %s', record)
+            return False
+
+        self.filename  = filename
+        self.seen_stat = stat
+        record.update(status = 'loaded', version = version, load_ms = round((perf_counter() - start) * 1e3, 2))
+        self.history.append(record)
+        self.logger.info('model loaded: %s', record)
+        return True
+
+    def reload(self, filename = None):
+        """
+        to load filename (by default, the file being served) in a background thread
+
+        return False if a load is already running (nothing is started)
+        """
+        with self.lock:
+            if self.loading:
+                return False
+            self.loading = True
+
+        def run():
+            try:
+                self.load(self.filename if filename is None else filename)
+            finally:
+                self.loading = False
+
+        threading.Thread(target = run, name = 'model-reload', daemon = True).start()
+        return True
+
+    def watch(self, interval_s):
+        """
+        to check the model file every interval_s seconds, and reload it whenever it was replaced;
+        0 does not watch. The watcher runs in every process (gunicorn workers included).
+        """
+        self.watch_interval = interval_s
+        if interval_s <= 0:
+            return
+
+        def run():
+            while True:
+                sleep(self.watch_interval)
+                stat = file_stat(self.filename)
+                if stat is not None and stat != self.seen_stat and not self.loading:
+                    self.reload()
+
+        def start_watcher():
+            threading.Thread(target = run, name = 'model-watcher', daemon = True).start()
+
+        def restart_in_child():
+            # gunicorn workers are forked from the master after the app is imported (preload_app),
+            # and the threads of a parent process (watcher, load in progress) do not exist in a forked child
+            self.lock    = threading.Lock()
+            self.loading = False
+            start_watcher()
+
+        start_watcher()
+        os.register_at_fork(after_in_child = restart_in_child)
+
+    def status(self):
+        return {'filename': self.filename,
+                'version':  self.service.model_version if self.service is not None else None,
+                'loading':  self.loading,
+                'history':  list(self.history)}
+
+
+def parse_models(str_models, default_file):
+    """
+    "vader=sentiment_model_pickle_default_sia,lr=sentiment_model_pickle"  ->  {'vader': ..., 'lr': ...}
+    (model name: file name, in order); '' serves default_file only, as 'default'
+    """
+    dict_file = {}
+    for item in filter(None, (item.strip() for item in str_models.split(','))):
+        name, _, filename = item.partition('=')
+        dict_file[name.strip()] = filename.strip()
+    return dict_file or {'default': default_file}
+
+
+class ModelSet:
+
+    """
+    The models served side by side: the ModelRegistry of every model, by name, and the default one
+
+      dict_registry  dict  model name: ModelRegistry (names given the same file share one registry)
+      default_name   str   model of the requests that select none
+
+    A request selects a model by the X-Model header or the model query parameter (?model=xxx). The look-up is
+    one dict access: the prediction functions of every model are resolved when it is loaded (see ScoringService).
+    """
+
+    def __init__(self, dict_registry, default_name):
+        if default_name not in dict_registry:
+            raise ValueError('DEFAULT_MODEL is expected to be one of ' + str(list(dict_registry)) +
+                             ', got: ' + str(default_name))
+        self.dict_registry = dict_registry
+        self.default_name  = default_name
+        self.default       = dict_registry[default_name]
+
+    def __repr__(self):
+        return 'ModelSet(' + ', '.join(self.dict_registry) + '; default=' + self.default_name + ')'
+
+    def registry(self, name = None):
+        """
+        the ModelRegistry of the model called name (None: the default one)
+        raise InvalidRequest for an unknown name
+        """
+        if name is None:
+            return self.default
+        registry = self.dict_registry.get(name)
+        if registry is None:
+            raise InvalidRequest("Unknown model: " + str(name) + ". Expecting one of " +
+                                 str(list(self.dict_registry)) + ".")
+        return registry
+
+    def status(self):
+        return {name: registry.status() for name, registry in self.dict_registry.items()}
+
+
+def requested_model():
+    """
+    the model name selected by the current request (X-Model header, or ?model=), or None
+    """
+    return request.headers.get('X-Model') or request.args.get('model')
+
+
+def current_registry():
+    """
+    the ModelRegistry of the model selected by the current request
+    raise InvalidRequest for an unknown model
+    """
+    return current_app.extensions['model_set'].registry(requested_model())
+
+
+def current_scoring_service():
+    """
+    the ScoringService of the model selected by the current request (read once per request)
+    raise InvalidRequest for an unknown model
+    """
+    return current_registry().service
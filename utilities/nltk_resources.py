@@ -0,0 +1,41 @@
+"""
+A function used for loading the NLTK resources from a local data directory, without downloading anything
+"""
+
+import nltk
+
+
+# resource name (as given to nltk.download)  ->  path of the resource inside an NLTK data directory
+NLTK_RESOURCES = {'vader_lexicon': 'sentiment/vader_lexicon.zip',
+                  'stopwords':     'corpora/stopwords',
+                  'punkt':         'tokenizers/punkt'}
+
+
+def load_nltk_resources(data_dir, resources, logger):
+
+    """
+    Point NLTK at data_dir only, and check that every resource is there
+
+      data_dir   str   NLTK data directory, filled at build time with
+                       python -m nltk.downloader -d <data_dir> <resource> ...
+      resources  list  resource names, keys of NLTK_RESOURCES
+      logger           logger for the found resources
+
+    Raise LookupError, naming every missing resource and how to install it, if any is missing.
+    Nothing is downloaded, and no other location is searched.
+    """
+
+    nltk.data.path[:] = [data_dir]
+
+    list_missing = []
+    for resource in resources:
+        try:
+            location = nltk.data.find(NLTK_RESOURCES[resource])
+            logger.info('nltk resource found:      ' + str(resource) + ' (' + str(location) + ')')
+        except LookupError:
+            list_missing.append(resource)
+
+    if len(list_missing) > 0:
+        raise LookupError("NLTK resource(s) not found in " + str(data_dir) + ": " + ", ".join(list_missing) + ". "
+                          "Install them at build time with: "
+                          "python -m nltk.downloader -d " + str(data_dir) + " " + " ".join(list_missing))
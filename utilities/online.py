@@ -0,0 +1,138 @@
+"""
+A function used for updating the online model (see build_online_pipeline) from labelled lines, in mini-batches,
+and checkpointing it to a model file that the service picks up (see ModelRegistry.watch)
+"""
+
+import os
+
+from time                 import localtime, perf_counter, strftime
+
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline     import Pipeline
+from utilities.model_file import load_model_file, save_model_file
+from utilities.pipeline   import CLASSES, build_online_pipeline
+from utilities.text       import preprocessor
+
+
+def is_online_model(model):
+    return type(model) is Pipeline and type(model['clf']) is SGDClassifier
+
+
+class OnlineLearner:
+
+    """
+    Update the online model with labelled sentences, and checkpoint it
+
+      model_file           str     checkpoint file: the model is read from it if it exists, and written to it
+      batch_size           int     sentences per update (SGDClassifier.partial_fit)
+      checkpoint_every     int     sentences learnt between checkpoints; 0 checkpoints on checkpoint() only
+      checkpoint_interval  float   seconds after which the sentences received are checkpointed, however few
+                                   (a slow trickle); 0 does not checkpoint on time
+      logger               logger  where the updates & checkpoints are logged
+
+    The sentences are pre-processed as they are served (utilities/preprocessing_config.py). A checkpoint
+    replaces model_file in one rename: served with ModelRegistry.watch, the service reloads it in the
+    background, with no restart.
+
+      learner = OnlineLearner('sentiment_model_online', 256, 5000, 60, logger)
+      learner.learn(text, label)      queued, learnt once batch_size sentences are queued
+      learner.checkpoint_if_due()     while no sentence arrives: keeps checkpoint_interval
+      learner.checkpoint()            learn the queued sentences, and write the model file (if anything was learnt)
+    """
+
+    def __init__(self, model_file, batch_size, checkpoint_every, checkpoint_interval, logger):
+        self.model_file          = model_file
+        self.batch_size          = batch_size
+        self.checkpoint_every    = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self.logger              = logger
+        self.pending             = []    # (text, label) not learnt yet
+        self.learnt              = 0     # sentences learnt since the model was created
+        self.since_checkpoint    = 0     # sentences learnt since the last checkpoint
+        self.checkpoint_time     = perf_counter()
+
+        if os.path.exists(model_file):
+            model_files = load_model_file(model_file, logger)
+            if not is_online_model(model_files['model']):
+                raise ValueError(str(model_file) + ' is not an online model (Pipeline(HashingVectorizer, '
+                                 'SGDClassifier)), got: ' + str(model_files['model']))
+            self.model  = model_files['model']
+            # weight updates of SGDClassifier: one per sentence learnt, plus one
+            self.learnt = int(self.model['clf'].t_) - 1
+        else:
+            self.model  = build_online_pipeline()
+
+    def __repr__(self):
+        return 'OnlineLearner(' + str(self.model_file) + ', learnt=' + str(self.learnt) + ')'
+
+    def learn(self, text, label):
+        """
+        to queue a labelled sentence (label: 1-5), and update the model once batch_size sentences are queued
+        """
+        if label not in CLASSES:
+            raise ValueError('label is expected to be one of ' + str(CLASSES) + ', got: ' + str(label))
+        self.pending.append((text, label))
+        if len(self.pending) >= self.batch_size:
+            self.update()
+        self.checkpoint_if_due()
+
+    def checkpoint_if_due(self):
+        """
+        to checkpoint if checkpoint_due(): called by learn, and while waiting for sentences (see online_train.py)
+        """
+        if self.checkpoint_due():
+            self.checkpoint()
+
+    def checkpoint_due(self):
+        """
+        whether checkpoint_every sentences were learnt since the last checkpoint, or checkpoint_interval
+        seconds passed with sentences to checkpoint (the queued ones are learnt by the checkpoint)
+        """
+        if self.checkpoint_every and self.since_checkpoint >= self.checkpoint_every:
+            return True
+        return bool(self.checkpoint_interval) and (self.since_checkpoint > 0 or len(self.pending) > 0) and \
+               perf_counter() - self.checkpoint_time >= self.checkpoint_interval
+
+    def update(self):
+        """
+        to update the model with the queued sentences, in one partial_fit
+        """
+        if not self.pending:
+            return
+        list_text  = [preprocessor(text) for text, _ in self.pending]
+        list_label = [label for _, label in self.pending]
+        self.model['clf'].partial_fit(self.model['vect'].transform(list_text), list_label, classes = CLASSES)
+
+        self.learnt           += len(self.pending)
+        self.since_checkpoint += len(self.pending)
+        self.pending           = []
+
+    def checkpoint(self):
+        """
+        to learn the queued sentences, and write the model to model_file;
+        nothing is written if no sentence was learnt since the last checkpoint (or ever)
+
+        return True if model_file was written
+        """
+        self.update()
+        # an unchanged model would be reloaded by the service for nothing (its result cache lost with it),
+        # and an unfitted one cannot score
+        if self.since_checkpoint == 0 or not hasattr(self.model['clf'], 'coef_'):
+            return False
+
+        # the sentences learnt are part of the version: it identifies the model in the result cache of
+        # the service, and several checkpoints may be written within a second
+        model_version = strftime('%Y%m%d-%H%M%S', localtime()) + '-' + str(self.learnt)
+        save_model_file(self.model_file,                  # filename
+                        self.model,                       # model
+                        type(self.model),                 # model_type
+                        'sentiment-analysis',             # model_name
+                        model_version,                    # model_version
+                        'online',                         # train_pred
+                        self.logger,                      # logger, not for saving
+                        timed_copy = False)
+
+        self.since_checkpoint = 0
+        self.checkpoint_time  = perf_counter()
+        self.logger.info('checkpoint: %s, version %s', self.model_file, model_version)
+        return True
@@ -0,0 +1,72 @@
+"""
+A function used for building the Logistic Regression pipelines trained by train.py,
+and the online pipeline updated by online_train.py
+"""
+
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfTransformer
+from sklearn.linear_model            import LogisticRegression, SGDClassifier
+from sklearn.pipeline                import Pipeline
+
+
+# columns of the hashing vectorizer; a power of 2 (the hash is taken modulo n_features)
+# the idf vector & the coefficients are dense, n_features wide: 2^16 keeps the model near the size of the
+# vocabulary model for SST (about 16k terms), with little collision loss (see benchmarks/bench_hashing.py)
+HASHING_N_FEATURES = 2 ** 16
+
+VECTORIZERS = ['count', 'hashing']
+
+# class labels of the SST sets; the online classifier is told them all on its first update
+CLASSES     = [1, 2, 3, 4, 5]
+
+
+def build_pipeline(vectorizer = 'count', n_features = HASHING_N_FEATURES, clf_params = None):
+
+    """
+    Build an (unfitted) Pipeline(vect, tfidf, clf) with a LogisticRegression 'clf' step
+
+      vectorizer  str   'count'   - CountVectorizer: a vocabulary dict, learnt from the training set
+                        'hashing' - HashingVectorizer: tokens hashed to n_features columns, nothing learnt;
+                                    the model holds arrays only (idf of TfidfTransformer, coefficients)
+      n_features  int   columns of the hashing vectorizer
+      clf_params  dict  LogisticRegression parameters, over the defaults (solver='liblinear'), e.g. {'C': 10}
+
+    Both tokenize the same way (CountVectorizer defaults), and are served the same way by text_predict.
+    """
+
+    if vectorizer == 'count':
+        vect = CountVectorizer()
+    elif vectorizer == 'hashing':
+        # raw counts, as CountVectorizer: the signs & the normalisation are left to TfidfTransformer
+        vect = HashingVectorizer(n_features     = n_features,
+                                 alternate_sign = False,
+                                 norm           = None)
+    else:
+        raise ValueError('vectorizer is expected to be one of ' + str(VECTORIZERS) + ', got: ' + str(vectorizer))
+
+    clf_params = {'solver': 'liblinear', 'multi_class': 'auto', **(clf_params or {})}
+
+    return Pipeline([('vect',  vect),
+                     ('tfidf', TfidfTransformer()),
+                     ('clf',   LogisticRegression(**clf_params))])
+
+
+def build_online_pipeline(n_features = HASHING_N_FEATURES):
+
+    """
+    Build an (unfitted) Pipeline(vect, clf) that can be updated in mini-batches (see utilities/online.py)
+
+      n_features  int  columns of the hashing vectorizer
+
+    Nothing is learnt by the vectorizer (HashingVectorizer: a fixed-width feature space, l2-normalised counts;
+    there is no tf-idf step, as the idf cannot be updated incrementally), so that the 'clf' step, a linear
+    SGDClassifier (modified Huber loss, averaged weights), is updated alone by partial_fit.
+    Served the same way as the Logistic Regression pipelines by text_predict.
+    """
+
+    return Pipeline([('vect', HashingVectorizer(n_features     = n_features,
+                                                alternate_sign = False,
+                                                norm           = 'l2')),
+                     ('clf',  SGDClassifier(loss         = 'modified_huber',
+                                            alpha        = 3e-5,
+                                            average      = True,
+                                            random_state = 0))])
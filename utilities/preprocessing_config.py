@@ -0,0 +1,14 @@
+"""
+Text pre-processing setting, shared by training (train.py) and serving (utilities/text.py)
+
+A model has to be served with the same setting it was trained with.
+Kept free of any heavy import, so that serving can read it without importing the training code.
+"""
+
+f_lower_case         = False
+f_rm_num             = False
+f_rm_html_tags       = False
+f_rm_whitespaces     = False
+f_rm_punctuation     = False
+f_rm_stop_words      = False
+f_conv_accented_char = False
@@ -0,0 +1,114 @@
+"""
+The scoring core shared by every endpoint (/curl, /curl/batch, /curl/stream and the swagger-ui blueprint):
+one model instance, its result cache and the request / sentence validation
+"""
+
+from utilities.cache      import ResultCache
+from utilities.text       import resolve_predict
+from utilities.validation import HTTP_BAD_REQUEST, HTTP_STATUS_TEXT, check_request, check_sentence
+
+
+class InvalidLine:
+    """
+    an input line (e.g. of /curl/stream) that could not be read as {"sentence": ...}
+    """
+    def __init__(self, sentence, message):
+        self.sentence = sentence
+        self.message  = message
+
+
+class ScoringService:
+
+    """
+    Validate and score sentences with one model
+
+      model                the model loaded from the model file
+      model_version        str  identifies the model in the result cache
+      cache_capacity       int  size of the result cache; 0 disables it
+      max_sentence_length  int  longest sentence accepted, in characters
+      result_cache         ResultCache  shared with the services of other models (see ModelRegistry);
+                                        by default, a new one of cache_capacity
+      vader_thresholds     list  of a VADER model file: the class of the compound score is added as 'label'
+                                 (see resolve_predict)
+
+    Built by the ModelRegistry (utilities/model_registry.py) of app.py for every model it serves.
+    """
+
+    def __init__(self, model, model_version, cache_capacity, max_sentence_length, result_cache = None,
+                 vader_thresholds = None):
+        self.model               = model
+        self.model_version       = model_version
+        self.result_cache        = ResultCache(cache_capacity) if result_cache is None else result_cache
+        self.max_sentence_length = max_sentence_length
+        # resolved once for the model, not on every call
+        self.predict, self.predict_batch = resolve_predict(model, vader_thresholds)
+
+    def __repr__(self):
+        return 'ScoringService(' + str(self.model_version) + ')'
+
+    def check_request(self, dict_request):
+        """
+        to return the error message for an invalid {"sentence": "xxx"} request, or None if it is valid
+        """
+        return check_request(dict_request, self.max_sentence_length)
+
+    def check_sentence(self, sentence):
+        """
+        to return the error message for an invalid input sentence, or None if it is valid
+        """
+        return check_sentence(sentence, self.max_sentence_length)
+
+    def score(self, sentence):
+        """
+        the score dict of one (valid) sentence, from the result cache or the model
+        """
+        return self.result_cache.predict(sentence, self.predict, self.model_version)
+
+    def score_sentences(self, list_sentence):
+        """
+        the score dicts of (valid) sentences, with a single batched prediction for the ones not in the cache
+        """
+        return self.result_cache.predict_batch(list_sentence, self.predict_batch, self.model_version)
+
+    def score_batch(self, list_sentence):
+        """
+        to validate every sentence on its own, and score the valid ones with a single batched prediction
+
+          list_sentence  list  str, InvalidLine, or any other JSON value (an error)
+
+        return the list of results of /curl/batch: a score (status "complete") or an error item per sentence
+        """
+        list_result = []
+        list_valid  = []   # (position in list_result, sentence)
+        for index, sentence in enumerate(list_sentence):
+            if isinstance(sentence, InvalidLine):
+                message, sentence = sentence.message, sentence.sentence
+            elif not isinstance(sentence, str):
+                message = "Failed to decode JSON object: Expecting str data type for value in key/value pair " \
+                          "(enclosed in double quotes)."
+            else:
+                message = self.check_sentence(sentence)
+
+            if message is None:
+                list_result.append(None)
+                list_valid.append((index, sentence))
+            else:
+                list_result.append(error_item(sentence, message))
+
+        # Text pre-processing & Prediction
+        list_dict_score = self.score_sentences([sentence for _, sentence in list_valid])
+
+        for (index, sentence), dict_score in zip(list_valid, list_dict_score):
+            list_result[index] = dict(score = dict_score, status = "complete", sentence = sentence)
+
+        return list_result
+
+
+def error_item(sentence, message):
+    """
+    the per-sentence counterpart of an error response, used in the results of /curl/batch & /curl/stream
+    """
+    return dict(sentence      = sentence,
+                status        = "error",
+                status_code   = str(HTTP_BAD_REQUEST) + " - " + HTTP_STATUS_TEXT[HTTP_BAD_REQUEST],
+                error_message = message)
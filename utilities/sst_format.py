@@ -0,0 +1,21 @@
+"""
+A function used for parsing the lines of the SST format (__label__N<TAB>text, as sst_train.txt)
+
+Kept apart from utilities/training_data.py, which imports utilities/text.py: a process can parse lines
+before NLTK is pointed at its data directory (see batch_score.py).
+"""
+
+
+SST_LABEL_PREFIX = '__label__'
+
+
+def parse_sst_line(line, line_number = None):
+    """
+    "__label__N<TAB>text"  ->  (N, text); raise ValueError for a line in another format
+    (line_number, if given, is part of the error message)
+    """
+    label, tab, text = line.rstrip('\n').partition('\t')
+    if not tab or not label.startswith(SST_LABEL_PREFIX) or not label[len(SST_LABEL_PREFIX):].isdigit():
+        raise ValueError('line ' + ('' if line_number is None else str(line_number) + ' ') + 'is not in the '
+                         + SST_LABEL_PREFIX + 'N<TAB>text format: ' + line[:80])
+    return int(label[len(SST_LABEL_PREFIX):]), text
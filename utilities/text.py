@@ -3,22 +3,28 @@ A function used for input text pre-processing
 """
 
 import re
+import bisect
 import logging
+import weakref
 import unidecode
 import string
 
 import pandas as pd
 
+from time           import perf_counter
+
 from bs4            import BeautifulSoup
 from nltk.corpus    import stopwords
 from nltk.tokenize  import word_tokenize
 # from pycontractions import Contractions
 
 
-import sys
 from nltk.sentiment.vader         import SentimentIntensityAnalyzer
-from sklearn.linear_model         import LogisticRegression
+from sklearn.linear_model         import LogisticRegression, SGDClassifier
 from sklearn.pipeline             import Pipeline
+from utilities.mapped_model       import MappedLinearModel
+from utilities.metrics            import latency_metrics
+from utilities.vader              import CompiledVader
 
 
 
@@ -105,6 +111,177 @@ def text_preprocessing(text,
 
 
 
+# pre-compiled patterns shared by all the Preprocessor objects
+RE_NUM         = re.compile(r'\d+')
+RE_HTML_MARKUP = re.compile(r'[<&]')          # tags or character references
+RE_ASCII_SPACE = re.compile(r'[ \n\t\f\r]+')   # BeautifulSoup.ASCII_SPACES
+RE_NON_ASCII   = re.compile(r'[^\x00-\x7f]')
+# the texts rm_html_tags changes: with markup, or made of nothing but ASCII spaces
+RE_HTML_CHANGE = re.compile(r'[<&]|\A[ \n\t\f\r]+\Z')
+
+
+class Preprocessor:
+
+    """
+    Pre-process input text, with the same flags and the same output as text_preprocessing,
+    but with the set-up (patterns, translation table, stop words) done once in the constructor.
+
+    The enabled steps are kept in self.stages as (name, function) pairs, in the order text_preprocessing
+    applies them:
+      lowercase, num, html, whitespace, punctuation, stopwords, unidecode
+
+    Build one object per flag combination and reuse it:
+      preprocessor = Preprocessor(f_lower_case = True, f_rm_num = False, ...)
+      text         = preprocessor(text)
+
+    A whole DataFrame column is pre-processed with transform, column-wise (same output as row by row):
+      df['text']   = preprocessor.transform(df['text'])
+    """
+
+    def __init__(self,
+                 f_lower_case         = True,
+                 f_rm_num             = True,
+                 f_rm_html_tags       = True,
+                 f_rm_whitespaces     = True,
+                 f_rm_punctuation     = True,
+                 f_rm_stop_words      = True,
+                 f_conv_accented_char = True):
+
+        self.flags = {'f_lower_case':         f_lower_case,
+                      'f_rm_num':             f_rm_num,
+                      'f_rm_html_tags':       f_rm_html_tags,
+                      'f_rm_whitespaces':     f_rm_whitespaces,
+                      'f_rm_punctuation':     f_rm_punctuation,
+                      'f_rm_stop_words':      f_rm_stop_words,
+                      'f_conv_accented_char': f_conv_accented_char}
+
+        self.punctuation_table = str.maketrans("", "", string.punctuation)
+        # loaded only when needed, as it requires the NLTK stopwords corpus
+        self.stop_words        = frozenset(stopwords.words('english')) if f_rm_stop_words == True else frozenset()
+
+        self.stages = []
+        if f_lower_case == True:
+            self.stages.append(('lowercase',   str.lower))
+        if f_rm_num == True:
+            self.stages.append(('num',         self.rm_num))
+        if f_rm_html_tags == True:
+            self.stages.append(('html',        self.rm_html_tags))
+        if f_rm_whitespaces == True:
+            self.stages.append(('whitespace',  str.strip))
+        if f_rm_punctuation == True:
+            self.stages.append(('punctuation', self.rm_punctuation))
+        if f_rm_stop_words == True:
+            self.stages.append(('stopwords',   self.rm_stop_words))
+        if f_conv_accented_char == True:
+            self.stages.append(('unidecode',   self.conv_accented_char))
+
+        # the column-wise counterpart of every stage, used by transform
+        column_stages      = {'lowercase':   self.column_lower,
+                              'num':         self.column_rm_num,
+                              'html':        self.column_rm_html_tags,
+                              'whitespace':  self.column_strip,
+                              'punctuation': self.column_rm_punctuation,
+                              'stopwords':   self.column_rm_stop_words,
+                              'unidecode':   self.column_conv_accented_char}
+        self.column_stages = [(name, column_stages[name]) for name, _ in self.stages]
+
+    def __call__(self, text):
+        for _, stage in self.stages:
+            text = stage(text)
+        return text
+
+    def timed(self, text, metrics):
+        """
+        __call__, with the time of every stage observed in metrics (a LatencyMetrics), under the stage name
+        """
+        for name, stage in self.stages:
+            start = perf_counter()
+            text  = stage(text)
+            metrics.observe(name, perf_counter() - start)
+        return text
+
+    def transform(self, series):
+        """
+        __call__ on every text of a pandas Series of str, a stage at a time over the whole column:
+        pandas .str methods & compiled patterns, and the row-wise stage only for the rows it changes
+        (HTML parsing, unidecode). Stop word removal stays row-wise, as word_tokenize has no column form.
+        """
+        for _, column_stage in self.column_stages:
+            series = column_stage(series)
+        return series
+
+    def __repr__(self):
+        return 'Preprocessor(' + ', '.join(name for name, _ in self.stages) + ')'
+
+    @staticmethod
+    def rm_num(text):
+        return RE_NUM.sub('', text)
+
+    @staticmethod
+    def rm_html_tags(text):
+        # fast path: with no tag and no character reference, html.parser returns the text unchanged,
+        # except that a string of nothing but ASCII spaces is collapsed into one newline or space
+        if RE_HTML_MARKUP.search(text) is None:
+            if RE_ASCII_SPACE.fullmatch(text) is not None:
+                return '\n' if '\n' in text else ' '
+            return text
+        return BeautifulSoup(text, "html.parser").get_text(separator = " ")
+
+    def rm_punctuation(self, text):
+        return text.translate(self.punctuation_table)
+
+    def rm_stop_words(self, text):
+        # word_tokenize is kept (rather than str.split), as its tokens are what gets joined back
+        stop_words = self.stop_words
+        return " ".join([token for token in word_tokenize(text) if token not in stop_words])
+
+    @staticmethod
+    def conv_accented_char(text):
+        # unidecode leaves ASCII text unchanged
+        if text.isascii():
+            return text
+        return unidecode.unidecode(text)
+
+    # column-wise stages, on a pandas Series of str
+    @staticmethod
+    def column_lower(series):
+        return series.str.lower()
+
+    @staticmethod
+    def column_rm_num(series):
+        return series.str.replace(RE_NUM, '', regex = True)
+
+    def column_rm_html_tags(self, series):
+        # the rows with no markup (nearly all of them) are left as they are
+        return map_rows(series, series.str.contains(RE_HTML_CHANGE, na = False), self.rm_html_tags)
+
+    @staticmethod
+    def column_strip(series):
+        return series.str.strip()
+
+    def column_rm_punctuation(self, series):
+        return series.str.translate(self.punctuation_table)
+
+    def column_rm_stop_words(self, series):
+        return series.map(self.rm_stop_words)
+
+    @staticmethod
+    def column_conv_accented_char(series):
+        return map_rows(series, series.str.contains(RE_NON_ASCII, na = False), unidecode.unidecode)
+
+
+def map_rows(series, mask, function):
+    """
+    series, with function applied to the rows selected by mask (a boolean Series) only
+    """
+    if not mask.any():
+        return series
+    series       = series.copy()
+    series[mask] = series[mask].map(function)
+    return series
+
+
+
 
 def df_preprocessing(list_text_files,
                      f_lower_case,
@@ -115,7 +292,14 @@ def df_preprocessing(list_text_files,
                      f_rm_stop_words,
                      f_conv_accented_char):
 
-    list_df = []
+    list_df      = []
+    preprocessor = Preprocessor(f_lower_case,
+                                f_rm_num,
+                                f_rm_html_tags,
+                                f_rm_whitespaces,
+                                f_rm_punctuation,
+                                f_rm_stop_words,
+                                f_conv_accented_char)
 
     for text_file in list_text_files:
         # read data from file
@@ -127,22 +311,135 @@ def df_preprocessing(list_text_files,
         # pre-processing
         # training set will have 2 cols: text & truth after the pre-processing
         df['truth'] = df['truth'].str.replace('__label__', '').astype(int).astype('category')
-        df['text'] = df['text'].apply(lambda x: text_preprocessing(x,
-                                                                   f_lower_case,
-                                                                   f_rm_num,
-                                                                   f_rm_html_tags,
-                                                                   f_rm_whitespaces,
-                                                                   f_rm_punctuation,
-                                                                   f_rm_stop_words,
-                                                                   f_conv_accented_char))
+        df['text'] = preprocessor.transform(df['text'])
         list_df.append(df)
 
     return list_df[0], list_df[1], list_df[2]
 
 
 
-sys.path.append('..')
-from train import f_lower_case, f_rm_num, f_rm_html_tags, f_rm_whitespaces, f_rm_punctuation, f_rm_stop_words, f_conv_accented_char
+from utilities.preprocessing_config import f_lower_case, f_rm_num, f_rm_html_tags, f_rm_whitespaces, \
+                                         f_rm_punctuation, f_rm_stop_words, f_conv_accented_char
+
+text_logger = logging.getLogger("app_logger")
+
+# built once, used by text_predict & text_predict_batch
+preprocessor = Preprocessor(f_lower_case         = f_lower_case,
+                            f_rm_num             = f_rm_num,
+                            f_rm_html_tags       = f_rm_html_tags,
+                            f_rm_whitespaces     = f_rm_whitespaces,
+                            f_rm_punctuation     = f_rm_punctuation,
+                            f_rm_stop_words      = f_rm_stop_words,
+                            f_conv_accented_char = f_conv_accented_char)
+
+# compiled VADER scorer of each SentimentIntensityAnalyzer model (None: the model's own polarity_scores is used)
+compiled_vaders = weakref.WeakKeyDictionary()
+
+
+def polarity_scorer(model):
+    """
+    the polarity_scores function for a SentimentIntensityAnalyzer model: CompiledVader's,
+    built once per model, unless it does not agree with the model (another nltk version)
+    """
+    if model not in compiled_vaders:
+        compiled_vader         = CompiledVader(model)
+        compiled_vaders[model] = compiled_vader if compiled_vader.check(model) else None
+
+    compiled_vader = compiled_vaders[model]
+    return model.polarity_scores if compiled_vader is None else compiled_vader.polarity_scores
+
+
+"""
+A function used for resolving, once per model, the prediction functions of that model
+"""
+def is_linear_model(model):
+    """
+    whether model is scored by its predict (1-5): a Pipeline with a LogisticRegression or SGDClassifier
+    'clf' step, or a MappedLinearModel
+    """
+    return (type(model) is Pipeline and type(model['clf']) in (LogisticRegression, SGDClassifier)) or \
+           type(model) is MappedLinearModel
+
+
+def is_scoring_model(model):
+    """
+    whether resolve_predict scores model: its prediction functions return None for a model of another type
+    """
+    return type(model) is SentimentIntensityAnalyzer or is_linear_model(model)
+
+
+def resolve_predict(model, vader_thresholds = None):
+
+    """
+    The text_predict & text_predict_batch of model, with the type of model looked up once, here
+
+      model             SentimentIntensityAnalyzer, Pipeline with a LogisticRegression or SGDClassifier (online)
+                        'clf' step, or MappedLinearModel
+      vader_thresholds  list  of a SentimentIntensityAnalyzer model (stored in its model file): the compound score
+                              thresholds between the 5 classes; the class is added to the scores as 'label' (1-5)
+
+    return (predict, predict_batch): text -> score dict, and list of texts -> list of score dicts;
+           both return None for a model of another type
+    """
+
+    if type(model) is SentimentIntensityAnalyzer:
+
+        polarity_scores = polarity_scorer(model)
+
+        if vader_thresholds is not None:
+            compound_scorer = polarity_scores
+
+            def polarity_scores(text):
+                dict_score = compound_scorer(text)
+                # the class of the compound score, as classify in utilities/vader_thresholds.py (np.digitize)
+                dict_score['label'] = str(bisect.bisect_right(vader_thresholds, dict_score['compound']) + 1)
+                return dict_score
+
+        def predict(text):
+            # text pre-processing
+            text = preprocessor.timed(text, latency_metrics)
+
+            # return floats for sentiment strength based on the input sentence
+            start      = perf_counter()
+            dict_score = polarity_scores(text)
+            latency_metrics.observe('inference', perf_counter() - start)
+            return dict_score
+
+        def predict_batch(list_text):
+            # VADER is a rule based scorer, so there is nothing to vectorize
+            return [polarity_scores(preprocessor(text)) for text in list_text]
+
+    elif is_linear_model(model):
+
+        model_predict = model.predict
+
+        def predict(text):
+            # text pre-processing
+            text = preprocessor.timed(text, latency_metrics)
+
+            # return an int from 1-5
+            start      = perf_counter()
+            dict_score = {'score': str(model_predict([text])[0])}
+            latency_metrics.observe('inference', perf_counter() - start)
+            text_logger.debug('LR Score: %s. %s', dict_score, text)
+            return dict_score
+
+        def predict_batch(list_text):
+            # one vectorized call for the whole batch; predict() does not accept an empty list
+            if len(list_text) == 0:
+                return []
+            return [{'score': str(score)} for score in model_predict([preprocessor(text) for text in list_text])]
+
+    else:
+
+        def predict(text):
+            return None
+
+        def predict_batch(list_text):
+            return None
+
+    return predict, predict_batch
+
 
 
 """
@@ -150,37 +447,30 @@ A function called by api & HTML form endpoints for prediction
 """
 def text_predict(text, model):
 
-    dict_score = None
+    """
+    Score one sentence with model (resolved on every call: a caller that scores many sentences with the
+    same model resolves it once, with resolve_predict)
 
-    if type(model) is SentimentIntensityAnalyzer:
+    return a score dict: pos, neg, neu & compound for VADER, score (1-5) for Logistic Regression
+    """
+
+    return resolve_predict(model)[0](text)
+
+
+
+"""
+A function called by the batch api endpoint for prediction of a list of sentences
+"""
+def text_predict_batch(list_text, model):
+
+    """
+    Score a list of sentences in one go
+
+      list_text  list  sentences to be scored (already validated)
+      model            SentimentIntensityAnalyzer, Pipeline with a LogisticRegression or SGDClassifier 'clf'
+                       step, or MappedLinearModel
+
+    return a list of score dicts, in the same order and the same format as text_predict
+    """
 
-        # text pre-processing
-        text = text_preprocessing(text,
-                                  f_lower_case= f_lower_case,
-                                  f_rm_num= f_rm_num,
-                                  f_rm_html_tags= f_rm_html_tags,
-                                  f_rm_whitespaces= f_rm_whitespaces,
-                                  f_rm_punctuation= f_rm_punctuation,
-                                  f_rm_stop_words= f_rm_stop_words,
-                                  f_conv_accented_char= f_conv_accented_char)
-
-        # return floats for sentiment strength based on the input sentence
-        dict_score = model.polarity_scores(text)
-
-    elif type(model) is Pipeline and type(model['clf']) is LogisticRegression:
-
-        # text pre-processing
-        text = text_preprocessing(text,
-                                  f_lower_case= f_lower_case,
-                                  f_rm_num= f_rm_num,
-                                  f_rm_html_tags= f_rm_html_tags,
-                                  f_rm_whitespaces= f_rm_whitespaces,
-                                  f_rm_punctuation= f_rm_punctuation,
-                                  f_rm_stop_words= f_rm_stop_words,
-                                  f_conv_accented_char= f_conv_accented_char)
-
-        # return an int from 1-5
-        dict_score = {'score': str(model.predict([text])[0])}
-        print('LR Score: ' + str(dict_score) + '. ' + str(text))
-
-    return dict_score
\ No newline at end of file
+    return resolve_predict(model)[1](list_text)
@@ -0,0 +1,140 @@
+"""
+A function used for reading the SST splits (__label__N<TAB>text) as DataFrames of pre-processed text,
+pre-processed across processes and cached on disk
+
+A split is pre-processed once per file content & flag setting: the result is stored in cache_dir under a key
+made of both, so that a later run with the same file & flags reads it back instead, and a changed file or
+flag is pre-processed again.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import tempfile
+
+import numpy  as np
+import pandas as pd
+
+from utilities.sst_format import SST_LABEL_PREFIX, parse_sst_line
+from utilities.text       import Preprocessor
+
+
+# part of every cache key: to be changed whenever the pre-processing changes the text it returns
+CACHE_VERSION     = 1
+
+# below this number of rows, the split is pre-processed in this process: starting workers costs more
+MIN_PARALLEL_ROWS = 2000
+
+
+def file_hash(file_name):
+    """
+    the sha256 hex digest of the content of file_name
+    """
+    digest = hashlib.sha256()
+    with open(file_name, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(file_name, flags, col_names = ['truth', 'text']):
+    """
+    the cache key of file_name read with col_names, and pre-processed with flags (the seven flags of
+    text_preprocessing, in order)
+    """
+    text = '|'.join([file_hash(file_name), ','.join(str(bool(flag)) for flag in flags), ','.join(col_names),
+                     str(CACHE_VERSION)])
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def read_sst(file_name, col_names = ['truth', 'text']):
+    """
+    to read an SST split, with the truth labels as categories; the text is not pre-processed
+    """
+    df = pd.read_csv(file_name,
+                     sep    = '\t',
+                     header = None,
+                     names  = col_names)
+
+    # categorise the truth labels
+    df['truth'] = df['truth'].str.replace(SST_LABEL_PREFIX, '')
+    df['truth'] = df['truth'].astype(int).astype('category')
+
+    return df
+
+
+def preprocess_chunk(series, flags):
+    return Preprocessor(*flags).transform(series)
+
+
+def preprocess_parallel(series, flags, workers = os.cpu_count()):
+
+    """
+    Pre-process a column of text with Preprocessor.transform, split across worker processes
+
+      series   Series  text to pre-process
+      flags    tuple   the seven flags of text_preprocessing, in order
+      workers  int     worker processes; 1 pre-processes in this process
+
+    return the pre-processed Series, same index & order as series
+    """
+
+    if not any(flags):
+        return series.copy()
+    if workers <= 1 or len(series) < MIN_PARALLEL_ROWS:
+        return preprocess_chunk(series, flags)
+
+    list_chunk = [series.iloc[index] for index in np.array_split(np.arange(len(series)), workers)]
+    with multiprocessing.Pool(workers) as pool:
+        list_result = pool.starmap(preprocess_chunk, [(chunk, flags) for chunk in list_chunk])
+
+    return pd.concat(list_result)
+
+
+def read_split(file_name, flags,
+               col_names = ['truth', 'text'],
+               cache_dir = None,
+               workers   = os.cpu_count(),
+               logger    = None):
+
+    """
+    Read an SST split, and pre-process its text, from the cache if possible
+
+      file_name  str     SST split, e.g. sst_train.txt
+      flags      tuple   the seven flags of text_preprocessing, in order
+      col_names  list    names of the columns of the file (see read_sst): truth & text are expected among them
+      cache_dir  str     directory of the cached splits; None does not cache
+      workers    int     worker processes of the pre-processing (see preprocess_parallel)
+      logger     logger  where the cache hits & misses are logged (optional)
+
+    return a DataFrame of the columns col_names: truth (category) & text (pre-processed), by default
+    """
+
+    cache_file = None
+    if cache_dir is not None:
+        cache_file = os.path.join(cache_dir, cache_key(file_name, flags, col_names) + '.pkl')
+        if os.path.exists(cache_file):
+            if logger is not None:
+                logger.info('pre-processed ' + str(file_name) + ' read from cache: ' + cache_file)
+            return pd.read_pickle(cache_file)
+
+    df         = read_sst(file_name, col_names)
+    df['text'] = preprocess_parallel(df['text'], flags, workers)
+
+    if cache_file is not None:
+        os.makedirs(cache_dir, exist_ok = True)
+        # written aside, under a name of its own, then renamed: a run stopped half-way leaves no truncated cache
+        # file behind, and runs caching the same split at once (e.g. sweep.py & train.py) do not write to
+        # the same file
+        fd, tmp_file = tempfile.mkstemp(dir = cache_dir, prefix = '.tmp-', suffix = '.pkl')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                df.to_pickle(f)
+            os.replace(tmp_file, cache_file)
+        except BaseException:
+            os.remove(tmp_file)
+            raise
+        if logger is not None:
+            logger.info('pre-processed ' + str(file_name) + ' cached: ' + cache_file)
+
+    return df
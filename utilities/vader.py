@@ -0,0 +1,290 @@
+"""
+A compiled scorer for the VADER SentimentIntensityAnalyzer model
+
+SentimentIntensityAnalyzer.polarity_scores re-does, for every word of every sentence, the lowercasing,
+the lexicon / booster / negation look-ups (several times per word, for its neighbours), and builds
+a punctuation dict of every word of the sentence crossed with every punctuation mark.
+
+CompiledVader gives the same scores (same floats, same rounding), with:
+  - the lexicon, booster, negation and idiom tables flattened into module-level sets and dicts,
+  - every word of a sentence looked up once, into flat per-word lists,
+  - leading/trailing punctuation stripped by a direct check instead of the punctuation dict.
+
+It follows polarity_scores of nltk 3.4.x rule by rule, quirks included (a repeated word takes
+the position of its first occurrence; see the comments below).
+"""
+
+import math
+import string
+
+from nltk.sentiment import vader
+
+
+# tables of the installed nltk (module level in 3.4.x, in VaderConstants from 3.5 on)
+constants = vader if hasattr(vader, 'BOOSTER_DICT') else vader.VaderConstants()
+
+B_DECR              = constants.B_DECR
+C_INCR              = constants.C_INCR
+N_SCALAR            = constants.N_SCALAR
+NEGATE              = frozenset(constants.NEGATE)
+BOOSTER_DICT        = dict(constants.BOOSTER_DICT)
+SPECIAL_CASE_IDIOMS = dict(constants.SPECIAL_CASE_IDIOMS)
+PUNC_SET            = frozenset(constants.PUNC_LIST)
+PUNCTUATION         = frozenset(string.punctuation)   # what SentiText removes with REGEX_REMOVE_PUNCTUATION
+
+# sentences the compiled scorer is checked against when built
+CHECK_SENTENCES = ["VADER is smart, handsome, and funny!",
+                   "VADER is not smart, handsome, nor funny.",
+                   "The book was kind of good, but the plot was never so SLOW!!?",
+                   "At least it isn't a horrible book... the shit, yeah right ???",
+                   "Today SUX! :) good good bad, but at least very least GREAT"]
+
+
+class CompiledVader:
+
+    """
+    Score sentences as model.polarity_scores does, faster
+
+      model  SentimentIntensityAnalyzer  its lexicon is shared, not copied
+
+    scorer = CompiledVader(model)
+    scorer.check(model)           ->  True with nltk 3.4.x
+    scorer.polarity_scores(text)  ->  {'neg', 'neu', 'pos', 'compound'}
+    """
+
+    def __init__(self, model):
+        self.lexicon = model.lexicon
+
+    def __repr__(self):
+        return 'CompiledVader(' + str(len(self.lexicon)) + ' lexicon entries)'
+
+    def check(self, model, sentences = CHECK_SENTENCES):
+        """
+        whether this scorer agrees with model (the one it was built from) on sentences;
+        it may not with an nltk version whose rules differ from 3.4.x
+        """
+        return all(self.polarity_scores(text) == model.polarity_scores(text) for text in sentences)
+
+    def polarity_scores(self, text):
+        lexicon = self.lexicon
+
+        # SentiText: split on whitespace, drop single characters, strip punctuation around words.
+        # A token is mapped to its word when it is a PUNC_LIST mark and a word of 2+ characters
+        # with no punctuation (e.g. 'cat,' -> 'cat', '!!cat' -> 'cat'), and left as is otherwise.
+        words = []
+        for token in text.split():
+            if len(token) > 1:
+                words.append(strip_punctuation(token))
+        n_words = len(words)
+
+        # per word look-ups, once
+        lowers      = [word.lower() for word in words]
+        is_upper    = [word.isupper() for word in words]
+        in_lexicon  = [lower in lexicon for lower in lowers]
+        n_upper     = sum(is_upper)
+        is_cap_diff = 0 < n_words - n_upper < n_words
+
+        # polarity_scores uses list.index(item): a repeated word is scored at its first position
+        first = {}
+        for i, word in enumerate(words):
+            if word not in first:
+                first[word] = i
+
+        sentiments = []
+        for item in words:
+            i     = first[item]
+            lower = lowers[i]
+
+            if (i < n_words - 1 and lower == "kind" and lowers[i + 1] == "of") or lower in BOOSTER_DICT:
+                sentiments.append(0)
+                continue
+
+            if not in_lexicon[i]:
+                sentiments.append(0)
+                continue
+
+            # sentiment_valence
+            valence = lexicon[lower]
+            if is_upper[i] and is_cap_diff:
+                if valence > 0:
+                    valence += C_INCR
+                else:
+                    valence -= C_INCR
+
+            for start_i in range(0, 3):
+                j = i - (start_i + 1)
+                if i > start_i and not in_lexicon[j]:
+                    # scalar_inc_dec
+                    s = 0.0
+                    if lowers[j] in BOOSTER_DICT:
+                        s = BOOSTER_DICT[lowers[j]]
+                        if valence < 0:
+                            s *= -1
+                        if is_upper[j] and is_cap_diff:
+                            if valence > 0:
+                                s += C_INCR
+                            else:
+                                s -= C_INCR
+                    if start_i == 1 and s != 0:
+                        s = s * 0.95
+                    if start_i == 2 and s != 0:
+                        s = s * 0.9
+                    valence = valence + s
+
+                    # _never_check
+                    if start_i == 0:
+                        if negated(lowers[i - 1]):
+                            valence = valence * N_SCALAR
+                    elif start_i == 1:
+                        if words[i - 2] == "never" and (words[i - 1] == "so" or words[i - 1] == "this"):
+                            valence = valence * 1.5
+                        elif negated(lowers[i - 2]):
+                            valence = valence * N_SCALAR
+                    else:
+                        if (words[i - 3] == "never" and (words[i - 2] == "so" or words[i - 2] == "this")) or \
+                           (words[i - 1] == "so" or words[i - 1] == "this"):
+                            valence = valence * 1.25
+                        elif negated(lowers[i - 3]):
+                            valence = valence * N_SCALAR
+
+                        valence = idioms_check(valence, words, i)
+
+            # _least_check
+            if i > 1 and not in_lexicon[i - 1] and lowers[i - 1] == "least":
+                if lowers[i - 2] != "at" and lowers[i - 2] != "very":
+                    valence = valence * N_SCALAR
+            elif i > 0 and not in_lexicon[i - 1] and lowers[i - 1] == "least":
+                valence = valence * N_SCALAR
+
+            sentiments.append(valence)
+
+        # _but_check, including its list.index(value) look-up
+        if 'but' in first or 'BUT' in first:
+            bi = first['but'] if 'but' in first else first['BUT']
+            for sentiment in sentiments:
+                si = sentiments.index(sentiment)
+                if si < bi:
+                    sentiments[si] = sentiment * 0.5
+                elif si > bi:
+                    sentiments[si] = sentiment * 1.5
+
+        return score_valence(sentiments, text)
+
+
+def strip_punctuation(token):
+    """
+    SentiText's punctuation dict, without building it: 'p + word' or 'word + p' -> word
+    """
+    if token[0] in PUNCTUATION:
+        k = 1
+        while k < len(token) and token[k] in PUNCTUATION:
+            k += 1
+        word = token[k:]
+        if len(word) > 1 and token[:k] in PUNC_SET and not any(c in PUNCTUATION for c in word):
+            return word
+    elif token[-1] in PUNCTUATION:
+        k = len(token) - 1
+        while k > 0 and token[k - 1] in PUNCTUATION:
+            k -= 1
+        word = token[:k]
+        if len(word) > 1 and token[k:] in PUNC_SET and not any(c in PUNCTUATION for c in word):
+            return word
+    return token
+
+
+def negated(lower):
+    """
+    vader.negated([word]) for one (lowercased) word
+    """
+    return lower in NEGATE or "n't" in lower
+
+
+def idioms_check(valence, words, i):
+    """
+    SentimentIntensityAnalyzer._idioms_check
+    """
+    onezero     = words[i - 1] + " " + words[i]
+    twoonezero  = words[i - 2] + " " + words[i - 1] + " " + words[i]
+    twoone      = words[i - 2] + " " + words[i - 1]
+    threetwoone = words[i - 3] + " " + words[i - 2] + " " + words[i - 1]
+    threetwo    = words[i - 3] + " " + words[i - 2]
+
+    for seq in (onezero, twoonezero, twoone, threetwoone, threetwo):
+        if seq in SPECIAL_CASE_IDIOMS:
+            valence = SPECIAL_CASE_IDIOMS[seq]
+            break
+
+    if len(words) - 1 > i:
+        zeroone = words[i] + " " + words[i + 1]
+        if zeroone in SPECIAL_CASE_IDIOMS:
+            valence = SPECIAL_CASE_IDIOMS[zeroone]
+    if len(words) - 1 > i + 1:
+        zeroonetwo = words[i] + " " + words[i + 1] + " " + words[i + 2]
+        if zeroonetwo in SPECIAL_CASE_IDIOMS:
+            valence = SPECIAL_CASE_IDIOMS[zeroonetwo]
+
+    if threetwo in BOOSTER_DICT or twoone in BOOSTER_DICT:
+        valence = valence + B_DECR
+    return valence
+
+
+def score_valence(sentiments, text):
+    """
+    SentimentIntensityAnalyzer.score_valence, with the same floating point operations in the same order
+    """
+    if sentiments:
+        sum_s = float(sum(sentiments))
+
+        # _punctuation_emphasis
+        ep_count = text.count("!")
+        if ep_count > 4:
+            ep_count = 4
+        ep_amplifier = ep_count * 0.292
+        qm_count     = text.count("?")
+        qm_amplifier = 0
+        if qm_count > 1:
+            if qm_count <= 3:
+                qm_amplifier = qm_count * 0.18
+            else:
+                qm_amplifier = 0.96
+        punct_emph_amplifier = ep_amplifier + qm_amplifier
+
+        if sum_s > 0:
+            sum_s += punct_emph_amplifier
+        elif sum_s < 0:
+            sum_s -= punct_emph_amplifier
+
+        compound = sum_s / math.sqrt((sum_s * sum_s) + 15)
+
+        # _sift_sentiment_scores
+        pos_sum   = 0.0
+        neg_sum   = 0.0
+        neu_count = 0
+        for sentiment_score in sentiments:
+            if sentiment_score > 0:
+                pos_sum += (float(sentiment_score) + 1)
+            if sentiment_score < 0:
+                neg_sum += (float(sentiment_score) - 1)
+            if sentiment_score == 0:
+                neu_count += 1
+
+        if pos_sum > math.fabs(neg_sum):
+            pos_sum += punct_emph_amplifier
+        elif pos_sum < math.fabs(neg_sum):
+            neg_sum -= punct_emph_amplifier
+
+        total = pos_sum + math.fabs(neg_sum) + neu_count
+        pos   = math.fabs(pos_sum / total)
+        neg   = math.fabs(neg_sum / total)
+        neu   = math.fabs(neu_count / total)
+
+    else:
+        compound = 0.0
+        pos      = 0.0
+        neg      = 0.0
+        neu      = 0.0
+
+    return {"neg":      round(neg, 3),
+            "neu":      round(neu, 3),
+            "pos":      round(pos, 3),
+            "compound": round(compound, 4)}
@@ -0,0 +1,122 @@
+"""
+A function used for turning VADER compound scores ([-1, 1]) into the 5 sentiment classes of the SST sets,
+with fixed thresholds calibrated on a training set and stored in the model file
+
+A sentence is in class i + 1 if thresholds[i - 1] <= compound < thresholds[i] (np.digitize): its class depends
+on its own score only, not on the other sentences of the batch (as the bins of pd.cut(bins = 5) do).
+"""
+
+import multiprocessing
+import os
+
+import numpy as np
+
+from utilities.pipeline import CLASSES
+from utilities.text     import polarity_scorer
+
+
+# 4 thresholds between the 5 classes, used until calibrated: evenly spread over [-1, 1]
+DEFAULT_THRESHOLDS = [-0.6, -0.2, 0.2, 0.6]
+
+# candidate thresholds of the calibration
+CALIBRATION_GRID   = np.round(np.linspace(-1, 1, 201), 2)
+
+# the model of this process, set once by init_worker
+worker_model = None
+
+
+def init_worker(model):
+    global worker_model
+    worker_model = model
+
+
+def compound_chunk(list_text):
+    polarity_scores = polarity_scorer(worker_model)
+    return [polarity_scores(text)['compound'] for text in list_text]
+
+
+def compound_scores(list_text, model, workers = os.cpu_count(), chunk_size = 2000):
+
+    """
+    Score (already pre-processed) sentences with a SentimentIntensityAnalyzer model
+
+      list_text   list  sentences
+      model             SentimentIntensityAnalyzer
+      workers     int   worker processes, a chunk of sentences at a time each; 1 scores in this process
+      chunk_size  int   sentences per task sent to a worker
+
+    return a numpy array of the compound scores, in order
+    """
+
+    if workers <= 1 or len(list_text) <= chunk_size:
+        init_worker(model)
+        return np.array(compound_chunk(list_text), dtype = np.float64)
+
+    list_chunk = [list_text[index:index + chunk_size] for index in range(0, len(list_text), chunk_size)]
+    with multiprocessing.Pool(workers, initializer = init_worker, initargs = (model,)) as pool:
+        list_result = pool.map(compound_chunk, list_chunk)
+
+    return np.array([score for list_score in list_result for score in list_score], dtype = np.float64)
+
+
+def classify(scores, thresholds = DEFAULT_THRESHOLDS):
+    """
+    the class (1-5) of every compound score
+    """
+    return np.digitize(scores, thresholds) + CLASSES[0]
+
+
+def classification_scores(truth, pred):
+    """
+    accuracy & macro F1 score, as accuracy_score & f1_score(average = 'macro') of sklearn, vectorized:
+    {'accuracy': ..., 'macro_f1': ...}
+    """
+    truth  = np.asarray(truth).astype(np.int64)
+    pred   = np.asarray(pred).astype(np.int64)
+    labels = np.union1d(truth, pred)
+
+    # confusion matrix of the labels present, by one bincount
+    n_labels  = len(labels)
+    confusion = np.bincount(np.searchsorted(labels, truth) * n_labels + np.searchsorted(labels, pred),
+                            minlength = n_labels * n_labels).reshape(n_labels, n_labels)
+
+    tp        = np.diag(confusion)
+    divisor   = confusion.sum(axis = 0) + confusion.sum(axis = 1)     # 2 tp + fp + fn
+    f1        = np.divide(2 * tp, divisor, out = np.zeros(n_labels), where = divisor > 0)
+
+    return {'accuracy': float(tp.sum() / len(truth)), 'macro_f1': float(f1.mean())}
+
+
+def calibrate_thresholds(scores, truth, rounds = 3):
+
+    """
+    Calibrate the thresholds between the classes on labelled compound scores
+
+      scores  array  compound scores of a training set
+      truth   array  their classes (1-5)
+      rounds  int    passes of the coordinate ascent
+
+    Starts from the quantiles of the scores that match the share of every class in truth, then moves one
+    threshold at a time to the value of CALIBRATION_GRID (between its neighbours) of the best macro F1 score.
+
+    return the list of the 4 thresholds, increasing
+    """
+
+    scores = np.asarray(scores, dtype = np.float64)
+    truth  = np.asarray(truth).astype(np.int64)
+
+    shares     = np.cumsum(np.bincount(truth - CLASSES[0], minlength = len(CLASSES)))[:-1] / len(truth)
+    thresholds = list(np.quantile(scores, shares))
+    best       = classification_scores(truth, classify(scores, thresholds))['macro_f1']
+
+    for _ in range(rounds):
+        for index in range(len(thresholds)):
+            low  = thresholds[index - 1] if index > 0 else -np.inf
+            high = thresholds[index + 1] if index < len(thresholds) - 1 else np.inf
+            for candidate in CALIBRATION_GRID[(CALIBRATION_GRID > low) & (CALIBRATION_GRID < high)]:
+                trial    = thresholds[:index] + [candidate] + thresholds[index + 1:]
+                macro_f1 = classification_scores(truth, classify(scores, trial))['macro_f1']
+                if macro_f1 > best:
+                    best, thresholds = macro_f1, trial
+
+    return [float(threshold) for threshold in thresholds]
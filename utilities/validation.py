@@ -0,0 +1,136 @@
+"""
+A function used for validating the scoring requests: body size, JSON decoding, request shape & sentence
+"""
+
+import json
+import re
+
+from flask import jsonify
+
+
+HTTP_BAD_REQUEST       = 400
+HTTP_FORBIDDEN         = 403
+HTTP_CONFLICT          = 409
+HTTP_PAYLOAD_TOO_LARGE = 413
+
+# the status line text of each status code used in the error responses
+HTTP_STATUS_TEXT = {HTTP_BAD_REQUEST:       "Bad Request",
+                    HTTP_FORBIDDEN:         "Forbidden",
+                    HTTP_CONFLICT:          "Conflict",
+                    HTTP_PAYLOAD_TOO_LARGE: "Payload Too Large"}
+
+RE_ENGLISH_LETTER = re.compile("[a-zA-Z]")
+
+# bytes read from the request body at a time
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class InvalidRequest(Exception):
+    """
+    a request that is rejected before its body is decoded (body size or JSON, or unknown model)
+    """
+    def __init__(self, message, status_code = HTTP_BAD_REQUEST):
+        super().__init__(message)
+        self.message     = message
+        self.status_code = status_code
+
+
+def respond_with(message, status_code = HTTP_BAD_REQUEST):
+    """
+    the JSON error response of the Flask app (app.py & testing/swagger_ui.py)
+    """
+    response = jsonify(status        = "error",
+                       status_code   = str(status_code) + " - " + HTTP_STATUS_TEXT[status_code],
+                       error_message = message)
+    # set the status code (400 by default)
+    response.status_code = status_code
+    return response
+
+
+def read_json_body(request, max_bytes):
+
+    """
+    Decode the JSON body of a Flask request, as request.get_json() would, but reading at most max_bytes
+
+      request    flask.Request
+      max_bytes  int  largest body accepted
+
+    A body announced larger than max_bytes (Content-Length) is rejected before anything is read, and a body
+    sent without a length (chunked) as soon as more than max_bytes have been read: an oversize body is
+    never held in memory, nor decoded.
+
+    return the decoded value, or None if the body is not JSON (Content-Type), as get_json()
+    raise InvalidRequest if the body is too large, or is not valid JSON
+    """
+
+    message_too_large = "Payload too large. Expecting at most " + str(max_bytes) + " bytes."
+    if request.content_length is not None and request.content_length > max_bytes:
+        raise InvalidRequest(message_too_large, HTTP_PAYLOAD_TOO_LARGE)
+    if not request.is_json:
+        return None
+
+    list_chunk = []
+    size       = 0
+    stream     = request.stream
+    while True:
+        chunk = stream.read(min(READ_CHUNK_SIZE, max_bytes + 1 - size))
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise InvalidRequest(message_too_large, HTTP_PAYLOAD_TOO_LARGE)
+        list_chunk.append(chunk)
+
+    try:
+        return json.loads(b"".join(list_chunk))
+    except ValueError as e:   # UnicodeDecodeError & JSONDecodeError
+        raise InvalidRequest("Failed to decode JSON object: " + str(e))
+
+
+def check_request(dict_request, max_sentence_length):
+    """
+    to return the error message for an invalid {"sentence": "xxx"} request, or None if it is valid
+    """
+    # raise error if failed to decode JSON object
+    if not isinstance(dict_request, dict) or len(dict_request) == 0:
+        return "Failed to decode JSON object: No key/value pair in JSON. " \
+               "Expecting one, with key of 'sentence'."
+    elif len(dict_request) > 1:
+        return "Failed to decode JSON object: More than one key/value pair in JSON. " \
+               "Expecting only one, with key of 'sentence'."
+
+    # get_json() is modified to accept different values for one key.
+    # In such case, it will return a list of values for the key.
+    #   eg. {'sentence': ['I love you.', 'I hate you.']}
+    # By default, it will only return the last value for the key.
+    #   eg. {'sentence': 'I hate you.'}
+    (key, value), = dict_request.items()   # the only key/value pair (the value is either a str or a list)
+
+    # more than one value for the key
+    if type(value) is list:
+        # all the values are the same: compared to the first one in C (list.count), without hashing them
+        if len(value) > 0 and value.count(value[0]) == len(value):
+            return "Failed to decode JSON object: Repeated key/value pairs in JSON. " \
+                   "Expecting only one, with key of 'sentence'."
+        return "Failed to decode JSON object: More than one value for one key in JSON. " \
+               "Expecting only one, with key of 'sentence'."
+    elif key != "sentence":
+        return "Failed to decode JSON object: Expecting key/value pair with key of 'sentence'."
+    elif not isinstance(value, str):
+        return "Failed to decode JSON object: Expecting str data type for value in key/value pair " \
+               "(enclosed in double quotes)."
+
+    return check_sentence(value, max_sentence_length)
+
+
+def check_sentence(sentence, max_sentence_length):
+    """
+    to return the error message for an invalid input sentence, or None if it is valid
+    """
+    # checked first: the letter search below is linear in the length
+    if len(sentence) > max_sentence_length:
+        return "Sentence too long. Expecting at most " + str(max_sentence_length) + " characters."
+    # stops at the first letter
+    if RE_ENGLISH_LETTER.search(sentence) is None:
+        return "Failed to find English letter in the input sentence. Please try again."
+    return None
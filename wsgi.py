@@ -0,0 +1,10 @@
+"""
+WSGI entry point for production serving
+
+in project dir, run:
+$ gunicorn --config gunicorn.conf.py wsgi:application
+"""
+
+from app import create_app
+
+application = create_app()